@@ -1,6 +1,13 @@
 from flask import Flask
+from app.auth_tokens import init_bearer_auth
 from app.config import config
-from app.extensions import db, migrate, login, mail, cors, limiter, PayChanguClient
+from app.db_routing import configure_engines, init_replica_routing
+from app.extensions import db, migrate, login, mail, cors, limiter
+from app.metrics import init_metrics
+from app.profiling import init_profiling
+from app.slow_queries import init_slow_query_log
+from app.sql_metrics import init_sql_metrics
+from app.sqlite_profile import init_sqlite_profile
 
 def create_app(config_name='default'):
     app = Flask(__name__)
@@ -12,25 +19,28 @@ def create_app(config_name='default'):
         app.config.from_object(config[config_name])
 
     # Initialize extensions
+    configure_engines(app.config)
     db.init_app(app)
+    init_sqlite_profile(app)
+    init_replica_routing(app)
+    init_sql_metrics(app)
+    init_slow_query_log(app)
+    init_metrics(app)
+    init_profiling(app)
     migrate.init_app(app, db)
     login.init_app(app)
+    init_bearer_auth(app)
     mail.init_app(app)
     cors.init_app(app, resources={
         r"/api/*": {
             "origins": ["http://localhost:3000", f"{app.config['WEBSITE_URL'] or app.config['FRONTEND_URL']}"],
             "methods": ["GET", "POST", "PUT", "DELETE"],
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
             "support_credentials": True
         }
     })
     limiter.init_app(app)
-    
-    # Initialize PayChangu Client
-    # We store it in app.extensions or just make it available globally via current_app if we attached it
-    # Since PayChanguClient is a simple class, we can just instantiate it and attach to app
-    if app.config.get('PAYCHANGU_SECRET'):
-        app.paychangu_client = PayChanguClient(secret_key=app.config['PAYCHANGU_SECRET'])
+    # The PayChangu client is built on first use (get_paychangu_client in app/paychangu_client.py)
     
     login.login_view = 'main.login' # Updated to blueprint endpoint
 
@@ -38,4 +48,8 @@ def create_app(config_name='default'):
     from app.routes import bp as main_bp
     app.register_blueprint(main_bp)
 
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
     return app
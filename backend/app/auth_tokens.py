@@ -0,0 +1,231 @@
+# Stateless bearer tokens (Authorization: Bearer <jwt>) for API and mobile clients
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from flask import current_app, g
+from flask.sessions import SecureCookieSessionInterface
+from flask_login import UserMixin
+from jwt.exceptions import InvalidTokenError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, login
+from app.models import RevokedTokens, Users
+
+
+class TokenUser(UserMixin):
+    """
+    current_user for bearer requests, built from the access token's claims.
+    id and role come from the token, so the auth decorators never touch the
+    database; any other attribute (fullname, email, ...) loads the Users row once.
+    """
+    from_token = True
+
+    def __init__(self, claims):
+        self.id = int(claims["sub"])
+        self.role = claims["role"]
+        self.claims = claims
+        self._user = None
+
+    def __getattr__(self, name):
+        # Only reached for attributes that aren't claims
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._user is None:
+            self._user = db.session.get(Users, self.id)
+            if self._user is None:
+                raise AttributeError(name)
+        return getattr(self._user, name)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _encode(claims):
+    config = current_app.config
+    return jwt.encode(claims, config["JWT_SECRET_KEY"], algorithm=config["JWT_ALGORITHM"])
+
+
+def credential_fingerprint(user):
+    """
+    Short HMAC of the user's password hash, carried by refresh tokens. It changes with
+    the password, so a reset or change invalidates every refresh token issued before it.
+    """
+    key = current_app.config["JWT_SECRET_KEY"].encode()
+    return hmac.new(key, user.password_hash.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def issue_tokens(user):
+    """A short-lived access token carrying id and role, and a refresh token to renew it"""
+    config = current_app.config
+    now = _utcnow()
+    access_token = _encode({
+        "sub": str(user.id),
+        "role": user.role,
+        "type": "access",
+        "iat": now,
+        "exp": now + timedelta(seconds=config["JWT_ACCESS_TOKEN_TTL"]),
+        "jti": secrets.token_urlsafe(12),
+    })
+    refresh_token = _encode({
+        "sub": str(user.id),
+        "type": "refresh",
+        "pwd": credential_fingerprint(user),
+        "iat": now,
+        "exp": now + timedelta(seconds=config["JWT_REFRESH_TOKEN_TTL"]),
+        "jti": secrets.token_urlsafe(12),
+    })
+    return {
+        "accessToken": access_token,
+        "refreshToken": refresh_token,
+        "tokenType": "Bearer",
+        "expiresIn": config["JWT_ACCESS_TOKEN_TTL"],
+    }
+
+
+def decode_token(token, token_type):
+    """Verified claims of an access or refresh token; raises InvalidTokenError"""
+    config = current_app.config
+    claims = jwt.decode(
+        token,
+        config["JWT_SECRET_KEY"],
+        algorithms=[config["JWT_ALGORITHM"]],
+        options={"require": ["exp", "sub", "jti"]},
+    )
+    # Keeps reset tokens, signed with the same key, from being used here
+    if claims.get("type") != token_type:
+        raise InvalidTokenError(f"Not a {token_type} token")
+    return claims
+
+
+def revoke(claims):
+    """
+    Add a token's jti to the revocation list (in the caller's transaction).
+    Returns False if it was already revoked.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.add(RevokedTokens(
+                jti=claims["jti"],
+                token_type=claims["type"],
+                expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc).replace(tzinfo=None),
+            ))
+    except IntegrityError:
+        return False
+    if claims["type"] == "access":
+        _revocations().add(claims["jti"])
+    return True
+
+
+def rotate_refresh_token(refresh_token):
+    """
+    Exchange a refresh token for a new pair. The old one is revoked first, so it
+    works once: a second use (e.g. a stolen copy) is rejected.
+    Returns: (user, tokens) or (None, error message). Commits.
+    """
+    try:
+        claims = decode_token(refresh_token, "refresh")
+    except InvalidTokenError as e:
+        return None, f"Invalid refresh token: {str(e)}"
+
+    if not revoke(claims):
+        db.session.rollback()
+        current_app.logger.warning(f"Reuse of revoked refresh token {claims['jti']} for user {claims['sub']}")
+        return None, "Refresh token has been revoked"
+
+    # The role is re-read here, so role changes apply from the next access token
+    user = db.session.get(Users, int(claims["sub"]))
+    if user is None:
+        db.session.rollback()
+        return None, "User not found"
+    if not hmac.compare_digest(str(claims.get("pwd", "")), credential_fingerprint(user)):
+        db.session.rollback()
+        current_app.logger.warning(f"Refresh token for user {user.id} predates a password change")
+        return None, "Refresh token is no longer valid, please log in again"
+
+    user.last_seen = _utcnow()
+    db.session.commit()
+    return user, issue_tokens(user)
+
+
+class RevocationList:
+    """
+    Per-process copy of the revoked access-token ids, re-read from the database
+    at most every JWT_REVOCATION_SYNC_SECONDS instead of once per request.
+    Access tokens are short-lived, so the list stays small.
+    """
+
+    def __init__(self, sync_seconds):
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        self._jtis = set()
+        self._loaded_at = None
+
+    def add(self, jti):
+        with self._lock:
+            self._jtis.add(jti)
+
+    def __contains__(self, jti):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.sync_seconds:
+            now = _utcnow().replace(tzinfo=None)
+            jtis = set(db.session.execute(
+                select(RevokedTokens.jti).where(RevokedTokens.token_type == "access", RevokedTokens.expires_at > now)
+            ).scalars())
+            with self._lock:
+                self._jtis = jtis
+                self._loaded_at = time.monotonic()
+        return jti in self._jtis
+
+
+def _revocations():
+    revocations = current_app.extensions.get("token_revocations")
+    if revocations is None:
+        revocations = RevocationList(current_app.config["JWT_REVOCATION_SYNC_SECONDS"])
+        current_app.extensions["token_revocations"] = revocations
+    return revocations
+
+
+def bearer_token(request):
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+class BearerAwareSessionInterface(SecureCookieSessionInterface):
+    """Bearer-authenticated responses carry no session cookie, so they stay cacheable"""
+
+    def save_session(self, app, session, response):
+        if g.get("bearer_claims") is not None:
+            return
+        super().save_session(app, session, response)
+
+
+def init_bearer_auth(app):
+    """Accept Authorization: Bearer <access token> wherever the login cookie is accepted"""
+    if not app.config["BEARER_AUTH_ENABLED"]:
+        return
+    app.session_interface = BearerAwareSessionInterface()
+
+    @login.request_loader
+    def load_user_from_token(request):
+        # Flask-Login only calls this when the request has no login cookie
+        token = bearer_token(request)
+        if token is None:
+            return None
+        try:
+            claims = decode_token(token, "access")
+        except InvalidTokenError:
+            return None
+        if claims["jti"] in _revocations():
+            return None
+        g.bearer_claims = claims
+        return TokenUser(claims)
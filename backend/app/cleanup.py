@@ -0,0 +1,118 @@
+# Garbage collection of orphaned files in the upload directory
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Abstracts
+from app.storage import get_storage
+
+
+def load_referenced_paths(batch_size=10000):
+    """Stream every stored abstract file_path into a set without loading the rows"""
+    query = (
+        db.session.query(Abstracts.file_path)
+        .filter(Abstracts.file_path.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    return {file_path for (file_path,) in query}
+
+
+def load_checkpoint(checkpoint_path):
+    """Load a previous run's checkpoint, or None if there isn't one"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    """Atomically persist the checkpoint so a crash never leaves it half written"""
+    if not checkpoint_path:
+        return
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def collect_orphans(dry_run=True, grace_period=None, workers=None, checkpoint_path=None,
+                    resume=True, batch_size=10000):
+    """
+    Find (and unless dry_run, delete) uploaded files no abstract references.
+    Storage partitions (shard or legacy user directories) are scanned in parallel;
+    finished partitions are recorded in the checkpoint so an interrupted run
+    picks up where it stopped.
+    Returns: report dict
+    """
+    config = current_app.config
+    storage = get_storage()
+    grace_period = config["UPLOAD_GC_GRACE_PERIOD"] if grace_period is None else grace_period
+    workers = workers or config["UPLOAD_GC_WORKERS"]
+
+    checkpoint = load_checkpoint(checkpoint_path) if resume else None
+    # A dry-run checkpoint can't stand in for a real run (and vice versa)
+    if checkpoint is None or checkpoint.get("dry_run") != dry_run:
+        checkpoint = {
+            "started_at": time.time(),
+            "dry_run": dry_run,
+            "done": [],
+            "stats": {"scanned": 0, "orphaned": 0, "deleted": 0, "bytes": 0, "errors": 0},
+        }
+    done = set(checkpoint["done"])
+    stats = checkpoint["stats"]
+    # Keep the cutoff fixed across resumes so the grace window stays consistent
+    cutoff = checkpoint["started_at"] - grace_period
+    orphans = []
+
+    started = time.perf_counter()
+    referenced = load_referenced_paths(batch_size)
+
+    partitions = [p for p in storage.list_partitions() if p not in done]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(storage.scan, partition, cutoff): partition
+            for partition in partitions
+        }
+        for future in as_completed(futures):
+            partition = futures[future]
+            scanned, candidates = future.result()
+            stats["scanned"] += scanned
+
+            # Files inside the grace period may belong to an upload in flight,
+            # so the backends only hand back candidates older than the cutoff
+            for key, size, mtime in candidates:
+                if key in referenced:
+                    continue
+                stats["orphaned"] += 1
+                stats["bytes"] += size
+                orphans.append(key)
+                if dry_run:
+                    continue
+                try:
+                    if storage.delete(key):
+                        stats["deleted"] += 1
+                except Exception as e:
+                    stats["errors"] += 1
+                    current_app.logger.error(f"Failed to delete orphaned file {key}: {str(e)}")
+
+            checkpoint["done"].append(partition)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+    # A completed run doesn't need resuming
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    return {
+        **stats,
+        "directories": len(partitions),
+        "referenced": len(referenced),
+        "orphans": orphans,
+        "dry_run": dry_run,
+        "elapsed": time.perf_counter() - started,
+    }
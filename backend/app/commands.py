@@ -0,0 +1,271 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command("cleanup-uploads")
+@click.option("--dry-run", is_flag=True, help="Report orphaned files without deleting them.")
+@click.option("--grace-period", type=int, default=None,
+              help="Skip files modified within this many seconds (default: UPLOAD_GC_GRACE_PERIOD).")
+@click.option("--workers", type=int, default=None,
+              help="Number of user directories scanned in parallel (default: UPLOAD_GC_WORKERS).")
+@click.option("--checkpoint", "checkpoint_path", default=None,
+              help="Checkpoint file used to resume an interrupted run (default: UPLOAD_GC_CHECKPOINT).")
+@click.option("--no-resume", is_flag=True, help="Ignore any existing checkpoint and start over.")
+@click.option("--verbose", is_flag=True, help="List every orphaned file.")
+@with_appcontext
+def cleanup_uploads(dry_run, grace_period, workers, checkpoint_path, no_resume, verbose):
+    """Delete uploaded files that no abstract references."""
+    from flask import current_app
+    from app.cleanup import collect_orphans
+    from app.uploads import purge_expired_sessions
+
+    report = collect_orphans(
+        dry_run=dry_run,
+        grace_period=grace_period,
+        workers=workers,
+        checkpoint_path=checkpoint_path or current_app.config["UPLOAD_GC_CHECKPOINT"],
+        resume=not no_resume,
+    )
+
+    if not dry_run:
+        click.echo(f"Purged {purge_expired_sessions()} expired upload sessions")
+
+    if verbose:
+        for rel_path in report["orphans"]:
+            click.echo(f"Orphaned file: {rel_path}")
+
+    action = "would delete" if dry_run else "deleted"
+    click.echo(
+        f"Scanned {report['scanned']} files in {report['directories']} directories "
+        f"against {report['referenced']} referenced paths in {report['elapsed']:.2f}s: "
+        f"{report['orphaned']} orphaned ({report['bytes']} bytes), "
+        f"{action} {report['orphaned'] if dry_run else report['deleted']}, "
+        f"{report['errors']} errors"
+    )
+
+
+@click.command("reconcile-payments")
+@click.option("--dry-run", is_flag=True, help="Verify with PayChangu but don't change any rows.")
+@click.option("--batch-size", type=int, default=None, help="Pending payments per batch (default: RECONCILE_BATCH_SIZE).")
+@click.option("--concurrency", type=int, default=None,
+              help="Parallel PayChangu verifications (default: RECONCILE_CONCURRENCY).")
+@click.option("--rate-limit", type=float, default=None,
+              help="Max PayChangu calls per second, 0 for unlimited (default: RECONCILE_RATE_LIMIT).")
+@click.option("--min-age", type=int, default=None,
+              help="Only check payments older than this many seconds (default: RECONCILE_MIN_AGE).")
+@click.option("--limit", type=int, default=None, help="Stop after checking this many payments.")
+@click.option("--json", "as_json", is_flag=True, help="Print the run report as JSON.")
+@with_appcontext
+def reconcile_payments(dry_run, batch_size, concurrency, rate_limit, min_age, limit, as_json):
+    """Verify pending payments with PayChangu and confirm, fail or expire them."""
+    import json
+    from app.reconciliation import reconcile_pending_payments
+
+    report = reconcile_pending_payments(
+        batch_size=batch_size,
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        min_age=min_age,
+        dry_run=dry_run,
+        limit=limit,
+    )
+
+    if as_json:
+        click.echo(json.dumps(report))
+        return
+
+    prefix = "[dry run] " if dry_run else ""
+    click.echo(
+        f"{prefix}Checked {report['checked']} pending payments in {report['batches']} batches "
+        f"({report['elapsed']:.2f}s): {report['confirmed']} confirmed, {report['failed']} failed, "
+        f"{report['expired']} expired, {report['still_pending']} still pending, {report['errors']} errors"
+    )
+    if report["aborted"]:
+        click.echo(f"Stopped early: {report['aborted']}")
+
+
+@click.command("import-abstracts")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "json", "ndjson"]), default=None,
+              help="Input format (default: from the file extension).")
+@click.option("--pdf-dir", type=click.Path(exists=True, file_okay=False), default=None,
+              help="Directory holding the PDFs named in the rows' 'file' column.")
+@click.option("--status", type=click.Choice(["pending", "approved", "published"]), default="pending",
+              help="Status for rows without a 'status' column.")
+@click.option("--batch-size", type=int, default=1000, show_default=True, help="Rows per INSERT batch/transaction.")
+@click.option("--workers", type=int, default=4, show_default=True, help="Parallel PDF copies into storage.")
+@click.option("--max-errors", type=int, default=None,
+              help="Stop after this many invalid rows; valid rows read up to that point are imported.")
+@click.option("--dry-run", is_flag=True, help="Validate the file without inserting anything.")
+@click.option("--json", "as_json", is_flag=True, help="Print the import report as JSON.")
+@with_appcontext
+def import_abstracts(path, fmt, pdf_dir, status, batch_size, workers, max_errors, dry_run, as_json):
+    """Bulk-import abstracts and their authors from a CSV, JSON or NDJSON file.
+
+    Columns: title, field, country, year, institution, author_email (required);
+    keywords, content or file, author_name, author_country, status, date_submitted.
+    No emails are sent.
+    """
+    import json
+    from app.importer import import_abstracts as run_import
+
+    try:
+        report = run_import(
+            path,
+            fmt=fmt,
+            pdf_dir=pdf_dir,
+            status=status,
+            batch_size=batch_size,
+            workers=workers,
+            dry_run=dry_run,
+            max_errors=max_errors,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    if as_json:
+        click.echo(json.dumps(report))
+        return
+
+    for error in report["errors"][:50]:
+        click.echo(f"Line {error['line']}: {error['error']}")
+    if len(report["errors"]) > 50:
+        click.echo(f"... and {len(report['errors']) - 50} more invalid rows")
+
+    prefix = "[dry run] " if dry_run else ""
+    action = "valid" if dry_run else "imported"
+    click.echo(
+        f"{prefix}Read {report['rows']} rows ({report['format']}) in {report['elapsed']:.2f}s: "
+        f"{report['imported']} {action} in {report['batches']} batches, {report['skipped']} skipped, "
+        f"{report['users_created']} new authors, {report['pdfs']} PDFs ({report['rows_per_sec']:.0f} rows/s)"
+    )
+    if report["aborted"]:
+        click.echo(f"Stopped early: {report['aborted']}")
+
+
+@click.command("purge-data")
+@click.option("--table", "tables", multiple=True, type=click.Choice(["reset_tokens", "idempotency_keys", "notifications", "revoked_tokens"]),
+              help="Only purge these tables (repeatable; default: all).")
+@click.option("--chunk-size", type=int, default=None, help="Rows per DELETE transaction (default: RETENTION_CHUNK_SIZE).")
+@click.option("--pause", type=float, default=None,
+              help="Seconds to sleep between chunks (default: RETENTION_CHUNK_PAUSE).")
+@click.option("--dry-run", is_flag=True, help="Count the rows that would be purged.")
+@click.option("--verbose", is_flag=True, help="Print progress after every chunk.")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON.")
+@with_appcontext
+def purge_data(tables, chunk_size, pause, dry_run, verbose, as_json):
+    """Delete expired reset tokens, idempotency keys and old notifications."""
+    import json
+    from app.retention import TABLES, run_retention
+
+    def progress(table, stats):
+        click.echo(f"  {table}: {stats['deleted']} deleted, {stats['archived']} archived ({stats['chunks']} chunks)")
+
+    report = run_retention(
+        tables=tables or TABLES,
+        chunk_size=chunk_size,
+        pause=pause,
+        dry_run=dry_run,
+        progress=progress if verbose and not as_json else None,
+    )
+
+    if as_json:
+        click.echo(json.dumps(report))
+        return
+
+    for table, stats in report.items():
+        if dry_run:
+            click.echo(f"[dry run] {table}: {stats['matched']} rows would be purged")
+        else:
+            rate = stats["deleted"] / stats["elapsed"] if stats["elapsed"] else 0
+            click.echo(
+                f"{table}: {stats['deleted']} deleted, {stats['archived']} archived in {stats['chunks']} chunks "
+                f"({stats['elapsed']:.2f}s, {rate:.0f} rows/s)"
+            )
+
+
+@click.command("rebuild-user-stats")
+@click.option("--user", "user_ids", multiple=True, type=int, help="Only rebuild these user ids (repeatable; default: all).")
+@with_appcontext
+def rebuild_user_stats(user_ids):
+    """Recompute the dashboard counters in user_stats from the source tables."""
+    import time
+    from app.extensions import db
+    from app.user_stats import rebuild_user_stats as rebuild
+
+    started = time.perf_counter()
+    try:
+        rows = rebuild(list(user_ids) or None)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"Rebuilt counters for {rows} users in {time.perf_counter() - started:.2f}s")
+
+
+@click.command("seed")
+@click.option("--users", type=int, default=1000, show_default=True, help="Accounts to create (the first --admins are admins).")
+@click.option("--abstracts", type=int, default=None, help="Abstracts to create (default: 4 per user).")
+@click.option("--reviews", type=int, default=None, help="Site reviews to create (default: 1 per 10 users).")
+@click.option("--admins", type=int, default=5, show_default=True, help="Admin accounts among --users.")
+@click.option("--seed", "seed_value", type=int, default=42, show_default=True,
+              help="Random seed; the same seed, sizes and --until give the same rows.")
+@click.option("--until", type=click.DateTime(), default=None, help="Newest timestamp, UTC (default: today 00:00).")
+@click.option("--days", type=int, default=730, show_default=True, help="Days of history before --until.")
+@click.option("--password", default="password123", show_default=True, help="Password of every seeded account.")
+@click.option("--batch-size", type=int, default=10000, show_default=True, help="Abstracts per INSERT batch/transaction.")
+@click.option("--force", is_flag=True, help="Allow seeding outside debug/testing configurations.")
+@click.option("--verbose", is_flag=True, help="Print progress after every batch.")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON.")
+@with_appcontext
+def seed(users, abstracts, reviews, admins, seed_value, until, days, password, batch_size, force, verbose, as_json):
+    """Fill the database with deterministic synthetic data for scale and load testing.
+
+    Rows are appended after any existing ones. Every account gets --password.
+    """
+    import json
+    from flask import current_app
+    from app.seed import seed_database
+
+    if not (current_app.debug or current_app.testing or force):
+        raise click.ClickException("Refusing to seed a non-debug configuration without --force")
+
+    def progress(table, rows):
+        click.echo(f"  {table}: {rows}")
+
+    try:
+        report = seed_database(
+            users=users,
+            abstracts=abstracts,
+            reviews=reviews,
+            admins=admins,
+            seed=seed_value,
+            until=until,
+            days=days,
+            password=password,
+            batch_size=batch_size,
+            progress=progress if verbose and not as_json else None,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    if as_json:
+        click.echo(json.dumps(report))
+        return
+
+    rows = report["rows"]
+    click.echo(", ".join(f"{count} {table}" for table, count in rows.items()))
+    click.echo(
+        f"Seeded {sum(rows.values())} rows in {report['elapsed']:.1f}s ({report['rows_per_sec']:.0f} rows/s), "
+        f"seed {report['seed']}, admins: user ids {report['admin_ids'][0]}-{report['admin_ids'][-1]}"
+    )
+
+
+def register_commands(app):
+    """Attach the maintenance commands to the flask CLI"""
+    app.cli.add_command(cleanup_uploads)
+    app.cli.add_command(reconcile_payments)
+    app.cli.add_command(import_abstracts)
+    app.cli.add_command(purge_data)
+    app.cli.add_command(rebuild_user_stats)
+    app.cli.add_command(seed)
@@ -31,13 +31,79 @@ def normalize_postgres_url(url: str) -> str:
 class Config(object):
     SECRET_KEY = os.environ.get("SECRET_KEY") or "you-will-never-guess"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
+
+    # Database connection pools. Pool size/overflow/timeout are ignored for SQLite.
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE") or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW") or 10)
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT") or 30)  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE") or 1800)  # seconds
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ["true", "on", "1"]
+
+    # SQLite profile (development / single node): WAL, busy timeout, cache and mmap pragmas
+    SQLITE_TUNED = os.environ.get("SQLITE_TUNED", "true").lower() in ["true", "on", "1"]
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS") or 5000)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB") or 64 * 1024)
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE") or 256 * 1024 * 1024)  # bytes
+
+    # Read replicas (comma-separated URLs). GET requests read from them; see app/db_routing.py
+    DATABASE_REPLICA_URLS = [
+        normalize_postgres_url(url.strip())
+        for url in (os.environ.get("DATABASE_REPLICA_URLS") or "").split(",")
+        if url.strip()
+    ]
+    REPLICA_POOL_SIZE = int(os.environ.get("REPLICA_POOL_SIZE") or 10)
+    REPLICA_MAX_OVERFLOW = int(os.environ.get("REPLICA_MAX_OVERFLOW") or 20)
+    REPLICA_POOL_TIMEOUT = float(os.environ.get("REPLICA_POOL_TIMEOUT") or 10)  # seconds
+    REPLICA_POOL_RECYCLE = int(os.environ.get("REPLICA_POOL_RECYCLE") or 1800)  # seconds
+    REPLICA_POOL_PRE_PING = os.environ.get("REPLICA_POOL_PRE_PING", "true").lower() in ["true", "on", "1"]
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS") or 10)  # primary-only window after a write
+
+    # Per-request SQL metrics (Server-Timing header, debug log and N+1 warnings)
+    SQL_METRICS_ENABLED = os.environ.get("SQL_METRICS_ENABLED", "true").lower() in ["true", "on", "1"]
+    # Off by default: the header tells any client how many queries ran and how long the DB took
+    SQL_SERVER_TIMING = os.environ.get("SQL_SERVER_TIMING", "false").lower() in ["true", "on", "1"]
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD") or 10)  # same statement > N times; 0 = off
+
+    # Slow-query log: per-statement aggregates (GET /api/admin/slow-queries) and warnings over the threshold
+    SLOW_QUERY_LOG_ENABLED = os.environ.get("SLOW_QUERY_LOG_ENABLED", "true").lower() in ["true", "on", "1"]
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS") or 200)
+    SLOW_QUERY_MAX_FINGERPRINTS = int(os.environ.get("SLOW_QUERY_MAX_FINGERPRINTS") or 500)  # least recent dropped
+    SLOW_QUERY_SAMPLES = int(os.environ.get("SLOW_QUERY_SAMPLES") or 200)  # recent timings per statement for p50/p95
+
+    # Prometheus metrics (needs prometheus-client; set PROMETHEUS_MULTIPROC_DIR under gunicorn)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "false").lower() in ["true", "on", "1"]
+    METRICS_PATH = os.environ.get("METRICS_PATH") or "/metrics"
+    METRICS_AUTH_TOKEN = os.environ.get("METRICS_AUTH_TOKEN")  # if set, scrapes need "Authorization: Bearer <token>"
+
+    # Request profiling (cProfile + SQL timings), for sampled requests or a signed X-Profile-Token header
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in ["true", "on", "1"]
+    PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE") or 0)  # 0.01 = 1% of requests
+    PROFILING_ENDPOINTS = {e.strip() for e in os.environ.get("PROFILING_ENDPOINTS", "").split(",") if e.strip()}
+    PROFILING_DIR = os.environ.get("PROFILING_DIR") or os.path.join(basedir, "profiles")
+    PROFILING_MAX_PROFILES = int(os.environ.get("PROFILING_MAX_PROFILES") or 50)  # oldest are deleted
+    PROFILING_TOKEN_TTL = int(os.environ.get("PROFILING_TOKEN_TTL") or 3600)  # seconds
+    PROFILING_SQL_STATEMENTS = int(os.environ.get("PROFILING_SQL_STATEMENTS") or 20)  # slowest statements kept
+    LAST_SEEN_UPDATE_INTERVAL = int(os.environ.get("LAST_SEEN_UPDATE_INTERVAL") or 300)  # seconds
+
+    # Student dashboard pagination and ?since= delta sync
+    DASHBOARD_PAGE_SIZE = int(os.environ.get("DASHBOARD_PAGE_SIZE") or 10)
+    DASHBOARD_MAX_PAGE_SIZE = int(os.environ.get("DASHBOARD_MAX_PAGE_SIZE") or 50)
+    DASHBOARD_DELTA_LIMIT = int(os.environ.get("DASHBOARD_DELTA_LIMIT") or 500)  # more changes -> full resync
+    DASHBOARD_SYNC_OVERLAP = int(os.environ.get("DASHBOARD_SYNC_OVERLAP") or 5)  # seconds re-sent to cover in-flight commits
+
     # Abstract Publication Fee
     ABSTRACT_PUBLICATION_FEE = float(os.environ.get("ABSTRACT_PUBLICATION_FEE") or 1.99)
 
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY") or SECRET_KEY
     JWT_ALGORITHM = "HS256"
+
+    # Bearer tokens for API/mobile clients (POST /api/token); see app/auth_tokens.py
+    BEARER_AUTH_ENABLED = os.environ.get("BEARER_AUTH_ENABLED", "true").lower() in ["true", "on", "1"]
+    JWT_ACCESS_TOKEN_TTL = int(os.environ.get("JWT_ACCESS_TOKEN_TTL") or 15 * 60)  # seconds
+    JWT_REFRESH_TOKEN_TTL = int(os.environ.get("JWT_REFRESH_TOKEN_TTL") or 30 * 24 * 3600)  # seconds
+    JWT_REVOCATION_SYNC_SECONDS = int(os.environ.get("JWT_REVOCATION_SYNC_SECONDS") or 30)  # revoked-access-token cache
     PASSWORD_RESET_TOKEN_EXPIRY = timedelta(minutes=5)
 
     # File Upload Configuration
@@ -45,10 +111,72 @@ class Config(object):
     UPLOAD_FOLDER = os.path.join(basedir, "uploads", "abstracts")
     ALLOWED_EXTENSIONS = {"pdf"}
 
+    # Resumable chunked uploads (/api/uploads)
+    UPLOAD_SESSION_FOLDER = os.path.join(basedir, "uploads", "sessions")
+    UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE") or 1024 * 1024)  # 1MB
+    CHUNKED_UPLOAD_MAX_SIZE = 10 * 1024 * 1024  # 10MB, same limit as a direct upload
+    UPLOAD_SESSION_TTL = int(os.environ.get("UPLOAD_SESSION_TTL") or 24 * 3600)  # seconds
+
+    # Upload storage backend: "local" (UPLOAD_FOLDER) or "s3" (any S3-compatible service)
+    STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "local")
+    STORAGE_SHARD_DEPTH = int(os.environ.get("STORAGE_SHARD_DEPTH") or 2)
+    S3_BUCKET = os.environ.get("S3_BUCKET")
+    S3_PREFIX = os.environ.get("S3_PREFIX", "abstracts")
+    S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")  # e.g. http://localhost:9000 for MinIO
+    S3_REGION = os.environ.get("S3_REGION")
+    S3_ACCESS_KEY_ID = os.environ.get("S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY = os.environ.get("S3_SECRET_ACCESS_KEY")
+
+    # Orphaned upload cleanup (flask cleanup-uploads)
+    UPLOAD_GC_GRACE_PERIOD = int(os.environ.get("UPLOAD_GC_GRACE_PERIOD") or 3600)  # seconds
+    UPLOAD_GC_WORKERS = int(os.environ.get("UPLOAD_GC_WORKERS") or 8)
+    UPLOAD_GC_CHECKPOINT = os.environ.get("UPLOAD_GC_CHECKPOINT") or os.path.join(
+        basedir, "uploads", ".cleanup_checkpoint.json"
+    )
+
     # PayChangu Configurations
     PAYCHANGU_SECRET = os.getenv("PAYCHANGU_SECRET")
     PAYCHANGU_CALLBACK_URL = os.getenv('PAYCHANGU_CALLBACK_URL')
     PAYCHANGU_RETURN_URL = os.getenv('PAYCHANGU_RETURN_URL')
+    PAYCHANGU_WEBHOOK_SECRET = os.getenv('PAYCHANGU_WEBHOOK_SECRET')
+    PAYCHANGU_BASE_URL = os.getenv('PAYCHANGU_BASE_URL') or "https://api.paychangu.com"
+    PAYCHANGU_CONNECT_TIMEOUT = float(os.getenv('PAYCHANGU_CONNECT_TIMEOUT') or 3.05)  # seconds
+    PAYCHANGU_READ_TIMEOUT = float(os.getenv('PAYCHANGU_READ_TIMEOUT') or 10)  # seconds
+    PAYCHANGU_MAX_RETRIES = int(os.getenv('PAYCHANGU_MAX_RETRIES') or 2)
+    PAYCHANGU_BACKOFF_BASE = float(os.getenv('PAYCHANGU_BACKOFF_BASE') or 0.25)  # seconds
+    PAYCHANGU_BACKOFF_MAX = float(os.getenv('PAYCHANGU_BACKOFF_MAX') or 2)  # seconds
+    PAYCHANGU_POOL_SIZE = int(os.getenv('PAYCHANGU_POOL_SIZE') or 10)
+    PAYCHANGU_BREAKER_THRESHOLD = int(os.getenv('PAYCHANGU_BREAKER_THRESHOLD') or 5)  # consecutive failures
+    PAYCHANGU_BREAKER_RESET = float(os.getenv('PAYCHANGU_BREAKER_RESET') or 30)  # seconds
+
+    # Pending payment reconciliation (flask reconcile-payments)
+    RECONCILE_BATCH_SIZE = int(os.getenv('RECONCILE_BATCH_SIZE') or 200)
+    RECONCILE_CONCURRENCY = int(os.getenv('RECONCILE_CONCURRENCY') or 4)
+    RECONCILE_RATE_LIMIT = float(os.getenv('RECONCILE_RATE_LIMIT') or 5)  # PayChangu calls per second
+    RECONCILE_MIN_AGE = int(os.getenv('RECONCILE_MIN_AGE') or 15 * 60)  # seconds
+    RECONCILE_EXPIRE_AFTER = int(os.getenv('RECONCILE_EXPIRE_AFTER') or 7 * 24 * 3600)  # seconds
+
+    # Duplicate payment protection
+    IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL') or 24 * 3600)  # seconds
+    PAYMENT_CHECKOUT_TTL = int(os.getenv('PAYMENT_CHECKOUT_TTL') or 3600)  # seconds a pending checkout is reused
+
+    # Retention job (flask purge-data)
+    RETENTION_CHUNK_SIZE = int(os.getenv('RETENTION_CHUNK_SIZE') or 5000)  # rows per DELETE transaction
+    RETENTION_CHUNK_PAUSE = float(os.getenv('RETENTION_CHUNK_PAUSE') or 0.1)  # seconds between chunks
+    RETENTION_RESET_TOKEN_GRACE = int(os.getenv('RETENTION_RESET_TOKEN_GRACE') or 24 * 3600)  # seconds past expiry
+    RETENTION_NOTIFICATIONS_READ_DAYS = int(os.getenv('RETENTION_NOTIFICATIONS_READ_DAYS') or 90)
+    RETENTION_NOTIFICATIONS_UNREAD_DAYS = int(os.getenv('RETENTION_NOTIFICATIONS_UNREAD_DAYS') or 365)
+    RETENTION_ARCHIVE_NOTIFICATIONS = os.getenv('RETENTION_ARCHIVE_NOTIFICATIONS', 'true').lower() in ['true', 'on', '1']
+
+    # Live events (GET /api/events). "local" only reaches streams on the same worker;
+    # "redis" fans out across workers and from CLI jobs
+    EVENTS_BACKEND = os.getenv('EVENTS_BACKEND', 'local')
+    EVENTS_REDIS_URL = os.getenv('EVENTS_REDIS_URL') or "redis://localhost:6379/0"
+    EVENTS_CHANNEL = os.getenv('EVENTS_CHANNEL') or "arh:events"
+    EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE') or 100)  # buffered events per stream
+    EVENTS_HEARTBEAT_SECONDS = float(os.getenv('EVENTS_HEARTBEAT_SECONDS') or 15)
+    EVENTS_STREAM_MAX_SECONDS = float(os.getenv('EVENTS_STREAM_MAX_SECONDS') or 300)  # then the client reconnects
+    EVENTS_RETRY_MS = int(os.getenv('EVENTS_RETRY_MS') or 3000)  # EventSource reconnect delay
 
     # Email Configuration
     MAIL_SERVER = os.environ.get("MAIL_SERVER")
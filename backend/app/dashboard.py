@@ -0,0 +1,157 @@
+# Student dashboard queries: paginated sub-resources and ?since= delta sync
+
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.extensions import db
+from app.models import Abstracts, Invoices, Notifications, Payments
+
+
+def _utcnow():
+    # Timestamps are stored naive (UTC)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def parse_since(value):
+    """ISO-8601 watermark from the client -> naive UTC datetime; raises ValueError"""
+    since = datetime.fromisoformat(value.strip().replace(" ", "+"))
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def sync_watermark():
+    """
+    The `syncedAt` to hand back to the client. It lags the clock by
+    DASHBOARD_SYNC_OVERLAP so rows stamped just before a still-open transaction
+    committed are sent again next time rather than missed.
+    """
+    overlap = timedelta(seconds=current_app.config["DASHBOARD_SYNC_OVERLAP"])
+    return (_utcnow() - overlap).isoformat() + "Z"
+
+
+def page_args(args):
+    """(page, per_page) from the query string, clamped to DASHBOARD_MAX_PAGE_SIZE"""
+    config = current_app.config
+    page = max(args.get("page", 1, type=int), 1)
+    per_page = args.get("per_page", config["DASHBOARD_PAGE_SIZE"], type=int)
+    return page, min(max(per_page, 1), config["DASHBOARD_MAX_PAGE_SIZE"])
+
+
+def pagination_data(pagination):
+    return {
+        "page": pagination.page,
+        "pages": pagination.pages,
+        "per_page": pagination.per_page,
+        "total": pagination.total,
+        "has_next": pagination.has_next,
+        "has_prev": pagination.has_prev,
+    }
+
+
+def abstract_item(abstract):
+    """Dashboard view of an abstract with its latest payment and invoice (relationships preloaded)"""
+    payment = max(abstract.payments, key=lambda p: p.id) if abstract.payments else None
+    invoice = max(abstract.invoices, key=lambda i: i.id) if abstract.invoices else None
+    return {
+        "id": abstract.id,
+        "title": abstract.title,
+        "content": abstract.content if abstract.file_type == "text" else None,
+        "fileType": abstract.file_type,
+        "hasFile": abstract.file_type == "pdf",
+        "field": abstract.field,
+        "institution": abstract.institution,
+        "country": abstract.country,
+        "year": abstract.year,
+        "keywords": abstract.keywords,
+        "status": abstract.status,
+        "dateSubmitted": abstract.date_submitted.isoformat(),
+        "updatedAt": abstract.updated_at.isoformat(),
+        "paymentStatus": payment.status if payment else "not_initiated",
+        "paymentAmount": payment.amount if payment else None,
+        "invoicePaid": invoice.paid if invoice else False,
+        "invoiceUrl": invoice.invoice_url if invoice else None,
+    }
+
+
+def notification_item(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "read": notification.read,
+        "createdAt": notification.created_at.isoformat(),
+    }
+
+
+def payment_item(payment, invoice):
+    return {
+        "id": payment.id,
+        "abstractId": payment.abstract_id,
+        "status": payment.status,
+        "amount": payment.amount,
+        "currency": payment.currency,
+        "paymentDate": payment.payment_date.isoformat(),
+        "updatedAt": payment.updated_at.isoformat(),
+        "invoicePaid": invoice.paid if invoice else False,
+        "invoiceUrl": invoice.invoice_url if invoice else None,
+    }
+
+
+def abstracts_query(user_id):
+    # Two extra IN queries per page instead of a row-multiplying join
+    return (
+        Abstracts.query.filter_by(author_id=user_id)
+        .options(selectinload(Abstracts.payments), selectinload(Abstracts.invoices))
+        .order_by(Abstracts.date_submitted.desc(), Abstracts.id.desc())
+    )
+
+
+def abstracts_page(user_id, page, per_page):
+    pagination = abstracts_query(user_id).paginate(page=page, per_page=per_page, error_out=False)
+    return [abstract_item(a) for a in pagination.items], pagination_data(pagination)
+
+
+def notifications_page(user_id, page, per_page, unread_only=False):
+    query = Notifications.query.filter_by(user_id=user_id)
+    if unread_only:
+        query = query.filter(Notifications.read.is_(False))
+    pagination = query.order_by(Notifications.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    return [notification_item(n) for n in pagination.items], pagination_data(pagination)
+
+
+def changes_since(user_id, since):
+    """
+    Abstracts, payments and notifications of the user changed at or after `since`.
+    Returns None when any of them has more than DASHBOARD_DELTA_LIMIT changes; the
+    client should then reload the paginated resources.
+    """
+    limit = current_app.config["DASHBOARD_DELTA_LIMIT"]
+
+    abstracts = (
+        abstracts_query(user_id).filter(Abstracts.updated_at >= since).limit(limit + 1).all()
+    )
+    payments = db.session.execute(
+        select(Payments, Invoices)
+        .join(Abstracts, Abstracts.id == Payments.abstract_id)
+        .outerjoin(Invoices, Invoices.payment_id == Payments.id)
+        .where(Abstracts.author_id == user_id, Payments.updated_at >= since)
+        .order_by(Payments.updated_at)
+        .limit(limit + 1)
+    ).all()
+    notifications = (
+        Notifications.query.filter(Notifications.user_id == user_id, Notifications.updated_at >= since)
+        .order_by(Notifications.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    if max(len(abstracts), len(payments), len(notifications)) > limit:
+        return None
+
+    return {
+        "abstracts": [abstract_item(a) for a in abstracts],
+        "payments": [payment_item(payment, invoice) for payment, invoice in payments],
+        "notifications": [notification_item(n) for n in notifications],
+    }
@@ -0,0 +1,96 @@
+# Read-replica routing: SELECTs in read-only requests go to a replica, everything else to the primary
+
+import itertools
+import time
+
+import sqlalchemy as sa
+from flask import current_app, g, request, session
+from flask_sqlalchemy.session import Session
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+REPLICA_BIND_PREFIX = "replica_"
+
+
+class RoutingSession(Session):
+    """
+    db.session class that sends plain SELECTs to the replica chosen for the current
+    request (g.db_replica). Flushes, DML and raw SQL always use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = g.get("db_replica") if bind is None else None
+        if replica and not self._flushing and isinstance(clause, (sa.Select, sa.CompoundSelect)):
+            return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_primary(f):
+    """Read from the primary even on GET (for views that must not show replica lag)"""
+    f.use_primary = True
+    return f
+
+
+def engine_options(url, pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping):
+    """Engine keyword arguments; SQLite keeps Flask-SQLAlchemy's own pool choice"""
+    options = {"pool_pre_ping": pool_pre_ping, "pool_recycle": pool_recycle}
+    if url and not str(url).startswith("sqlite"):
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+    return options
+
+
+def configure_engines(config):
+    """
+    Fill SQLALCHEMY_ENGINE_OPTIONS for the primary and add one SQLALCHEMY_BINDS
+    entry per DATABASE_REPLICA_URLS item. Must run before db.init_app(app).
+    """
+    primary = engine_options(
+        config.get("SQLALCHEMY_DATABASE_URI"),
+        config["DB_POOL_SIZE"],
+        config["DB_MAX_OVERFLOW"],
+        config["DB_POOL_TIMEOUT"],
+        config["DB_POOL_RECYCLE"],
+        config["DB_POOL_PRE_PING"],
+    )
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = {**primary, **config.get("SQLALCHEMY_ENGINE_OPTIONS", {})}
+
+    binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+    for index, url in enumerate(config["DATABASE_REPLICA_URLS"]):
+        binds[f"{REPLICA_BIND_PREFIX}{index}"] = {
+            "url": url,
+            **engine_options(
+                url,
+                config["REPLICA_POOL_SIZE"],
+                config["REPLICA_MAX_OVERFLOW"],
+                config["REPLICA_POOL_TIMEOUT"],
+                config["REPLICA_POOL_RECYCLE"],
+                config["REPLICA_POOL_PRE_PING"],
+            ),
+        }
+    config["SQLALCHEMY_BINDS"] = binds
+
+
+def init_replica_routing(app):
+    """Register the request hooks that pick a replica and keep writers on the primary"""
+    replicas = [key for key in app.config["SQLALCHEMY_BINDS"] if key and key.startswith(REPLICA_BIND_PREFIX)]
+    if not replicas:
+        return
+    next_replica = itertools.cycle(replicas).__next__
+
+    @app.before_request
+    def choose_database():
+        g.db_replica = None
+        if request.method not in READ_METHODS:
+            return
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, "use_primary", False):
+            return
+        # Read-your-own-writes: stay on the primary for a while after this client wrote
+        if session.get("db_primary_until", 0) > time.time():
+            return
+        g.db_replica = next_replica()
+
+    @app.after_request
+    def remember_write(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            session["db_primary_until"] = time.time() + app.config["REPLICA_STICKY_SECONDS"]
+        return response
@@ -3,15 +3,21 @@ from flask_mail import Message, Mail
 from threading import Thread
 import logging
 
+from app import metrics
 from app.extensions import mail
 
 def send_async_email(app, msg):
     """Send email asynchronously to avoid blocking the main thread"""
     with app.app_context():
         try:
-            mail.send(msg)
+            with metrics.timed("email_latency"):
+                mail.send(msg)
+            metrics.inc("emails", outcome="sent")
         except Exception as e:
+            metrics.inc("emails", outcome="failed")
             current_app.logger.error(f"Failed to send email: {str(e)}")
+        finally:
+            metrics.inc("email_queue", -1)
 
 def send_email(subject, sender, recipients, text_body, html_body):
     """Send email with both text and HTML versions"""
@@ -20,6 +26,7 @@ def send_email(subject, sender, recipients, text_body, html_body):
     msg.html = html_body
     
     # Send email asynchronously
+    metrics.inc("email_queue")
     Thread(target=send_async_email, args=(current_app._get_current_object(), msg)).start()
 
 def send_abstract_confirmation_email(user_email, user_name, abstract_title, abstract_id):
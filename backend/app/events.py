@@ -0,0 +1,218 @@
+# Live events for students: in-process pub/sub feeding Server-Sent Events streams
+
+import json
+import queue
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Abstracts, Notifications
+
+# Notifications are re-read from the database when this event arrives, so the
+# message itself carries no data and a stream can never skip one
+NOTIFICATION = "notification"
+
+
+class EventBroker:
+    """Fans events out to the SSE streams connected to this worker process"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> set of queues
+
+    def subscribe(self, user_id):
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(q)
+        return q
+
+    def unsubscribe(self, user_id, q):
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(q)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def connections(self):
+        with self._lock:
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def dispatch(self, message):
+        """Deliver a message to local subscribers (user_id None means everyone)"""
+        with self._lock:
+            if message["user_id"] is None:
+                targets = [q for queues in self._subscribers.values() for q in queues]
+            else:
+                targets = list(self._subscribers.get(message["user_id"], ()))
+        for q in targets:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # A stalled client; its stream ends at EVENTS_STREAM_MAX_SECONDS and resumes
+                pass
+
+    def publish(self, user_id, event, data=None):
+        self.dispatch({"user_id": user_id, "event": event, "data": data})
+
+
+class RedisEventBroker(EventBroker):
+    """
+    Publishes through a Redis channel so streams on every worker (and events
+    from CLI jobs such as reconciliation) reach the right clients
+    """
+
+    def __init__(self, url, channel, queue_size=100):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis events backend requires redis: pip install redis")
+
+        super().__init__(queue_size)
+        self.channel = channel
+        self.client = redis.Redis.from_url(url)
+        self._listener = None
+
+    def publish(self, user_id, event, data=None):
+        self.client.publish(self.channel, json.dumps({"user_id": user_id, "event": event, "data": data}))
+
+    def subscribe(self, user_id):
+        # The listener starts with the first stream, so processes that only publish never run it
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="events-redis", daemon=True)
+                self._listener.start()
+        return super().subscribe(user_id)
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for item in pubsub.listen():
+                    self.dispatch(json.loads(item["data"]))
+            except Exception:
+                time.sleep(1)
+
+
+def create_broker(config):
+    backend = config.get("EVENTS_BACKEND", "local")
+    queue_size = config.get("EVENTS_QUEUE_SIZE", 100)
+    if backend == "local":
+        return EventBroker(queue_size)
+    if backend == "redis":
+        return RedisEventBroker(config["EVENTS_REDIS_URL"], config["EVENTS_CHANNEL"], queue_size)
+    raise ValueError(f"Unknown EVENTS_BACKEND: {backend}")
+
+
+def get_broker():
+    """Return the current app's event broker, creating it on first use"""
+    broker = current_app.extensions.get("events")
+    if broker is None:
+        broker = create_broker(current_app.config)
+        current_app.extensions["events"] = broker
+    return broker
+
+
+def publish(user_id, event, data=None):
+    """Publish after the change is committed; failures are logged, never raised"""
+    try:
+        get_broker().publish(user_id, event, data)
+    except Exception as e:
+        current_app.logger.warning(f"Failed to publish {event} event: {str(e)}")
+
+
+def publish_abstract_status(user_id, abstract_id, status):
+    """An abstract changed status; its notification was written in the same transaction"""
+    publish(user_id, "abstract_status", {"abstractId": abstract_id, "status": status})
+    publish(user_id, NOTIFICATION)
+
+
+def format_event(event, data, event_id=None):
+    message = f"id: {event_id}\n" if event_id is not None else ""
+    return message + f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def latest_notification_id(user_id):
+    return db.session.execute(
+        select(db.func.max(Notifications.id)).where(Notifications.user_id == user_id)
+    ).scalar() or 0
+
+
+def notification_events(user_id, after_id, batch_size=100):
+    """SSE events for the user's notifications newer than after_id, oldest first"""
+    while True:
+        notifications = db.session.execute(
+            select(Notifications.id, Notifications.message, Notifications.read)
+            .where(Notifications.user_id == user_id, Notifications.id > after_id)
+            .order_by(Notifications.id)
+            .limit(batch_size)
+        ).all()
+        for n in notifications:
+            yield n.id, format_event(NOTIFICATION, {"id": n.id, "message": n.message, "read": n.read}, n.id)
+        if len(notifications) < batch_size:
+            return
+        after_id = notifications[-1].id
+
+
+def abstract_statuses(user_id):
+    rows = db.session.execute(
+        select(Abstracts.id, Abstracts.status).where(Abstracts.author_id == user_id)
+    ).all()
+    return [{"abstractId": row.id, "status": row.status} for row in rows]
+
+
+def event_stream(user_id, last_event_id=None):
+    """
+    Generator of SSE messages for one student.
+
+    Notification events carry the notification id as the SSE id, so a client
+    reconnecting with Last-Event-ID gets every notification it missed, plus an
+    "abstracts" snapshot of current statuses. A comment line is sent every
+    EVENTS_HEARTBEAT_SECONDS to keep proxies from closing the connection, and
+    the stream ends after EVENTS_STREAM_MAX_SECONDS so it doesn't hold a worker
+    forever; EventSource reconnects on its own.
+    Run it with stream_with_context.
+    """
+    config = current_app.config
+    broker = get_broker()
+    # Subscribe before reading the cursor so nothing committed in between is lost
+    q = broker.subscribe(user_id)
+    try:
+        yield f"retry: {config['EVENTS_RETRY_MS']}\n\n"
+
+        if last_event_id is None:
+            cursor, pending = latest_notification_id(user_id), False
+        else:
+            cursor, pending = last_event_id, True
+            yield format_event("abstracts", abstract_statuses(user_id))
+        # Don't hold a pooled connection between events
+        db.session.close()
+
+        deadline = time.monotonic() + config["EVENTS_STREAM_MAX_SECONDS"]
+        while True:
+            if pending:
+                for cursor, message in notification_events(user_id, cursor):
+                    yield message
+                db.session.close()
+                pending = False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                message = q.get(timeout=min(config["EVENTS_HEARTBEAT_SECONDS"], remaining))
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+
+            if message["event"] == NOTIFICATION:
+                pending = True
+            else:
+                yield format_event(message["event"], message["data"])
+    finally:
+        broker.unsubscribe(user_id, q)
@@ -0,0 +1,91 @@
+# Idempotency-Key support for endpoints with external side effects
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import IdempotencyKeys
+
+
+def request_fingerprint():
+    """SHA-256 of method, path and the canonicalised JSON body"""
+    body = request.get_json(silent=True)
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{request.method} {request.path}\n{canonical}".encode()).hexdigest()
+
+
+def idempotent(f):
+    """
+    Replay the stored response when a request is retried with the same
+    Idempotency-Key header. Requests without the header run normally.
+    Must be applied after the authentication decorator.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > 128:
+            return jsonify({"error": "Idempotency-Key must be at most 128 characters"}), 400
+
+        fingerprint = request_fingerprint()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        record = IdempotencyKeys.query.filter_by(user_id=current_user.id, key=key).first()
+        if record is not None and record.expires_at < now:
+            db.session.delete(record)
+            db.session.commit()
+            record = None
+
+        if record is not None:
+            if record.request_hash != fingerprint or record.endpoint != request.endpoint:
+                return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+            if record.status_code is None:
+                return jsonify({"error": "A request with this Idempotency-Key is still being processed"}), 409
+            response = make_response(record.response_body, record.status_code)
+            response.mimetype = "application/json"
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        # Claim the key before doing any work; the unique constraint settles races
+        record = IdempotencyKeys(
+            user_id=current_user.id,
+            key=key,
+            endpoint=request.endpoint,
+            request_hash=fingerprint,
+            expires_at=now + timedelta(seconds=current_app.config["IDEMPOTENCY_KEY_TTL"]),
+        )
+        try:
+            db.session.add(record)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"error": "A request with this Idempotency-Key is still being processed"}), 409
+        record_id = record.id
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            IdempotencyKeys.query.filter_by(id=record_id).delete()
+            db.session.commit()
+            raise
+
+        # Server errors aren't stored, so the client can retry with the same key
+        if response.status_code >= 500:
+            IdempotencyKeys.query.filter_by(id=record_id).delete()
+        else:
+            IdempotencyKeys.query.filter_by(id=record_id).update({
+                "status_code": response.status_code,
+                "response_body": response.get_data(as_text=True),
+            })
+        db.session.commit()
+        return response
+
+    return decorated_function
@@ -0,0 +1,283 @@
+# Bulk import of abstracts (and their authors) from CSV, JSON or NDJSON files
+
+import csv
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from email_validator import EmailNotValidError, validate_email
+from sqlalchemy import func, insert, select
+from werkzeug.utils import secure_filename
+
+from app.extensions import db
+from app.models import Abstracts, Users
+from app.storage import get_storage
+from app.user_stats import abstract_added, users_created
+from app.utilities import MAX_FILE_SIZE, allowed_file, validate_abstract_fields
+
+FORMATS = ("csv", "json", "ndjson")
+IMPORT_STATUSES = ("pending", "approved", "published")
+
+# Imported authors can't log in until they use the password reset flow
+UNUSABLE_PASSWORD = "!"
+
+
+class ImportRowError(ValueError):
+    """A row failed validation; it is skipped and reported"""
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "jsonl":
+        return "ndjson"
+    if extension not in FORMATS:
+        raise ValueError(f"Can't tell the format of {path}; pass --format ({', '.join(FORMATS)})")
+    return extension
+
+
+def read_rows(path, fmt):
+    """Yield (line number, row dict) from the source file without loading it all at once"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif fmt == "ndjson":
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except ValueError:
+                    yield number, ImportRowError("Invalid JSON")
+        else:
+            data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("abstracts", [])
+            for number, row in enumerate(data, start=1):
+                yield number, row
+
+
+def clean_row(row, pdf_dir=None, status="pending"):
+    """Apply the /api/submit rules to one row; returns the normalised row or raises ImportRowError"""
+    get = lambda key: (str(row.get(key)).strip() if row.get(key) not in (None, "") else None)
+
+    title, field, country, institution = get("title"), get("field"), get("country"), get("institution")
+    year, error = validate_abstract_fields(title, field, country, get("year"), institution)
+    if error:
+        raise ImportRowError(error)
+
+    email = get("author_email")
+    if not email:
+        raise ImportRowError("Missing author_email")
+    try:
+        email = validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        raise ImportRowError(f"Invalid author_email: {email}")
+
+    content, pdf = get("content"), get("file")
+    if not content and not pdf:
+        raise ImportRowError("Either text content or PDF file must be provided")
+
+    pdf_path = None
+    if pdf:
+        if not pdf_dir:
+            raise ImportRowError("Row names a PDF but no --pdf-dir was given")
+        if not allowed_file(pdf):
+            raise ImportRowError("Only PDF files are allowed")
+        pdf_path = os.path.realpath(os.path.join(pdf_dir, pdf))
+        if os.path.commonpath([pdf_path, os.path.realpath(pdf_dir)]) != os.path.realpath(pdf_dir):
+            raise ImportRowError(f"PDF path escapes --pdf-dir: {pdf}")
+        if not os.path.isfile(pdf_path):
+            raise ImportRowError(f"PDF not found: {pdf}")
+        size = os.path.getsize(pdf_path)
+        if size > MAX_FILE_SIZE:
+            raise ImportRowError("File size exceeds 10MB limit")
+        if size == 0:
+            raise ImportRowError("File is empty")
+
+    row_status = get("status") or status
+    if row_status not in IMPORT_STATUSES:
+        raise ImportRowError(f"Invalid status: {row_status}")
+
+    date_submitted = get("date_submitted")
+    if date_submitted:
+        try:
+            date_submitted = datetime.fromisoformat(date_submitted)
+        except ValueError:
+            raise ImportRowError(f"Invalid date_submitted: {date_submitted}")
+
+    return {
+        "title": title,
+        "field": field,
+        "country": country,
+        "year": year,
+        "institution": institution,
+        "keywords": get("keywords"),
+        "content": content if not pdf_path else None,
+        "pdf_path": pdf_path,
+        "status": row_status,
+        "author_email": email,
+        "author_name": get("author_name") or email.split("@")[0],
+        "author_country": get("author_country") or country,
+        "date_submitted": date_submitted,
+    }
+
+
+def resolve_authors(rows):
+    """
+    Map author emails to user ids, bulk-inserting the authors that don't exist yet.
+    Emails match case-insensitively: registration stores them as typed, so
+    Jane@Example.COM in the file must find the account registered as jane@example.com.
+    Returns: (lowercased email -> id, number of users created)
+    """
+    emails = {row["author_email"].lower() for row in rows}
+    ids = {}
+    existing = db.session.execute(
+        select(Users.email, Users.id).where(func.lower(Users.email).in_(emails)).order_by(Users.id)
+    )
+    for email, user_id in existing:
+        ids.setdefault(email.lower(), user_id)
+
+    missing = {}
+    for row in rows:
+        key = row["author_email"].lower()
+        if key not in ids:
+            missing.setdefault(key, {
+                "email": row["author_email"],
+                "fullname": row["author_name"],
+                "country": row["author_country"],
+                "password_hash": UNUSABLE_PASSWORD,
+                "role": "student",
+                "last_seen": datetime.now(timezone.utc),
+            })
+    if missing:
+        created = db.session.execute(insert(Users).returning(Users.email, Users.id), list(missing.values()))
+        created = {email.lower(): user_id for email, user_id in created}
+        users_created(list(created.values()))
+        ids.update(created)
+    return ids, len(missing)
+
+
+def store_pdf(storage, row, author_id):
+    """Copy a row's PDF into upload storage; returns the storage key"""
+    filename = secure_filename(os.path.basename(row["pdf_path"]))
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(row["pdf_path"], "rb") as f:
+        return storage.save(
+            storage.key_for(f"{author_id}_{timestamp}_{filename}"), f, content_type="application/pdf"
+        )
+
+
+def import_batch(rows, workers):
+    """Insert one batch of clean rows in a single transaction; returns (abstracts, users created, pdfs)"""
+    author_ids, users_created = resolve_authors(rows)
+
+    # The storage backend is resolved here because the copy threads have no app context
+    storage = get_storage()
+    pdf_rows = [row for row in rows if row["pdf_path"]]
+    keys = []
+    if pdf_rows:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            keys = list(executor.map(
+                lambda row: store_pdf(storage, row, author_ids[row["author_email"].lower()]), pdf_rows
+            ))
+        for row, key in zip(pdf_rows, keys):
+            row["file_path"] = key
+
+    now = datetime.now(timezone.utc)
+    values = [
+        {
+            "title": row["title"],
+            "content": row["content"],
+            "file_path": row.get("file_path"),
+            "file_type": "pdf" if row["pdf_path"] else "text",
+            "field": row["field"],
+            "institution": row["institution"],
+            "country": row["country"],
+            "year": row["year"],
+            "keywords": row["keywords"],
+            "status": row["status"],
+            "author_id": author_ids[row["author_email"].lower()],
+            "date_submitted": row["date_submitted"] or now,
+        }
+        for row in rows
+    ]
+    added = Counter((value["author_id"], value["status"]) for value in values)
+    try:
+        db.session.execute(insert(Abstracts), values)
+        for (author_id, status), count in added.items():
+            abstract_added(author_id, status, count)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for key in keys:
+            storage.delete(key)
+        raise
+    return len(values), users_created, len(keys)
+
+
+def import_abstracts(path, fmt=None, pdf_dir=None, status="pending", batch_size=1000, workers=4,
+                     dry_run=False, max_errors=None):
+    """
+    Validate and bulk-insert abstracts from a CSV/JSON/NDJSON file.
+    Invalid rows are skipped and listed in the report; nothing is emailed.
+    Returns: report dict
+    """
+    fmt = fmt or detect_format(path)
+    report = {
+        "format": fmt,
+        "dry_run": dry_run,
+        "rows": 0,
+        "imported": 0,
+        "skipped": 0,
+        "users_created": 0,
+        "pdfs": 0,
+        "batches": 0,
+        "errors": [],
+        "aborted": None,
+    }
+    started = time.perf_counter()
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        report["batches"] += 1
+        if dry_run:
+            report["imported"] += len(batch)
+        else:
+            imported, users_created, pdfs = import_batch(batch, workers)
+            report["imported"] += imported
+            report["users_created"] += users_created
+            report["pdfs"] += pdfs
+        batch.clear()
+
+    for number, row in read_rows(path, fmt):
+        report["rows"] += 1
+        try:
+            if isinstance(row, ImportRowError):
+                raise row
+            if not isinstance(row, dict):
+                raise ImportRowError("Row is not an object")
+            batch.append(clean_row(row, pdf_dir=pdf_dir, status=status))
+        except ImportRowError as e:
+            report["skipped"] += 1
+            report["errors"].append({"line": number, "error": str(e)})
+            if max_errors is not None and report["skipped"] > max_errors:
+                report["aborted"] = f"More than {max_errors} invalid rows (stopped at line {number})"
+                # Valid rows read before the abort are still imported; the rest of the file isn't read
+                flush()
+                break
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    else:
+        flush()
+
+    report["elapsed"] = time.perf_counter() - started
+    report["rows_per_sec"] = report["imported"] / report["elapsed"] if report["elapsed"] else 0.0
+    return report
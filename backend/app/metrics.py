@@ -0,0 +1,142 @@
+# Prometheus metrics: per-route request latency, emails, PayChangu calls, uploads and rate limiting
+
+import hmac
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, current_app, g, request
+
+from app.extensions import limiter
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# prometheus_client keeps one global registry per process, so the metrics are created
+# once and shared by every app instance
+_metrics = None
+_lock = threading.Lock()
+
+
+class Metrics:
+    def __init__(self):
+        try:
+            from prometheus_client import Counter, Gauge, Histogram
+        except ImportError:
+            raise RuntimeError("METRICS_ENABLED requires prometheus-client: pip install prometheus-client")
+
+        self.http_requests = Counter(
+            "arh_http_requests_total", "HTTP requests by route and status", ["method", "endpoint", "status"])
+        self.http_latency = Histogram(
+            "arh_http_request_duration_seconds", "Time to build the response, by route", ["method", "endpoint"],
+            buckets=HTTP_BUCKETS)
+        self.http_in_progress = Gauge(
+            "arh_http_requests_in_progress", "Requests being handled", multiprocess_mode="livesum")
+        self.rate_limited = Counter(
+            "arh_rate_limit_rejections_total", "Requests rejected by Flask-Limiter (429)", ["endpoint"])
+
+        self.emails = Counter("arh_emails_total", "Emails sent by outcome", ["outcome"])
+        self.email_latency = Histogram(
+            "arh_email_send_duration_seconds", "SMTP send time", buckets=EXTERNAL_BUCKETS)
+        self.email_queue = Gauge(
+            "arh_email_queue_depth", "Emails handed to a background thread and not yet sent",
+            multiprocess_mode="livesum")
+
+        self.paychangu_calls = Counter(
+            "arh_paychangu_requests_total", "PayChangu API calls by outcome", ["operation", "outcome"])
+        self.paychangu_latency = Histogram(
+            "arh_paychangu_request_duration_seconds", "PayChangu call time including retries", ["operation"],
+            buckets=EXTERNAL_BUCKETS)
+
+        self.upload_bytes = Counter(
+            "arh_upload_bytes_total", "Bytes received for abstract PDFs", ["kind"])
+        self.storage_save_latency = Histogram(
+            "arh_storage_save_duration_seconds", "Time to write an upload into storage", ["backend"],
+            buckets=EXTERNAL_BUCKETS)
+
+
+def inc(metric, amount=1, **labels):
+    """Add to a counter or gauge; a no-op while metrics are disabled"""
+    if _metrics is None:
+        return
+    instrument = getattr(_metrics, metric)
+    (instrument.labels(**labels) if labels else instrument).inc(amount)
+
+
+def observe(metric, value, **labels):
+    """Record a histogram observation; a no-op while metrics are disabled"""
+    if _metrics is None:
+        return
+    instrument = getattr(_metrics, metric)
+    (instrument.labels(**labels) if labels else instrument).observe(value)
+
+
+@contextmanager
+def timed(metric, **labels):
+    """Observe how long the block takes (also when it raises)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(metric, time.perf_counter() - started, **labels)
+
+
+def _registry():
+    from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+
+    # Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR;
+    # the scrape sums them, whichever worker serves it
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+@limiter.exempt
+def metrics_view():
+    """Prometheus text exposition of this app's metrics"""
+    token = current_app.config["METRICS_AUTH_TOKEN"]
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    return Response(generate_latest(_registry()), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def init_metrics(app):
+    """Time every request per endpoint and expose /metrics"""
+    global _metrics
+    if not app.config["METRICS_ENABLED"]:
+        return
+    with _lock:
+        if _metrics is None:
+            _metrics = Metrics()
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        _metrics.http_in_progress.inc()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("metrics_started")
+        if started is None or request.endpoint == "metrics":
+            return response
+        # The endpoint name ("main.get_abstracts") keeps label values bounded; unknown URLs share one
+        endpoint = request.endpoint or "unmatched"
+        _metrics.http_latency.labels(request.method, endpoint).observe(time.perf_counter() - started)
+        _metrics.http_requests.labels(request.method, endpoint, str(response.status_code)).inc()
+        if response.status_code == 429:
+            _metrics.rate_limited.labels(endpoint).inc()
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        if g.pop("metrics_started", None) is not None:
+            _metrics.http_in_progress.dec()
+
+    app.add_url_rule(app.config["METRICS_PATH"], "metrics", metrics_view)
@@ -5,16 +5,21 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 
 class Users(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
+    id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(80), unique=True, index=True)
     fullname = db.Column(db.String(225), nullable=False)
     country = db.Column(db.String(64), nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
-    last_seen = db.Column(db.DateTime, default=datetime.now(timezone.utc), index=True)
-    role = db.Column(db.String(64), index=True, default='student')
+    last_seen = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    role = db.Column(db.String(64), default='student')
     abstracts = db.relationship('Abstracts', backref='author', lazy='dynamic')
     notifications = db.relationship('Notifications', backref='user', lazy='dynamic')
 
+    __table_args__ = (
+        # flask import-abstracts matches author emails case-insensitively
+        db.Index('ix_users_email_lower', db.func.lower(email)),
+    )
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
@@ -26,37 +31,56 @@ class Users(UserMixin, db.Model):
 
 
 class Abstracts(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
+    id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(256), nullable=False)
     # Content can be either text or file path to PDF
     content = db.Column(db.Text, nullable=True)  # Text abstract
     file_path = db.Column(db.String(512), nullable=True)  # PDF file path
     file_type = db.Column(db.String(10), nullable=False, default='text')  # 'text' or 'pdf'
     field = db.Column(db.String(80), index=True, nullable=False)
-    institution = db.Column(db.String(128), index=True, nullable=False)
+    institution = db.Column(db.String(128), nullable=False)
     country = db.Column(db.String(50), index=True, nullable=False)
     year = db.Column(db.Integer, index=True, nullable=False)
-    keywords = db.Column(db.String(256), nullable=True, index=True)
-    status = db.Column(db.String(15), default='pending', index=True)
-    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    date_submitted = db.Column(db.DateTime, index=True, default=datetime.now(timezone.utc))
+    keywords = db.Column(db.String(256), nullable=True)
+    status = db.Column(db.String(15), default='pending')
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    date_submitted = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Bumped on every ORM or Core UPDATE; the dashboard's ?since= delta sync reads it
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc), server_default=db.text("(CURRENT_TIMESTAMP)"))
+
+    __table_args__ = (
+        # Public listing/search and the admin queue filter on status, newest first
+        db.Index('ix_abstracts_status_date_submitted', 'status', 'date_submitted'),
+        # A student's abstracts, and those changed since a sync watermark (replaces ix_abstracts_author_id)
+        db.Index('ix_abstracts_author_id_updated_at', 'author_id', 'updated_at'),
+    )
 
     def __repr__(self):
         return f'<Abstract: {self.title}, Abstract ID: {self.id} Status: {self.status}>'
 
 
 class Payments(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
-    abstract_id = db.Column(db.Integer, db.ForeignKey('abstracts.id'), index=True)
+    id = db.Column(db.Integer, primary_key=True)
+    abstract_id = db.Column(db.Integer, db.ForeignKey('abstracts.id'))
     amount = db.Column(db.Float, default=1.99, nullable=False)
     currency = db.Column(db.String(64), default='USD')
-    status = db.Column(db.String(64), default='pending', index=True)
-    payment_date = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    status = db.Column(db.String(64), default='pending')
+    payment_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     method = db.Column(db.String(64), default='PayChangu', nullable=False)
     abstract = db.relationship('Abstracts', backref=db.backref('payments', lazy=True))
-    transaction_id = db.Column(db.String(128), nullable=False)
+    transaction_id = db.Column(db.String(128), nullable=False, index=True)
     payment_link = db.Column(db.String(255), nullable=False)
     invoice = db.relationship('Invoices', backref='payment', uselist=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc), server_default=db.text("(CURRENT_TIMESTAMP)"))
+
+    __table_args__ = (
+        # Reconciliation sweeps pending payments oldest first
+        db.Index('ix_payments_status_payment_date', 'status', 'payment_date'),
+        # Payment initiation looks up an abstract's pending/confirmed payments
+        db.Index('ix_payments_abstract_id_status', 'abstract_id', 'status'),
+    )
 
     def __repr__(self):
         return f'''<Payment ID: {self.id}, Abstract ID: {self.abstract_id}, Currency: {self.currency}\n,
@@ -64,15 +88,15 @@ class Payments(db.Model):
 
 
 class Invoices(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
+    id = db.Column(db.Integer, primary_key=True)
     abstract_id = db.Column(db.Integer, db.ForeignKey('abstracts.id'), index=True)
-    invoice_url = db.Column(db.String(255), index=True, nullable=False)
+    invoice_url = db.Column(db.String(255), nullable=False)
     amount = db.Column(db.Float, default=1.99, nullable=False)
-    generated_date = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-    due_date = db.Column(db.DateTime, default=datetime.now(timezone.utc) + timedelta(weeks=2), nullable=True)
-    paid = db.Column(db.Boolean, default=False, index=True)
+    generated_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    due_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc) + timedelta(weeks=2), nullable=True)
+    paid = db.Column(db.Boolean, default=False)
     abstract = db.relationship('Abstracts', backref=db.backref('invoices', lazy=True))
-    payment_id = db.Column(db.Integer, db.ForeignKey('payments.id'), nullable=True)
+    payment_id = db.Column(db.Integer, db.ForeignKey('payments.id'), nullable=True, index=True)
 
     def __repr__(self):
         return f'''<Invoice ID: {self.id}, Abstract ID: {self.abstract_id}, Generated At: {self.generated_date},
@@ -80,53 +104,98 @@ class Invoices(db.Model):
 
 
 class Feedback(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
+    id = db.Column(db.Integer, primary_key=True)
     abstract_id = db.Column(db.Integer, db.ForeignKey('abstracts.id'), index=True)
     admin_id = db.Column(db.Integer, index=True)
     comment = db.Column(db.String(255), nullable=False)
-    created_at = db.Column(db.DateTime, index=True, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, index=True, default=lambda: datetime.now(timezone.utc))
 
     def __repr__(self):
         return f"<Feedback ID: {self.id}, Abstract ID: {self.abstract_id}, Admin ID: {self.admin_id}, Created At: {self.created_at}>"
 
 
 class Notifications(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     message = db.Column(db.String(255), nullable=False)
     read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, nullable=False, index=True,
+                           default=lambda: datetime.now(timezone.utc), server_default=db.text("(CURRENT_TIMESTAMP)"))
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc), server_default=db.text("(CURRENT_TIMESTAMP)"))
+
+    __table_args__ = (
+        # Dashboards list a user's notifications and count the unread ones
+        db.Index('ix_notifications_user_id_read', 'user_id', 'read'),
+        # Notifications changed since a sync watermark
+        db.Index('ix_notifications_user_id_updated_at', 'user_id', 'updated_at'),
+    )
 
     def __repr__(self):
         return f"<Notification ID: {self.id}, User ID: {self.user_id}, Read: {self.read}>"
 
 
+class UserStats(db.Model):
+    """
+    Per-user counters for the dashboard stats block, kept in step by app/user_stats.py
+    in the same transaction as the writes they count
+    """
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    total_abstracts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_abstracts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    approved_abstracts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rejected_abstracts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    published_abstracts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f"<UserStats User ID: {self.user_id}, Abstracts: {self.total_abstracts}, Unread: {self.unread_notifications}>"
+
+
+class NotificationsArchive(db.Model):
+    """Notifications moved out of the live table by the retention job (flask purge-data)"""
+    __tablename__ = 'notifications_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # id from notifications
+    user_id = db.Column(db.Integer, nullable=True, index=True)
+    message = db.Column(db.String(255), nullable=False)
+    read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<Archived Notification ID: {self.id}, User ID: {self.user_id}, Archived At: {self.archived_at}>"
+
+
 class BlogPosts(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
+    id = db.Column(db.Integer, primary_key=True)
     author = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
     body = db.Column(db.String(510), nullable=False)
-    created_at = db.Column(db.DateTime, index=True, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, index=True, default=lambda: datetime.now(timezone.utc))
 
     def __repr__(self):
         return f"<BlogPost ID: {self.id}, Author: {self.author}, Created At: {self.created_at}>"
 
 
 class Contact(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
+    id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), nullable=False)
     email = db.Column(db.String(128), nullable=False, index=True)
     message = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, index=True, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, index=True, default=lambda: datetime.now(timezone.utc))
 
     def __repr__(self):
         return f"<Contact ID: {self.id}, Name: {self.name}, Email: {self.email}, Created At: {self.created_at}>"
 
 
 class Reviews(db.Model):
-    id = db.Column(db.Integer, primary_key=True, index=True)
+    id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     rating = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, index=True, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, index=True, default=lambda: datetime.now(timezone.utc))
     user = db.relationship('Users', backref=db.backref('reviews', lazy=True))
 
     def to_dict(self):
@@ -143,29 +212,64 @@ class Reviews(db.Model):
 
 
 class PasswordResetToken(db.Model):
-    """Stores password reset tokens with expiry"""
+    """Stores password reset tokens with expiry (only the SHA-256 of the emailed JWT)"""
     __tablename__ = 'password_reset_tokens'
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    token = db.Column(db.String(500), unique=True, nullable=False, index=True)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)  # hex SHA-256
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime, nullable=False)
     used = db.Column(db.Boolean, default=False)
     user = db.relationship('Users', backref='reset_tokens')
 
     def __repr__(self):
-        return f'<PasswordResetToken {self.token[:20]}... for user {self.user_id}>'
+        return f'<PasswordResetToken {self.token_hash[:12]}... for user {self.user_id}>'
 
     def is_expired(self):
         """Check if token has expired"""
-        return datetime.now(timezone.utc) > self.expires_at
+        # expires_at is stored naive (UTC)
+        return datetime.now(timezone.utc).replace(tzinfo=None) > self.expires_at.replace(tzinfo=None)
 
     def is_valid(self):
         """Check if token is valid (not used and not expired)"""
         return not self.used and not self.is_expired()
 
 
+class IdempotencyKeys(db.Model):
+    """Stored responses for requests sent with an Idempotency-Key header"""
+    __tablename__ = 'idempotency_keys'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    key = db.Column(db.String(128), nullable=False)
+    endpoint = db.Column(db.String(128), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)  # None while the first request is in flight
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_id_key'),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key} for user {self.user_id}, Status: {self.status_code}>"
+
+
+class RevokedTokens(db.Model):
+    """Revoked bearer/refresh token ids (jti), kept until the token would have expired anyway"""
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(32), primary_key=True)
+    token_type = db.Column(db.String(10), nullable=False)  # 'access' or 'refresh'
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti} ({self.token_type}), Expires At: {self.expires_at}>"
+
+
 @login.user_loader
 def load_user(id):
     return Users.query.get(int(id))
@@ -0,0 +1,70 @@
+# Set-based notification writes: broadcast fan-out and mark-as-read
+
+from sqlalchemy import insert, select, update
+
+from app.extensions import db
+from app.models import Abstracts, Notifications, Users
+from app.user_stats import get_user_stats, notifications_added, notifications_read
+
+MAX_MESSAGE_LENGTH = 255
+
+
+def recipients_query(role="student", country=None, abstract_status=None, user_ids=None):
+    """SELECT of user ids matching the broadcast filters (all filters are optional and ANDed)"""
+    query = select(Users.id)
+    if role:
+        query = query.where(Users.role == role)
+    if country:
+        query = query.where(Users.country == country)
+    if abstract_status:
+        query = query.where(
+            select(Abstracts.id)
+            .where(Abstracts.author_id == Users.id, Abstracts.status == abstract_status)
+            .exists()
+        )
+    if user_ids is not None:
+        # An empty list selects nobody rather than dropping the filter
+        query = query.where(Users.id.in_(user_ids))
+    return query
+
+
+def broadcast_notification(message, **filters):
+    """
+    Create one notification per matching user with a single INSERT ... SELECT,
+    so the rows never pass through Python. Commits; returns the number created.
+    """
+    recipients = recipients_query(**filters)
+    subquery = recipients.subquery()
+    result = db.session.execute(
+        insert(Notifications).from_select(
+            ["user_id", "message", "read"],
+            select(subquery.c.id, db.literal(message, db.String), db.false()),
+        )
+    )
+    notifications_added(recipients)
+    db.session.commit()
+    return result.rowcount
+
+
+def mark_notifications_read(user_id, ids=None):
+    """
+    Mark a user's unread notifications (all, or only `ids`) as read with one UPDATE.
+    Ids belonging to other users are ignored. Commits; returns the number updated.
+    """
+    query = (
+        update(Notifications)
+        .where(Notifications.user_id == user_id, Notifications.read.is_(False))
+        .values(read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if ids is not None:
+        query = query.where(Notifications.id.in_(ids))
+    result = db.session.execute(query)
+    notifications_read(user_id, result.rowcount)
+    db.session.commit()
+    return result.rowcount
+
+
+def unread_count(user_id):
+    """Unread notifications for a user, from the user_stats counters"""
+    return get_user_stats(user_id).unread_notifications
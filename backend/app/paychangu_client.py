@@ -0,0 +1,241 @@
+# Pooled, timeout-bounded PayChangu client with retries and a circuit breaker
+
+import random
+import threading
+import time
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+from app import metrics
+
+
+class PayChanguError(Exception):
+    """A PayChangu call failed (after any retries)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PayChanguUnavailable(PayChanguError):
+    """The circuit breaker is open, so the call was not attempted"""
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker: after `failure_threshold` consecutive failures
+    it opens and rejects calls for `reset_timeout` seconds, then lets a single
+    trial call through (half-open) to decide whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class PayChanguGateway:
+    """
+    Drop-in replacement for paychangu.PayChanguClient's initiate_transaction and
+    verify_transaction. Reuses keep-alive connections from a pool, bounds every
+    call with connect/read timeouts, retries transient failures with jittered
+    exponential backoff and fails fast while PayChangu is degraded.
+    """
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, secret_key, base_url="https://api.paychangu.com", connect_timeout=3.05,
+                 read_timeout=10, max_retries=2, backoff_base=0.25, backoff_max=2.0,
+                 pool_size=10, failure_threshold=5, reset_timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Authorization": f"Bearer {secret_key}",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "short_circuited": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+        }
+
+    def _count(self, **increments):
+        with self._metrics_lock:
+            for name, value in increments.items():
+                self._metrics[name] += value
+
+    def _observe_latency(self, elapsed):
+        with self._metrics_lock:
+            self._metrics["latency_total"] += elapsed
+            self._metrics["latency_max"] = max(self._metrics["latency_max"], elapsed)
+
+    def metrics(self):
+        """Snapshot of call counters, latency and breaker state"""
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        finished = snapshot["successes"] + snapshot["failures"]
+        snapshot["latency_avg"] = snapshot["latency_total"] / finished if finished else 0.0
+        snapshot["breaker_state"] = self.breaker.state
+        snapshot["consecutive_failures"] = self.breaker.failures
+        return snapshot
+
+    def _backoff(self, attempt):
+        # "Full jitter": spread retries so recovering workers don't stampede PayChangu
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _request(self, operation, method, path, idempotent, **kwargs):
+        if not self.breaker.allow():
+            self._count(short_circuited=1)
+            metrics.inc("paychangu_calls", operation=operation, outcome="short_circuited")
+            raise PayChanguUnavailable("PayChangu is temporarily unavailable")
+
+        self._count(calls=1)
+        url = f"{self.base_url}{path}"
+        started = time.perf_counter()
+        attempt = 0
+
+        while True:
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+                if response.status_code in self.RETRYABLE_STATUS and idempotent and attempt < self.max_retries:
+                    raise requests.exceptions.RetryError(f"HTTP {response.status_code}")
+                response.raise_for_status()
+                data = response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.RetryError) as e:
+                if isinstance(e, requests.exceptions.Timeout):
+                    self._count(timeouts=1)
+                # A POST is only resent when the connection failed, never after a read
+                # timeout, since PayChangu may already have created the checkout
+                retryable = idempotent or isinstance(e, requests.exceptions.ConnectionError)
+                if retryable and attempt < self.max_retries:
+                    attempt += 1
+                    self._count(retries=1)
+                    time.sleep(self._backoff(attempt))
+                    continue
+                outcome = "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection_error"
+                self._finish(operation, started, outcome, healthy=False)
+                raise PayChanguError(f"Error occurred while making the request: {e}") from e
+            except requests.exceptions.HTTPError as e:
+                # 4xx responses mean PayChangu is up; only 5xx/429 count against the breaker
+                self._finish(operation, started, "http_error", healthy=response.status_code not in self.RETRYABLE_STATUS)
+                raise PayChanguError(f"HTTP Error: {e}", status_code=response.status_code) from e
+            except ValueError as e:
+                self._finish(operation, started, "invalid_response", healthy=False)
+                raise PayChanguError("Invalid JSON response from the API") from e
+            except requests.exceptions.RequestException as e:
+                self._finish(operation, started, "connection_error", healthy=False)
+                raise PayChanguError(f"Error occurred while making the request: {e}") from e
+
+            self._finish(operation, started, "success", healthy=True)
+            return data
+
+    def _finish(self, operation, started, outcome, healthy):
+        if healthy:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        elapsed = time.perf_counter() - started
+        self._observe_latency(elapsed)
+        self._count(**({"successes": 1} if outcome == "success" else {"failures": 1}))
+        metrics.observe("paychangu_latency", elapsed, operation=operation)
+        metrics.inc("paychangu_calls", operation=operation, outcome=outcome)
+
+    def initiate_transaction(self, payment):
+        """Create a checkout; `payment` is a paychangu.models.payment.Payment"""
+        return self._request("initiate", "POST", "/payment", idempotent=False, json=payment.to_dict())
+
+    def verify_transaction(self, tx_ref):
+        """Look up a transaction by tx_ref"""
+        return self._request("verify", "GET", f"/verify-payment/{tx_ref}", idempotent=True)
+
+
+def create_paychangu_client(config):
+    """Build the PayChangu client from the PAYCHANGU_* settings"""
+    return PayChanguGateway(
+        secret_key=config["PAYCHANGU_SECRET"],
+        base_url=config["PAYCHANGU_BASE_URL"],
+        connect_timeout=config["PAYCHANGU_CONNECT_TIMEOUT"],
+        read_timeout=config["PAYCHANGU_READ_TIMEOUT"],
+        max_retries=config["PAYCHANGU_MAX_RETRIES"],
+        backoff_base=config["PAYCHANGU_BACKOFF_BASE"],
+        backoff_max=config["PAYCHANGU_BACKOFF_MAX"],
+        pool_size=config["PAYCHANGU_POOL_SIZE"],
+        failure_threshold=config["PAYCHANGU_BREAKER_THRESHOLD"],
+        reset_timeout=config["PAYCHANGU_BREAKER_RESET"],
+    )
+
+
+_client_lock = threading.Lock()
+
+
+def get_paychangu_client():
+    """The app's PayChangu client, built on first use; None when PAYCHANGU_SECRET isn't set"""
+    client = current_app.extensions.get("paychangu")
+    if client is None and current_app.config.get("PAYCHANGU_SECRET"):
+        with _client_lock:
+            client = current_app.extensions.get("paychangu")
+            if client is None:
+                client = current_app.extensions["paychangu"] = create_paychangu_client(current_app.config)
+    return client
@@ -0,0 +1,77 @@
+# Payment state transitions shared by the webhook, confirmation and reconciliation paths
+
+import hashlib
+import hmac
+from datetime import datetime, timezone
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models import Abstracts, Invoices, Payments
+from app.user_stats import abstracts_published
+
+
+def verify_webhook_signature(secret, payload, signature):
+    """Check PayChangu's HMAC-SHA256 signature of the raw request body"""
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+def mark_payment_confirmed(tx_ref, paid_at=None):
+    """
+    Confirm the payment for tx_ref, mark its invoice paid and publish the abstract,
+    all in the caller's transaction (nothing is committed here).
+
+    The pending -> confirmed flip is a conditional UPDATE, so when duplicate
+    webhooks (or a webhook and a reconciliation sweep) race, exactly one wins.
+    Returns: (payment, changed) - payment is None if tx_ref is unknown
+    """
+    paid_at = paid_at or datetime.now(timezone.utc)
+
+    result = db.session.execute(
+        update(Payments)
+        .where(Payments.transaction_id == tx_ref, Payments.status != "confirmed")
+        .values(status="confirmed", payment_date=paid_at)
+        .execution_options(synchronize_session=False)
+    )
+    payment = Payments.query.filter_by(transaction_id=tx_ref).first()
+    if payment is None or result.rowcount == 0:
+        return payment, False
+
+    # The UPDATE bypassed the identity map, so refresh what we just changed
+    db.session.refresh(payment)
+
+    # Invoices created before payments were linked to them only carry the abstract_id
+    linked = db.session.query(Invoices.id).filter_by(payment_id=payment.id).first() is not None
+    invoice_filter = (
+        Invoices.payment_id == payment.id
+        if linked
+        else db.and_(Invoices.abstract_id == payment.abstract_id, Invoices.payment_id.is_(None))
+    )
+    db.session.execute(
+        update(Invoices)
+        .where(invoice_filter)
+        .values(paid=True, payment_id=payment.id)
+        .execution_options(synchronize_session=False)
+    )
+    abstracts_published([payment.abstract_id])
+    db.session.execute(
+        update(Abstracts)
+        .where(Abstracts.id == payment.abstract_id)
+        .values(status="published")
+        .execution_options(synchronize_session=False)
+    )
+    return payment, True
+
+
+def mark_payment_failed(tx_ref, status="failed"):
+    """Move a still-pending payment to a terminal failure status; returns True if it changed"""
+    result = db.session.execute(
+        update(Payments)
+        .where(Payments.transaction_id == tx_ref, Payments.status == "pending")
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
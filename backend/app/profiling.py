@@ -0,0 +1,190 @@
+# On-demand request profiling: cProfile + SQL timings for sampled or admin-flagged requests
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app, g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from app.sql_metrics import QueryStats, install_listeners
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_NAME = re.compile(r"^[\w.-]+$")
+
+# cProfile (sys.monitoring since Python 3.12) allows one active profiler per process,
+# so a request that arrives while another is being profiled just runs normally
+_profiler_lock = threading.Lock()
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt="request-profiling")
+
+
+def issue_profile_token(admin_id):
+    """Signed value for the X-Profile-Token header, valid PROFILING_TOKEN_TTL seconds"""
+    return _serializer().dumps({"admin": admin_id})
+
+
+def _token_admin(token):
+    try:
+        return _serializer().loads(token, max_age=current_app.config["PROFILING_TOKEN_TTL"])["admin"]
+    except (BadSignature, KeyError, TypeError):
+        return None
+
+
+def _should_profile():
+    """Return why this request should be profiled ("header" / "sample"), or None"""
+    config = current_app.config
+    token = request.headers.get(PROFILE_HEADER)
+    if token:
+        if _token_admin(token) is not None:
+            return "header"
+        current_app.logger.warning(f"Ignoring invalid {PROFILE_HEADER} on {request.path}")
+
+    endpoints = config["PROFILING_ENDPOINTS"]
+    if endpoints and request.endpoint not in endpoints:
+        return None
+    rate = config["PROFILING_SAMPLE_RATE"]
+    if rate and random.random() < rate:
+        return "sample"
+    return None
+
+
+def profile_dir():
+    directory = current_app.config["PROFILING_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def list_profiles():
+    """Metadata of the captured profiles, newest first"""
+    directory = profile_dir()
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda p: p["name"], reverse=True)
+
+
+def profile_summary(name, limit=40, sort="cumulative"):
+    """pstats text report of a captured profile"""
+    stream = io.StringIO()
+    pstats.Stats(profile_path(name, "prof"), stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def profile_path(name, extension):
+    """Path of a captured profile's .prof or .json file; raises FileNotFoundError"""
+    if not PROFILE_NAME.match(name):
+        raise FileNotFoundError(name)
+    path = os.path.join(profile_dir(), f"{name}.{extension}")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(name)
+    return path
+
+
+def _rotate(directory, keep):
+    # Names start with a UTC timestamp, so sorting them orders by capture time
+    names = sorted(n[:-5] for n in os.listdir(directory) if n.endswith(".json"))
+    for name in names[:-keep] if keep else []:
+        for extension in ("json", "prof"):
+            try:
+                os.remove(os.path.join(directory, f"{name}.{extension}"))
+            except FileNotFoundError:
+                pass
+
+
+def _save_profile(profiler, stats, reason, response, elapsed):
+    config = current_app.config
+    directory = profile_dir()
+    endpoint = request.endpoint or "unmatched"
+    name = (f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S.%fZ')}"
+            f"_{endpoint.replace('.', '-')}_{os.getpid()}_{secrets.token_hex(2)}")
+    profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+
+    metadata = {
+        "name": name,
+        "reason": reason,
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": endpoint,
+        "status": response.status_code,
+        "duration_ms": round(elapsed * 1000, 2),
+        "sql": {
+            "queries": stats.count,
+            "duration_ms": round(stats.duration * 1000, 2),
+            "slowest": [
+                {"statement": shape[:1000], "count": count, "duration_ms": round(total * 1000, 2)}
+                for shape, count, total in stats.slowest(config["PROFILING_SQL_STATEMENTS"])
+            ],
+        },
+        "pid": os.getpid(),
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # Written last: a profile is listed only once both files exist
+    with open(os.path.join(directory, f"{name}.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+    _rotate(directory, config["PROFILING_MAX_PROFILES"])
+    current_app.logger.info(f"Profiled {request.method} {request.path} ({reason}): {name}")
+
+
+def init_profiling(app):
+    """Profile sampled requests, or any request carrying a valid X-Profile-Token"""
+    if not app.config["PROFILING_ENABLED"]:
+        return
+    install_listeners()
+
+    @app.before_request
+    def start_profiler():
+        reason = _should_profile()
+        if reason is None or not _profiler_lock.acquire(blocking=False):
+            return
+        # Reuse the per-request SQL stats from sql_metrics when they're on
+        if g.get("sql_stats") is None:
+            g.sql_stats = QueryStats()
+            g.profiling_owns_sql_stats = True
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Some other profiler (e.g. one run by hand) owns sys.monitoring
+            _profiler_lock.release()
+            return
+        g.profiling = (profiler, reason, time.perf_counter())
+
+    @app.after_request
+    def save_profile(response):
+        profiling = g.pop("profiling", None)
+        if profiling is None:
+            return response
+        profiler, reason, started = profiling
+        profiler.disable()
+        _profiler_lock.release()
+        stats = g.pop("sql_stats") if g.pop("profiling_owns_sql_stats", False) else g.get("sql_stats")
+        try:
+            _save_profile(profiler, stats or QueryStats(), reason, response, time.perf_counter() - started)
+        except OSError as e:
+            current_app.logger.error(f"Failed to save profile: {e}")
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        # The request failed before after_request ran
+        profiling = g.pop("profiling", None)
+        if profiling is not None:
+            profiling[0].disable()
+            _profiler_lock.release()
@@ -0,0 +1,285 @@
+# Background reconciliation of payments stuck in "pending"
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import insert, select, tuple_, update
+
+from app.email_service import send_payment_confirmation_email
+from app.events import publish_abstract_status
+from app.extensions import db
+from app.models import Abstracts, Invoices, Notifications, Payments, Users
+from app.paychangu_client import PayChanguError, PayChanguUnavailable, get_paychangu_client
+from app.user_stats import abstracts_published, notifications_added
+
+
+class RateLimiter:
+    """Token bucket shared by the verification threads (rate = calls per second)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def classify(response):
+    """Map a verify_transaction response onto the status the payment should move to"""
+    data = response.get("data") or {}
+    status = (data.get("status") or response.get("status") or "").lower()
+    if status in ("success", "successful", "paid"):
+        return "confirmed"
+    if status in ("failed", "cancelled", "canceled", "reversed"):
+        return "failed"
+    return "pending"
+
+
+def pending_batches(batch_size, older_than):
+    """
+    Yield batches of (id, transaction_id, payment_date) for pending payments,
+    oldest first, using keyset pagination on the (status, payment_date) index
+    """
+    last = None
+    while True:
+        query = (
+            select(Payments.id, Payments.transaction_id, Payments.payment_date)
+            .where(Payments.status == "pending", Payments.payment_date < older_than)
+            .order_by(Payments.payment_date, Payments.id)
+            .limit(batch_size)
+        )
+        if last is not None:
+            query = query.where(tuple_(Payments.payment_date, Payments.id) > last)
+
+        rows = db.session.execute(query).all()
+        if not rows:
+            return
+        yield rows
+        last = (rows[-1].payment_date, rows[-1].id)
+
+
+def apply_confirmations(tx_refs):
+    """
+    Bulk confirm payments, mark their invoices paid and publish their abstracts.
+    Only rows still pending are touched, so a webhook that won the race isn't redone.
+    Returns: list of (payment id, abstract id) that were confirmed here
+    """
+    if not tx_refs:
+        return []
+
+    confirmed = db.session.execute(
+        update(Payments)
+        .where(Payments.transaction_id.in_(tx_refs), Payments.status == "pending")
+        .values(status="confirmed", payment_date=datetime.now(timezone.utc))
+        .returning(Payments.id, Payments.abstract_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not confirmed:
+        return []
+
+    payment_ids = [row.id for row in confirmed]
+    abstract_ids = [row.abstract_id for row in confirmed]
+
+    db.session.execute(
+        update(Invoices)
+        .where(db.or_(
+            Invoices.payment_id.in_(payment_ids),
+            db.and_(Invoices.abstract_id.in_(abstract_ids), Invoices.payment_id.is_(None)),
+        ))
+        .values(paid=True)
+        .execution_options(synchronize_session=False)
+    )
+    abstracts_published(abstract_ids)
+    db.session.execute(
+        update(Abstracts)
+        .where(Abstracts.id.in_(abstract_ids))
+        .values(status="published")
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        insert(Notifications).from_select(
+            ["user_id", "message", "read"],
+            select(
+                Abstracts.author_id,
+                db.literal("Payment received. Your abstract '")
+                + db.func.substr(Abstracts.title, 1, 180)
+                + db.literal("' has been published!"),
+                db.false(),
+            ).where(Abstracts.id.in_(abstract_ids)),
+        )
+    )
+    authors = db.session.execute(
+        select(Abstracts.author_id, db.func.count())
+        .where(Abstracts.id.in_(abstract_ids))
+        .group_by(Abstracts.author_id)
+    ).all()
+    for author_id, count in authors:
+        notifications_added(author_id, count)
+    return [(row.id, row.abstract_id) for row in confirmed]
+
+
+def apply_status(tx_refs, status):
+    """Bulk move still-pending payments to a terminal status; returns rows changed"""
+    if not tx_refs:
+        return 0
+    result = db.session.execute(
+        update(Payments)
+        .where(Payments.transaction_id.in_(tx_refs), Payments.status == "pending")
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def send_confirmation_emails(confirmed):
+    """Email each author whose payment was confirmed by the sweep"""
+    payment_ids = [payment_id for payment_id, _ in confirmed]
+    rows = db.session.execute(
+        select(Payments.amount, Payments.currency, Users.email, Users.fullname, Invoices.id)
+        .join(Abstracts, Abstracts.id == Payments.abstract_id)
+        .join(Users, Users.id == Abstracts.author_id)
+        .outerjoin(Invoices, Invoices.payment_id == Payments.id)
+        .where(Payments.id.in_(payment_ids))
+    ).all()
+    for amount, currency, email, fullname, invoice_id in rows:
+        send_payment_confirmation_email(
+            user_email=email,
+            user_name=fullname,
+            amount=amount,
+            currency=currency,
+            invoice_id=invoice_id,
+        )
+
+
+def publish_confirmations(confirmed):
+    """Push the published status to connected authors (reaches web workers with EVENTS_BACKEND=redis)"""
+    abstract_ids = [abstract_id for _, abstract_id in confirmed]
+    rows = db.session.execute(
+        select(Abstracts.id, Abstracts.author_id).where(Abstracts.id.in_(abstract_ids))
+    ).all()
+    for abstract_id, author_id in rows:
+        publish_abstract_status(author_id, abstract_id, "published")
+
+
+def reconcile_pending_payments(batch_size=None, concurrency=None, rate_limit=None, min_age=None,
+                               expire_after=None, dry_run=False, limit=None, send_emails=True):
+    """
+    Verify pending payments against PayChangu and apply the resulting transitions.
+
+    - min_age: skip payments younger than this (seconds); the webhook usually
+      handles them, and a student may still be on the checkout page
+    - expire_after: pending payments older than this (seconds) that PayChangu
+      still reports as pending/unknown are marked "expired"
+    Returns: run report dict
+    """
+    config = current_app.config
+    batch_size = batch_size or config["RECONCILE_BATCH_SIZE"]
+    concurrency = concurrency or config["RECONCILE_CONCURRENCY"]
+    rate_limit = config["RECONCILE_RATE_LIMIT"] if rate_limit is None else rate_limit
+    min_age = config["RECONCILE_MIN_AGE"] if min_age is None else min_age
+    expire_after = config["RECONCILE_EXPIRE_AFTER"] if expire_after is None else expire_after
+
+    client = get_paychangu_client()
+    if client is None:
+        raise RuntimeError("PayChangu is not configured (PAYCHANGU_SECRET is missing)")
+
+    now = datetime.now(timezone.utc)
+    # payment_date is stored naive (UTC), so compare against naive datetimes
+    older_than = (now - timedelta(seconds=min_age)).replace(tzinfo=None)
+    expire_before = (now - timedelta(seconds=expire_after)).replace(tzinfo=None)
+
+    limiter = RateLimiter(rate_limit, burst=concurrency)
+    report = {
+        "dry_run": dry_run,
+        "batches": 0,
+        "checked": 0,
+        "confirmed": 0,
+        "failed": 0,
+        "expired": 0,
+        "still_pending": 0,
+        "errors": 0,
+        "aborted": None,
+    }
+    started = time.perf_counter()
+
+    def verify(tx_ref):
+        limiter.acquire()
+        try:
+            return tx_ref, classify(client.verify_transaction(tx_ref)), None
+        except PayChanguUnavailable as e:
+            return tx_ref, None, e
+        except PayChanguError as e:
+            # PayChangu answers 404 for checkouts the student never opened
+            return tx_ref, "unknown" if e.status_code == 404 else None, e
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for rows in pending_batches(batch_size, older_than):
+            if limit is not None:
+                rows = rows[:max(0, limit - report["checked"])]
+                if not rows:
+                    break
+
+            report["batches"] += 1
+            dates = {row.transaction_id: row.payment_date for row in rows}
+            outcomes = {"confirmed": [], "failed": [], "expired": []}
+
+            for tx_ref, outcome, error in executor.map(verify, [row.transaction_id for row in rows]):
+                report["checked"] += 1
+                if isinstance(error, PayChanguUnavailable):
+                    report["errors"] += 1
+                    report["aborted"] = "PayChangu circuit breaker is open"
+                    continue
+                if outcome is None:
+                    report["errors"] += 1
+                    continue
+                if outcome in ("pending", "unknown"):
+                    if dates[tx_ref] < expire_before:
+                        outcomes["expired"].append(tx_ref)
+                    else:
+                        report["still_pending"] += 1
+                    continue
+                outcomes[outcome].append(tx_ref)
+
+            if dry_run:
+                for status, tx_refs in outcomes.items():
+                    report[status] += len(tx_refs)
+            else:
+                try:
+                    confirmed = apply_confirmations(outcomes["confirmed"])
+                    report["confirmed"] += len(confirmed)
+                    report["failed"] += apply_status(outcomes["failed"], "failed")
+                    report["expired"] += apply_status(outcomes["expired"], "expired")
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    current_app.logger.error(f"Failed to apply reconciliation batch: {str(e)}")
+                    report["errors"] += len(rows)
+                    confirmed = []
+
+                if confirmed:
+                    publish_confirmations(confirmed)
+                if confirmed and send_emails:
+                    send_confirmation_emails(confirmed)
+
+            if report["aborted"] or (limit is not None and report["checked"] >= limit):
+                break
+
+    report["elapsed"] = time.perf_counter() - started
+    return report
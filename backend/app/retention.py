@@ -0,0 +1,176 @@
+# Retention job: set-based, chunked purges that keep the auxiliary tables small
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+
+from app.extensions import db
+from app.models import IdempotencyKeys, Notifications, NotificationsArchive, PasswordResetToken, RevokedTokens
+from app.user_stats import notifications_deleted
+
+TABLES = ("reset_tokens", "idempotency_keys", "notifications", "revoked_tokens")
+
+
+def _utcnow():
+    # Timestamps are stored naive (UTC)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def purge_in_chunks(model, condition, chunk_size, pause=0.0, archive=None, before_delete=None, dry_run=False,
+                    progress=None):
+    """
+    Delete rows of `model` matching `condition`, at most `chunk_size` per transaction.
+
+    Each chunk selects the next primary keys, optionally copies those rows with
+    INSERT ... SELECT via `archive(ids)`, runs `before_delete(ids)` in the same
+    transaction (e.g. to adjust counters), and removes them with one
+    DELETE ... WHERE id IN (...). Short transactions keep locks brief, so the
+    job can run while the site is live.
+    Returns: {"matched", "deleted", "archived", "chunks", "elapsed"}
+    """
+    stats = {"matched": 0, "deleted": 0, "archived": 0, "chunks": 0}
+    started = time.perf_counter()
+
+    if dry_run:
+        stats["matched"] = db.session.execute(select(func.count()).select_from(model).where(condition)).scalar()
+        stats["elapsed"] = time.perf_counter() - started
+        return stats
+
+    key = model.__mapper__.primary_key[0]
+    while True:
+        ids = db.session.execute(
+            select(key).where(condition).order_by(key).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        try:
+            if archive is not None:
+                stats["archived"] += archive(ids)
+            if before_delete is not None:
+                before_delete(ids)
+            result = db.session.execute(
+                delete(model).where(key.in_(ids)).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        stats["matched"] += len(ids)
+        stats["deleted"] += result.rowcount
+        stats["chunks"] += 1
+        if progress:
+            progress(model.__tablename__, stats)
+        if len(ids) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    stats["elapsed"] = time.perf_counter() - started
+    return stats
+
+
+def archive_notifications(ids):
+    """Copy notifications into notifications_archive before they are deleted"""
+    columns = ["id", "user_id", "message", "read", "created_at", "archived_at"]
+    result = db.session.execute(
+        insert(NotificationsArchive).from_select(
+            columns,
+            select(
+                Notifications.id,
+                Notifications.user_id,
+                Notifications.message,
+                Notifications.read,
+                Notifications.created_at,
+                db.literal(_utcnow(), db.DateTime),
+            ).where(Notifications.id.in_(ids)),
+        )
+    )
+    return result.rowcount
+
+
+def purge_expired_tokens(chunk_size=None, pause=0.0, dry_run=False, progress=None):
+    """Delete password reset tokens that expired more than RETENTION_RESET_TOKEN_GRACE seconds ago"""
+    config = current_app.config
+    cutoff = _utcnow() - timedelta(seconds=config["RETENTION_RESET_TOKEN_GRACE"])
+    return purge_in_chunks(
+        PasswordResetToken,
+        db.or_(PasswordResetToken.expires_at < cutoff, PasswordResetToken.used.is_(True)),
+        chunk_size or config["RETENTION_CHUNK_SIZE"],
+        pause=pause,
+        dry_run=dry_run,
+        progress=progress,
+    )
+
+
+def purge_idempotency_keys(chunk_size=None, pause=0.0, dry_run=False, progress=None):
+    """Delete idempotency keys past their expiry"""
+    return purge_in_chunks(
+        IdempotencyKeys,
+        IdempotencyKeys.expires_at < _utcnow(),
+        chunk_size or current_app.config["RETENTION_CHUNK_SIZE"],
+        pause=pause,
+        dry_run=dry_run,
+        progress=progress,
+    )
+
+
+def purge_revoked_tokens(chunk_size=None, pause=0.0, dry_run=False, progress=None):
+    """Drop revocation entries for tokens that have expired anyway"""
+    return purge_in_chunks(
+        RevokedTokens,
+        RevokedTokens.expires_at < _utcnow(),
+        chunk_size or current_app.config["RETENTION_CHUNK_SIZE"],
+        pause=pause,
+        dry_run=dry_run,
+        progress=progress,
+    )
+
+
+def purge_notifications(chunk_size=None, pause=0.0, dry_run=False, progress=None, archive=None):
+    """
+    Delete read notifications older than RETENTION_NOTIFICATIONS_READ_DAYS and any
+    older than RETENTION_NOTIFICATIONS_UNREAD_DAYS, archiving them first unless disabled
+    """
+    config = current_app.config
+    now = _utcnow()
+    condition = db.or_(
+        db.and_(
+            Notifications.read.is_(True),
+            Notifications.created_at < now - timedelta(days=config["RETENTION_NOTIFICATIONS_READ_DAYS"]),
+        ),
+        Notifications.created_at < now - timedelta(days=config["RETENTION_NOTIFICATIONS_UNREAD_DAYS"]),
+    )
+    archive = config["RETENTION_ARCHIVE_NOTIFICATIONS"] if archive is None else archive
+    return purge_in_chunks(
+        Notifications,
+        condition,
+        chunk_size or config["RETENTION_CHUNK_SIZE"],
+        pause=pause,
+        archive=archive_notifications if archive else None,
+        before_delete=notifications_deleted,
+        dry_run=dry_run,
+        progress=progress,
+    )
+
+
+PURGES = {
+    "reset_tokens": purge_expired_tokens,
+    "idempotency_keys": purge_idempotency_keys,
+    "notifications": purge_notifications,
+    "revoked_tokens": purge_revoked_tokens,
+}
+
+
+def run_retention(tables=TABLES, chunk_size=None, pause=None, dry_run=False, progress=None):
+    """Run the purge for each table; returns {table: stats}"""
+    pause = current_app.config["RETENTION_CHUNK_PAUSE"] if pause is None else pause
+    report = {}
+    for table in tables:
+        report[table] = PURGES[table](chunk_size=chunk_size, pause=pause, dry_run=dry_run, progress=progress)
+        current_app.logger.info(
+            f"Retention {table}: {report[table]['deleted']} deleted, {report[table]['archived']} archived "
+            f"in {report[table]['chunks']} chunks ({report[table]['elapsed']:.2f}s)"
+        )
+    return report
@@ -1,16 +1,61 @@
 import os
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from flask import Blueprint, current_app, jsonify, request, send_file
+from flask import Blueprint, Response, current_app, jsonify, request, send_file, stream_with_context
 from flask_login import current_user, login_required, login_user, logout_user
-from paychangu.models.payment import Payment as PaychanguPayment
-from werkzeug.security import generate_password_hash
 from werkzeug.utils import secure_filename
 
+from jwt.exceptions import InvalidTokenError
 from sqlalchemy.orm import joinedload
-from sqlalchemy.orm import joinedload
+from app import metrics
+from app.auth_tokens import bearer_token, decode_token, issue_tokens, revoke, rotate_refresh_token
+from app.dashboard import (
+    abstracts_page,
+    changes_since,
+    notifications_page,
+    page_args,
+    parse_since,
+    sync_watermark,
+)
+from app.db_routing import use_primary
+from app.events import NOTIFICATION, event_stream, publish, publish_abstract_status
 from app.extensions import db, limiter
-from app.utilities import admin_required, is_valid_email, student_required
+from app.idempotency import idempotent
+from app.notifications import (
+    MAX_MESSAGE_LENGTH,
+    broadcast_notification,
+    mark_notifications_read,
+    unread_count,
+)
+from app.payments import mark_payment_confirmed, verify_webhook_signature
+from app.profiling import PROFILE_HEADER, issue_profile_token, list_profiles, profile_path, profile_summary
+from app.slow_queries import SORT_KEYS, get_slow_query_log
+from app.storage import get_storage
+from app.user_stats import (
+    abstract_added,
+    abstract_status_changed,
+    get_user_stats,
+    notifications_added,
+    users_created,
+)
+from app.uploads import (
+    UploadError,
+    create_session,
+    discard_session,
+    finalize_session,
+    load_session,
+    open_assembled,
+    session_status,
+    write_chunk,
+)
+from app.utilities import (
+    MAX_FILE_SIZE,
+    admin_required,
+    allowed_file,
+    is_valid_email,
+    student_required,
+    validate_abstract_fields,
+)
 
 bp = Blueprint('main', __name__)
 from app.email_service import (
@@ -35,27 +80,17 @@ from app.utils.email import send_password_reset_email
 from app.utils.tokens import generate_reset_token, invalidate_token, verify_reset_token
 
 
-# File upload configuration
-UPLOAD_FOLDER = os.path.join(
-    os.path.dirname(os.path.dirname(__file__)), "uploads", "abstracts"
-)
-ALLOWED_EXTENSIONS = {"pdf"}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-
-# Ensure upload directory exists
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
-
-
 @bp.before_request
 def before_request():
-    if current_user.is_authenticated:
-        current_user.last_seen = datetime.now(timezone.utc)
-        db.session.commit()
+    # Refresh last_seen at most every LAST_SEEN_UPDATE_INTERVAL rather than committing on every request.
+    # Bearer clients are skipped (that would load the user); their last_seen moves on token refresh.
+    if current_user.is_authenticated and not getattr(current_user, "from_token", False):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        last_seen = current_user.last_seen
+        interval = current_app.config["LAST_SEEN_UPDATE_INTERVAL"]
+        if last_seen is None or (now - last_seen.replace(tzinfo=None)).total_seconds() >= interval:
+            current_user.last_seen = now
+            db.session.commit()
 
 
 @bp.route("/api/submit", methods=["POST"])
@@ -73,7 +108,8 @@ def submit_abstract():
     - keywords (optional)
     - content (optional - text abstract)
     - file (optional - PDF file)
-    Note: Either 'content' or 'file' must be provided
+    - upload_id (optional - finalized chunked upload, see /api/uploads)
+    Note: Either 'content', 'file' or 'upload_id' must be provided
     """
 
     # Get form data
@@ -85,40 +121,47 @@ def submit_abstract():
     keywords = request.form.get("keywords")
     content = request.form.get("content")  # Text abstract
 
-    # Validate required fields
-    if not all([title, field, institution, country, year]):
-        return jsonify({"error": "Missing required fields"}), 400
-
-    # Validate field value
-    allowed_fields = [
-        "Public Health",
-        "AI",
-        "Technology",
-        "Agriculture",
-        "Mining Engineering",
-    ]
-    if field not in allowed_fields:
-        return jsonify({"error": "Invalid field"}), 400
-
-    # Convert year to integer
-    try:
-        year = int(year)
-    except ValueError:
-        return jsonify({"error": "Invalid year format"}), 400
+    # Validate required fields, field value and year
+    year, error = validate_abstract_fields(title, field, country, year, institution)
+    if error:
+        return jsonify({"error": error}), 400
 
     # Check if file is uploaded
     file = request.files.get("file")
+    upload_id = request.form.get("upload_id")
     file_path = None
     file_type = "text"
 
     # Validate that either content or file is provided
-    if not content and not file:
+    if not content and not file and not upload_id:
         return jsonify(
             {"error": "Either text content or PDF file must be provided"}
         ), 400
 
+    # Claim a finalized chunked upload if one was given
+    if upload_id:
+        try:
+            upload = load_session(upload_id, current_user.id)
+            assembled = open_assembled(upload)
+        except UploadError as e:
+            return jsonify({"error": e.message}), e.status
+
+        filename = secure_filename(upload["filename"])
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique_filename = f"{current_user.id}_{timestamp}_{filename}"
+
+        storage = get_storage()
+        try:
+            with assembled, metrics.timed("storage_save_latency", backend=current_app.config["STORAGE_BACKEND"]):
+                file_path = storage.save(
+                    storage.key_for(unique_filename), assembled, content_type="application/pdf"
+                )
+            file_type = "pdf"
+        except Exception as e:
+            return jsonify({"error": f"Failed to save file: {str(e)}"}), 500
+
     # Handle file upload if present
-    if file and file.filename:
+    elif file and file.filename:
         # Validate file
         if not allowed_file(file.filename):
             return jsonify({"error": "Only PDF files are allowed"}), 400
@@ -139,17 +182,15 @@ def submit_abstract():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_filename = f"{current_user.id}_{timestamp}_{filename}"
 
-        # Create user-specific directory
-        user_upload_dir = os.path.join(UPLOAD_FOLDER, str(current_user.id))
-        os.makedirs(user_upload_dir, exist_ok=True)
-
-        # Save file
-        file_path = os.path.join(user_upload_dir, unique_filename)
+        # Save file under a hash-sharded storage key (stored as the relative path)
+        storage = get_storage()
+        metrics.inc("upload_bytes", file_size, kind="form")
         try:
-            file.save(file_path)
+            with metrics.timed("storage_save_latency", backend=current_app.config["STORAGE_BACKEND"]):
+                file_path = storage.save(
+                    storage.key_for(unique_filename), file.stream, content_type="application/pdf"
+                )
             file_type = "pdf"
-            # Store relative path for database
-            file_path = os.path.join(str(current_user.id), unique_filename)
         except Exception as e:
             return jsonify({"error": f"Failed to save file: {str(e)}"}), 500
 
@@ -169,8 +210,12 @@ def submit_abstract():
 
     try:
         db.session.add(abstract)
+        abstract_added(current_user.id)
         db.session.commit()
 
+        if upload_id:
+            discard_session(upload_id)
+
         # Send confirmation email to user
         send_abstract_confirmation_email(
             user_email=current_user.email,
@@ -190,9 +235,7 @@ def submit_abstract():
         db.session.rollback()
         # Clean up uploaded file if database insert fails
         if file_path and file_type == "pdf":
-            full_path = os.path.join(UPLOAD_FOLDER, file_path)
-            if os.path.exists(full_path):
-                os.remove(full_path)
+            get_storage().delete(file_path)
         return jsonify({"error": str(e)}), 500
 
     return jsonify(
@@ -204,6 +247,80 @@ def submit_abstract():
     ), 201
 
 
+@bp.route("/api/uploads", methods=["POST"])
+@student_required
+@limiter.limit("20 per day")
+def create_upload():
+    """
+    Start a resumable chunked upload
+    Accepts JSON with:
+    - filename (required - must be a PDF)
+    - size (required - total size in bytes)
+    Chunks are then sent with PUT /api/uploads/<upload_id>/chunks/<n>
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    filename = data.get("filename")
+    size = data.get("size")
+
+    if not all([filename, size]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    if not allowed_file(filename):
+        return jsonify({"error": "Only PDF files are allowed"}), 400
+
+    try:
+        size = int(size)
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid size"}), 400
+
+    try:
+        upload = create_session(current_user.id, secure_filename(filename), size)
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status
+
+    return jsonify(session_status(upload)), 201
+
+
+@bp.route("/api/uploads/<upload_id>", methods=["GET"])
+@student_required
+def get_upload(upload_id):
+    """Report received chunks and the contiguous offset so a client can resume"""
+    try:
+        upload = load_session(upload_id, current_user.id)
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status
+
+    return jsonify(session_status(upload)), 200
+
+
+@bp.route("/api/uploads/<upload_id>/chunks/<int:index>", methods=["PUT"])
+@student_required
+def upload_chunk(upload_id, index):
+    """Store chunk <index> (raw request body, offset = index * chunkSize)"""
+    try:
+        upload = load_session(upload_id, current_user.id)
+        write_chunk(upload, index, request.stream)
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status
+
+    return jsonify(session_status(upload)), 200
+
+
+@bp.route("/api/uploads/<upload_id>/finalize", methods=["POST"])
+@student_required
+def finalize_upload(upload_id):
+    """Assemble the uploaded chunks; the upload_id can then be passed to /api/submit"""
+    try:
+        upload = finalize_session(load_session(upload_id, current_user.id))
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status
+
+    return jsonify(session_status(upload)), 200
+
+
 @bp.route("/api/abstracts/<int:id>/download", methods=["GET"])
 def download_abstract(id):
     """Download abstract PDF file if available"""
@@ -222,14 +339,15 @@ def download_abstract(id):
     if abstract.file_type != "pdf" or not abstract.file_path:
         return jsonify({"error": "No PDF file available for this abstract"}), 404
 
-    file_path = os.path.join(UPLOAD_FOLDER, abstract.file_path)
-
-    if not os.path.exists(file_path):
+    try:
+        file = get_storage().open(abstract.file_path)
+    except FileNotFoundError:
         return jsonify({"error": "File not found"}), 404
 
     try:
+        # send_file streams the file object in chunks rather than reading it whole
         return send_file(
-            file_path,
+            file,
             mimetype="application/pdf",
             as_attachment=True,
             download_name=f"abstract_{abstract.id}_{secure_filename(abstract.title)}.pdf",
@@ -377,60 +495,30 @@ def get_specific_abstract(id):
 
 
 @bp.route("/api/user/dashboard", methods=["GET"])
+@use_primary  # payment status changes via the webhook, not this client's own writes
 @student_required
 def user_dashboard():
-    """Get student's dashboard info including their abstracts and payment status"""
+    """
+    Student dashboard: profile, stats and the first page of abstracts and notifications.
+    With ?since=<syncedAt from an earlier response>, returns only the abstracts,
+    payments and notifications changed since then.
+    """
 
     if current_user.role.lower() != "student":
         return jsonify({"error": "Student access required"}), 403
 
-    # Optimized query with eager loading to prevent N+1 problem
-    abstracts = (
-        Abstracts.query.filter_by(author_id=current_user.id)
-        .options(joinedload(Abstracts.payments), joinedload(Abstracts.invoices))
-        .all()
-    )
+    since = request.args.get("since")
+    if since:
+        try:
+            since = parse_since(since)
+        except ValueError:
+            return jsonify({"error": "Invalid since timestamp"}), 400
 
-    user_abstracts = []
-    for abstract in abstracts:
-        # Get the most recent payment/invoice if multiple exist (replicating previous behavior roughly)
-        # Note: relationships return lists. We take the first one found or None.
-        payment = abstract.payments[0] if abstract.payments else None
-        invoice = abstract.invoices[0] if abstract.invoices else None
+    # Taken before the reads so nothing committed meanwhile falls between two syncs
+    synced_at = sync_watermark()
 
-        abstract_data = {
-            "id": abstract.id,
-            "title": abstract.title,
-            "content": abstract.content if abstract.file_type == "text" else None,
-            "fileType": abstract.file_type,
-            "hasFile": abstract.file_type == "pdf",
-            "field": abstract.field,
-            "institution": abstract.institution,
-            "country": abstract.country,
-            "year": abstract.year,
-            "keywords": abstract.keywords,
-            "status": abstract.status,
-            "dateSubmitted": abstract.date_submitted.isoformat(),
-            "paymentStatus": payment.status if payment else "not_initiated",
-            "paymentAmount": payment.amount if payment else None,
-            "invoicePaid": invoice.paid if invoice else False,
-            "invoiceUrl": invoice.invoice_url if invoice else None,
-        }
-        user_abstracts.append(abstract_data)
-
-    notifications = (
-        Notifications.query.filter_by(user_id=current_user.id)
-        .order_by(Notifications.id.desc())
-        .all()
-    )
-    notification_data = [
-        {
-            "id": notification.id,
-            "message": notification.message,
-            "read": notification.read,
-        }
-        for notification in notifications
-    ]
+    # One primary-key read; the counters are maintained by app/user_stats.py
+    stats = get_user_stats(current_user.id)
 
     dashboard_data = {
         "user": {
@@ -440,46 +528,130 @@ def user_dashboard():
             "country": current_user.country,
             "role": current_user.role,
         },
-        "abstracts": user_abstracts,
-        "notifications": notification_data,
         "stats": {
-            "totalAbstracts": len(user_abstracts),
-            "pendingAbstracts": len(
-                [a for a in user_abstracts if a["status"] == "pending"]
-            ),
-            "approvedAbstracts": len(
-                [a for a in user_abstracts if a["status"] == "approved"]
-            ),
-            "rejectedAbstracts": len(
-                [a for a in user_abstracts if a["status"] == "rejected"]
-            ),
-            "unreadNotifications": len([n for n in notifications if not n.read]),
+            "totalAbstracts": stats.total_abstracts,
+            "pendingAbstracts": stats.pending_abstracts,
+            "approvedAbstracts": stats.approved_abstracts,
+            "rejectedAbstracts": stats.rejected_abstracts,
+            "publishedAbstracts": stats.published_abstracts,
+            "unreadNotifications": stats.unread_notifications,
         },
+        "syncedAt": synced_at,
     }
 
+    if since:
+        changes = changes_since(current_user.id, since)
+        if changes is None:
+            dashboard_data.update({"delta": True, "resync": True})
+        else:
+            dashboard_data.update({"delta": True, "resync": False, **changes})
+        return jsonify(dashboard_data), 200
+
+    per_page = current_app.config["DASHBOARD_PAGE_SIZE"]
+    abstracts, abstracts_pagination = abstracts_page(current_user.id, 1, per_page)
+    notifications, notifications_pagination = notifications_page(current_user.id, 1, per_page)
+    dashboard_data.update({
+        "delta": False,
+        "abstracts": abstracts,
+        "notifications": notifications,
+        "pagination": {"abstracts": abstracts_pagination, "notifications": notifications_pagination},
+    })
     return jsonify(dashboard_data), 200
 
 
+@bp.route("/api/user/abstracts", methods=["GET"])
+@use_primary
+@student_required
+def user_abstracts():
+    """The student's abstracts with payment status, newest first (paginated)"""
+    page, per_page = page_args(request.args)
+    abstracts, pagination = abstracts_page(current_user.id, page, per_page)
+    return jsonify({"abstracts": abstracts, "pagination": pagination}), 200
+
+
+@bp.route("/api/user/notifications", methods=["GET"])
+@use_primary
+@student_required
+def user_notifications():
+    """The student's notifications, newest first (paginated; ?unread=true for unread only)"""
+    page, per_page = page_args(request.args)
+    unread_only = request.args.get("unread", "").lower() in ["true", "1"]
+    notifications, pagination = notifications_page(current_user.id, page, per_page, unread_only)
+    return jsonify({"notifications": notifications, "pagination": pagination}), 200
+
+
+@bp.route("/api/notifications/read", methods=["POST"])
+@student_required
+def mark_read():
+    """Mark all of the student's notifications read, or only the given ids"""
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids")
+    if ids is not None and (
+        not isinstance(ids, list)
+        or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+    ):
+        return jsonify({"error": "ids must be a list of notification ids"}), 400
+
+    try:
+        updated = mark_notifications_read(current_user.id, ids)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    unread = unread_count(current_user.id)
+    # Keeps the badge in step across the student's other tabs
+    publish(current_user.id, "notifications_read", {"unreadNotifications": unread})
+    return jsonify({"updated": updated, "unreadNotifications": unread}), 200
+
+
+@bp.route("/api/events", methods=["GET"])
+@use_primary  # a replica may not have the notification the event announced yet
+@student_required
+def events():
+    """Server-Sent Events stream of new notifications and abstract status changes"""
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    response = Response(
+        stream_with_context(event_stream(current_user.id, last_event_id)),
+        mimetype="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 @bp.route("/api/admin", methods=["GET"])
 @admin_required
 def admin_dashboard():
     """Get admin dashboard with overview statistics"""
-    # Get all abstracts with counts by status
-    abstracts = Abstracts.query.all()
+    # Count abstracts and payments by status in the database instead of loading every row
+    abstract_counts = dict(
+        db.session.query(Abstracts.status, db.func.count(Abstracts.id)).group_by(Abstracts.status).all()
+    )
+    payment_counts = dict(
+        db.session.query(Payments.status, db.func.count(Payments.id)).group_by(Payments.status).all()
+    )
 
     stats = {
-        "totalAbstracts": len(abstracts),
-        "pendingAbstracts": len([a for a in abstracts if a.status == "pending"]),
-        "approvedAbstracts": len([a for a in abstracts if a.status == "approved"]),
-        "rejectedAbstracts": len([a for a in abstracts if a.status == "rejected"]),
+        "totalAbstracts": sum(abstract_counts.values()),
+        "pendingAbstracts": abstract_counts.get("pending", 0),
+        "approvedAbstracts": abstract_counts.get("approved", 0),
+        "rejectedAbstracts": abstract_counts.get("rejected", 0),
         "totalUsers": Users.query.count(),
-        "totalPayments": Payments.query.filter_by(status="confirmed").count(),
-        "pendingPayments": Payments.query.filter_by(status="pending").count(),
+        "totalPayments": payment_counts.get("confirmed", 0),
+        "pendingPayments": payment_counts.get("pending", 0),
     }
 
     # Get recent abstracts for review
     recent_abstracts = (
         Abstracts.query.filter_by(status="pending")
+        .options(joinedload(Abstracts.author))
         .order_by(Abstracts.date_submitted.desc())
         .limit(10)
         .all()
@@ -499,9 +671,26 @@ def admin_dashboard():
     return jsonify({"stats": stats, "recentAbstracts": recent_abstracts_data}), 200
 
 
+def payment_initiated_response(payment, invoice, reused=False):
+    """Response body for initiate_payment, shared by new and reused checkouts"""
+    return {
+        "message": "Payment initiated",
+        "invoiceId": invoice.id if invoice else None,
+        "invoiceUrl": invoice.invoice_url if invoice else payment.payment_link,
+        "paymentId": payment.id,
+        "amount": payment.amount,
+        "currency": payment.currency,
+        "status": payment.status,
+        "method": payment.method,
+        "payment_link": payment.payment_link,
+        "reused": reused,
+    }
+
+
 @bp.route("/api/payments/initiate", methods=["POST"])
 @student_required
 @limiter.limit("10 per hour")
+@idempotent
 def initiate_payment():
     data = request.get_json()
     if not data:
@@ -520,28 +709,65 @@ def initiate_payment():
     abstract = Abstracts.query.get(abstract_id)
     if not abstract:
         return jsonify({"error": "Abstract not found"}), 404
+    if abstract.author_id != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    if Payments.query.filter_by(abstract_id=abstract_id, status="confirmed").first():
+        return jsonify({"error": "Abstract already paid"}), 400
+
+    # Reuse a recent pending checkout rather than opening another one with PayChangu
+    checkout_cutoff = datetime.now(timezone.utc) - timedelta(seconds=current_app.config["PAYMENT_CHECKOUT_TTL"])
+    pending = (
+        Payments.query.filter(
+            Payments.abstract_id == abstract_id,
+            Payments.status == "pending",
+            Payments.currency == currency,
+            Payments.payment_date > checkout_cutoff.replace(tzinfo=None),
+        )
+        .order_by(Payments.payment_date.desc())
+        .first()
+    )
+    if pending:
+        return jsonify(payment_initiated_response(pending, pending.invoice, reused=True)), 200
+
+    # The PayChangu SDK and the HTTP client stack are loaded by the first payment, not at worker boot
+    from paychangu.models.payment import Payment as PaychanguPayment
+    from app.paychangu_client import PayChanguError, PayChanguUnavailable, get_paychangu_client
+
+    client = get_paychangu_client()
+    if client is None:
+        return jsonify({"error": "Payment service is not configured"}), 503
 
     # Initiate PayChangu payment
+    tx_ref = f"abstract_{abstract_id}_{int(datetime.now().timestamp())}"
+    first_name, _, last_name = current_user.fullname.partition(" ")
     paychangu_payment = PaychanguPayment(
         amount=amount,
         currency=currency,
         email=current_user.email,
+        first_name=first_name,
+        last_name=last_name or None,
         callback_url=f"{current_app.config['PAYCHANGU_CALLBACK_URL']}",
         return_url=f"{current_app.config['WEBSITE_URL']}/student",
-        tx_ref=f"abstract_{abstract_id}_{int(datetime.now().timestamp())}",
+        tx_ref=tx_ref,
         customization={
             "title": "African Research Hub Abstract Payment",
             "description": f"Payment for publishing abstract ID {abstract_id}",
         },
     )
 
-    response = current_app.paychangu_client.initiate_transaction(paychangu_payment)
+    try:
+        response = client.initiate_transaction(paychangu_payment)
+    except PayChanguUnavailable:
+        return jsonify({"error": "Payment service is temporarily unavailable, please try again shortly"}), 503
+    except PayChanguError as e:
+        return jsonify({"error": "Failed to initiate payment", "details": str(e)}), 502
 
-    if response.status != "success":
+    if response.get("status") != "success":
         return jsonify({"error": "Failed to initiate payment"}), 500
 
     payment_link = response["data"]["checkout_url"]
-    transaction_id = response["data"]["tx_ref"]
+    transaction_id = tx_ref
 
     # Create Payment
     payment = Payments(
@@ -560,6 +786,7 @@ def initiate_payment():
     invoice = Invoices(
         abstract_id=abstract_id,
         invoice_url=invoice_url,
+        payment=payment,
     )
 
     try:
@@ -569,24 +796,87 @@ def initiate_payment():
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-    return jsonify(
-        {
-            "message": "Payment initiated",
-            "invoiceId": invoice.id,
-            "invoiceUrl": invoice.invoice_url,
-            "paymentId": payment.id,
-            "amount": payment.amount,
-            "currency": payment.currency,
-            "status": payment.status,
-            "method": payment.method,
-            "payment_link": payment.payment_link,
-        }
-    ), 201
+    return jsonify(payment_initiated_response(payment, invoice)), 201
+
+
+@bp.route("/api/payments/callback", methods=["POST"])
+def payment_webhook():
+    """
+    PayChangu webhook: confirms the payment, marks the invoice paid and publishes
+    the abstract in one transaction. Safe to deliver more than once per tx_ref.
+    """
+    payload = request.get_data()
+    if not verify_webhook_signature(
+        current_app.config.get("PAYCHANGU_WEBHOOK_SECRET"),
+        payload,
+        request.headers.get("Signature"),
+    ):
+        return jsonify({"error": "Invalid signature"}), 401
+
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    tx_ref = data.get("tx_ref")
+    if not tx_ref:
+        return jsonify({"error": "Missing tx_ref"}), 400
+
+    # Only successful charges change anything; acknowledge the rest
+    if data.get("status") != "success":
+        return jsonify({"message": "Event ignored", "tx_ref": tx_ref}), 200
+
+    payment = Payments.query.filter_by(transaction_id=tx_ref).first()
+    if not payment:
+        return jsonify({"error": "Payment not found"}), 404
+
+    if data.get("currency") and data.get("currency") != payment.currency:
+        current_app.logger.warning(f"Webhook currency mismatch for {tx_ref}: {data.get('currency')}")
+        return jsonify({"error": "Currency mismatch"}), 400
+    try:
+        if data.get("amount") is not None and float(data["amount"]) < payment.amount:
+            current_app.logger.warning(f"Webhook amount mismatch for {tx_ref}: {data['amount']}")
+            return jsonify({"error": "Amount mismatch"}), 400
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid amount"}), 400
+
+    try:
+        payment, changed = mark_payment_confirmed(tx_ref)
+        if not changed:
+            db.session.rollback()
+            return jsonify({"message": "Payment already confirmed", "tx_ref": tx_ref}), 200
+
+        abstract = db.session.get(Abstracts, payment.abstract_id)
+        db.session.add(Notifications(
+            user_id=abstract.author_id,
+            message=f"Payment received. Your abstract '{abstract.title}' has been published!",
+        ))
+        notifications_added(abstract.author_id)
+        db.session.commit()
+        publish_abstract_status(abstract.author_id, abstract.id, "published")
+
+        invoice = payment.invoice or Invoices.query.filter_by(abstract_id=payment.abstract_id).first()
+        send_payment_confirmation_email(
+            user_email=abstract.author.email,
+            user_name=abstract.author.fullname,
+            amount=payment.amount,
+            currency=payment.currency,
+            invoice_id=invoice.id if invoice else None,
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({"message": "Payment confirmed", "tx_ref": tx_ref}), 200
 
 
 @bp.route("/api/payments/confirm", methods=["POST"])
 @student_required
 def confirm_payment():
+    """
+    Report a payment's status. Confirmation itself happens through the PayChangu
+    webhook (or the reconciliation job), so this is a local read only.
+    """
     data = request.get_json()
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -595,76 +885,165 @@ def confirm_payment():
     if not transaction_id:
         return jsonify({"error": "Missing transaction_id"}), 400
 
-    # Check if payment exists
-    payment = Payments.query.filter_by(transaction_id=transaction_id).first()
+    payment = (
+        Payments.query.filter_by(transaction_id=transaction_id)
+        .options(joinedload(Payments.abstract))
+        .first()
+    )
     if not payment:
         return jsonify({"error": "Payment not found"}), 404
 
     # Check abstract ownership
-    abstract = Abstracts.query.get(payment.abstract_id)
-    if abstract.author_id != current_user.id:
+    if payment.abstract.author_id != current_user.id:
         return jsonify(
             {"error": "Unauthorized: You can only confirm your own payments"}
         ), 403
 
-    # Check if payment is already confirmed to avoid hitting paychangu API rate-limits
-    if payment.status == "confirmed":
-        return jsonify({"error": "Payment already confirmed"}), 400
+    messages = {
+        "confirmed": "Payment confirmed",
+        "pending": "Payment is still pending",
+    }
+    return jsonify(
+        {
+            "message": messages.get(payment.status, f"Payment {payment.status}"),
+            "payment_id": payment.id,
+            "status": payment.status,
+            "abstractStatus": payment.abstract.status,
+            "payment_date": payment.payment_date.isoformat() if payment.status == "confirmed" else None,
+        }
+    ), 200
 
-    # Check payment status via PayChangu
-    try:
-        payment_check = current_app.paychangu_client.verify_transaction(transaction_id)
-    except Exception as e:
-        return jsonify({"error": "Payment verification failed", "details": str(e)}), 500
 
-    if (payment_check.status != "success") and (
-        current_user.email != payment_check.data.customer.email
-    ):
-        return jsonify(
-            {"error": "Payment not successful or still pending or email mismatch"}
-        ), 400
+@bp.route("/api/admin/paychangu", methods=["GET"])
+@admin_required
+def paychangu_metrics():
+    """PayChangu client call counters, latency and circuit breaker state"""
+    from app.paychangu_client import get_paychangu_client
 
-    user = Users.query.get(abstract.author_id)
+    client = get_paychangu_client()
+    if client is None:
+        return jsonify({"error": "PayChangu is not configured"}), 404
 
-    # Update payment status, date, and invoice paid status
-    payment.status = "confirmed"
-    payment.payment_date = datetime.now(timezone.utc)
+    return jsonify(client.metrics()), 200
 
-    # Publish abstract after payment
-    abstract.status = "published"
 
-    abstract_id = payment.abstract_id
-    invoice = Invoices.query.filter_by(abstract_id=abstract_id).first()
+@bp.route("/api/admin/profiles/token", methods=["POST"])
+@admin_required
+def create_profile_token():
+    """Signed X-Profile-Token value: requests sending it are profiled"""
+    if not current_app.config["PROFILING_ENABLED"]:
+        return jsonify({"error": "Profiling is disabled (PROFILING_ENABLED)"}), 409
 
-    if not invoice:
-        return jsonify({"error": "Invoice not found"}), 404
+    return jsonify({
+        "header": PROFILE_HEADER,
+        "token": issue_profile_token(current_user.id),
+        "expiresIn": current_app.config["PROFILING_TOKEN_TTL"],
+    }), 201
 
-    invoice.paid = True
 
+@bp.route("/api/admin/profiles", methods=["GET"])
+@admin_required
+def get_profiles():
+    """Captured request profiles, newest first"""
+    return jsonify({"profiles": list_profiles()}), 200
+
+
+@bp.route("/api/admin/profiles/<name>", methods=["GET"])
+@admin_required
+def get_profile(name):
+    """
+    Download a captured profile (.prof, for pstats or snakeviz),
+    or ?format=text for a pstats summary and ?format=json for its metadata and SQL timings
+    """
+    fmt = request.args.get("format", "prof")
     try:
-        db.session.commit()
+        if fmt == "text":
+            sort = request.args.get("sort", "cumulative")
+            if sort not in ("cumulative", "tottime", "calls"):
+                return jsonify({"error": "sort must be cumulative, tottime or calls"}), 400
+            return Response(profile_summary(name, sort=sort), mimetype="text/plain")
+        if fmt == "json":
+            return send_file(profile_path(name, "json"), mimetype="application/json")
+        if fmt == "prof":
+            return send_file(profile_path(name, "prof"), as_attachment=True, download_name=f"{name}.prof")
+    except FileNotFoundError:
+        return jsonify({"error": "Profile not found"}), 404
+
+    return jsonify({"error": "format must be prof, text or json"}), 400
+
+
+@bp.route("/api/admin/slow-queries", methods=["GET"])
+@admin_required
+def get_slow_queries():
+    """
+    The most expensive statement fingerprints seen by this worker process,
+    ?sort=total_ms|p95_ms|max_ms|count|slow (default total_ms), ?limit= (default 20)
+    """
+    log = get_slow_query_log()
+    if log is None:
+        return jsonify({"error": "Slow-query log is disabled (SLOW_QUERY_LOG_ENABLED)"}), 404
 
-        # Send payment confirmation email
-        send_payment_confirmation_email(
-            user_email=user.email,
-            user_name=user.fullname,
-            amount=payment.amount,
-            currency=payment.currency,
-            invoice_id=invoice.id,
-        )
+    sort = request.args.get("sort", "total_ms")
+    if sort not in SORT_KEYS:
+        return jsonify({"error": f"sort must be one of: {', '.join(SORT_KEYS)}"}), 400
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+
+    return jsonify({
+        "pid": os.getpid(),
+        "since": datetime.fromtimestamp(log.started_at, timezone.utc).isoformat(),
+        "thresholdMs": current_app.config["SLOW_QUERY_THRESHOLD_MS"],
+        "fingerprints": len(log),
+        "queries": log.top(limit, sort),
+    }), 200
+
+
+@bp.route("/api/admin/slow-queries", methods=["DELETE"])
+@admin_required
+def reset_slow_queries():
+    """Clear this worker's aggregates, e.g. after deploying an index"""
+    log = get_slow_query_log()
+    if log is None:
+        return jsonify({"error": "Slow-query log is disabled (SLOW_QUERY_LOG_ENABLED)"}), 404
 
+    log.reset()
+    return jsonify({"message": "Slow-query statistics cleared"}), 200
+
+
+@bp.route("/api/admin/notifications/broadcast", methods=["POST"])
+@admin_required
+def broadcast_notifications():
+    """Send a notification to every user matching the filters"""
+    data = request.get_json(silent=True) or {}
+    message = (data.get("message") or "").strip()
+    if not message:
+        return jsonify({"error": "Missing required field: message"}), 400
+    if len(message) > MAX_MESSAGE_LENGTH:
+        return jsonify({"error": f"Message must be at most {MAX_MESSAGE_LENGTH} characters"}), 400
+
+    user_ids = data.get("userIds")
+    if user_ids is not None and (
+        not isinstance(user_ids, list)
+        or not all(isinstance(i, int) and not isinstance(i, bool) for i in user_ids)
+    ):
+        return jsonify({"error": "userIds must be a list of user ids"}), 400
+
+    try:
+        recipients = broadcast_notification(
+            message,
+            role=data.get("role", "student"),
+            country=data.get("country"),
+            abstract_status=data.get("abstractStatus"),
+            user_ids=user_ids,
+        )
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+        current_app.logger.error(f"Notification broadcast failed: {e}")
+        return jsonify({"error": "Failed to send notifications"}), 500
 
-    return jsonify(
-        {
-            "message": "Payment confirmed",
-            "payment_id": payment.id,
-            "status": payment.status,
-            "payment_date": payment.payment_date.isoformat(),
-        }
-    ), 200
+    current_app.logger.info(f"Admin {current_user.id} broadcast a notification to {recipients} users")
+    if recipients:
+        publish(None, NOTIFICATION)
+    return jsonify({"message": "Notification sent", "recipients": recipients}), 201
 
 
 @bp.route("/api/login", methods=["POST"])
@@ -708,6 +1087,59 @@ def login():
     return jsonify({"message": "You have been successfully logged in"}), 201
 
 
+@bp.route("/api/token", methods=["POST"])
+@limiter.limit("5 per minute")
+def issue_token():
+    """Exchange email and password for a bearer access token and a refresh token"""
+    data = request.get_json(silent=True) or {}
+    email = data.get("email")
+    password = data.get("password")
+
+    if not all([email, password]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    user = Users.query.filter_by(email=email).first()
+    if not user or not user.verify_password(password):
+        return jsonify({"error": "Invalid email or password"}), 401
+
+    user.last_seen = datetime.now(timezone.utc)
+    db.session.commit()
+    return jsonify({**issue_tokens(user), "role": user.role}), 200
+
+
+@bp.route("/api/token/refresh", methods=["POST"])
+@limiter.limit("30 per minute")
+def refresh_token():
+    """Trade a refresh token for a new access/refresh pair (the old refresh token stops working)"""
+    data = request.get_json(silent=True) or {}
+    if not data.get("refreshToken"):
+        return jsonify({"error": "Missing required field: refreshToken"}), 400
+
+    user, result = rotate_refresh_token(data["refreshToken"])
+    if user is None:
+        return jsonify({"error": result}), 401
+    return jsonify({**result, "role": user.role}), 200
+
+
+@bp.route("/api/token/revoke", methods=["POST"])
+def revoke_token():
+    """Log a bearer client out: revoke its refresh token and the access token sending the request"""
+    data = request.get_json(silent=True) or {}
+    revoked = 0
+    try:
+        if data.get("refreshToken"):
+            revoked += revoke(decode_token(data["refreshToken"], "refresh"))
+        access_token = bearer_token(request)
+        if access_token:
+            revoked += revoke(decode_token(access_token, "access"))
+        db.session.commit()
+    except InvalidTokenError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Invalid token: {str(e)}"}), 400
+
+    return jsonify({"message": "Tokens revoked", "revoked": revoked}), 200
+
+
 @bp.route("/api/register", methods=["POST"])
 @limiter.limit("5 per hour")
 def register():
@@ -753,6 +1185,8 @@ def register():
     user.set_password(password)
     try:
         db.session.add(user)
+        db.session.flush()
+        users_created([user.id])
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -863,6 +1297,7 @@ def review_abstract(abstract_id):
     user = Users.query.get(abstract.author_id)
 
     # Update abstract status
+    previous_status = abstract.status
     if action == "approve":
         abstract.status = "approved"
         notification_message = f"Your abstract '{abstract.title}' has been approved!"
@@ -884,7 +1319,10 @@ def review_abstract(abstract_id):
         )
 
         db.session.add(notification)
+        abstract_status_changed(abstract.author_id, previous_status, abstract.status)
+        notifications_added(abstract.author_id)
         db.session.commit()
+        publish_abstract_status(abstract.author_id, abstract.id, abstract.status)
 
         # Send email notification to user
         send_abstract_review_email(
@@ -957,7 +1395,10 @@ def resubmit_abstract(abstract_id):
             message=f"Your abstract '{abstract.title}' has been resubmitted successfully!",
         )
         db.session.add(notification)
+        abstract_status_changed(current_user.id, "rejected", "pending")
+        notifications_added(current_user.id)
         db.session.commit()
+        publish_abstract_status(current_user.id, abstract.id, abstract.status)
 
     except Exception as e:
         db.session.rollback()
@@ -1018,6 +1459,12 @@ def submit_review():
         return jsonify({"error": "Failed to save review"}), 500
 
 
+def rating_distribution():
+    """Review count per rating (1-5) in a single GROUP BY query"""
+    counts = dict(db.session.query(Reviews.rating, db.func.count(Reviews.id)).group_by(Reviews.rating).all())
+    return {rating: counts.get(rating, 0) for rating in range(1, 6)}
+
+
 @bp.route("/api/reviews", methods=["GET"])
 def get_reviews():
     """Get all reviews with pagination and filtering"""
@@ -1028,7 +1475,7 @@ def get_reviews():
     # Limit per_page to prevent abuse
     per_page = min(per_page, 50)
 
-    query = Reviews.query
+    query = Reviews.query.options(joinedload(Reviews.user))
 
     # Filter by rating if specified
     if rating_filter and 1 <= rating_filter <= 5:
@@ -1046,9 +1493,7 @@ def get_reviews():
     avg_rating = round(avg_rating, 1) if avg_rating else 0
 
     # Rating distribution
-    rating_counts = {}
-    for i in range(1, 6):
-        rating_counts[i] = Reviews.query.filter_by(rating=i).count()
+    rating_counts = rating_distribution()
 
     return jsonify(
         {
@@ -1089,10 +1534,7 @@ def get_review_stats():
     avg_rating = round(avg_rating, 1) if avg_rating else 0
 
     # Rating distribution
-    rating_counts = {}
-    for i in range(1, 6):
-        count = Reviews.query.filter_by(rating=i).count()
-        rating_counts[str(i)] = count
+    rating_counts = {str(rating): count for rating, count in rating_distribution().items()}
 
     return jsonify(
         {
@@ -1111,7 +1553,7 @@ def admin_get_reviews():
     if not current_user.is_authenticated or current_user.role != "admin":
         return jsonify({"error": "Admin access required"}), 403
 
-    reviews = Reviews.query.order_by(Reviews.created_at.desc()).all()
+    reviews = Reviews.query.options(joinedload(Reviews.user)).order_by(Reviews.created_at.desc()).all()
 
     reviews_data = []
     for review in reviews:
@@ -1143,7 +1585,7 @@ def request_password_reset():
             }), 200
 
         token = generate_reset_token(user)
-        reset_url = f"{app.config['FRONTEND_URL']}/reset-password?token={token}"
+        reset_url = f"{current_app.config['FRONTEND_URL']}/reset-password?token={token}"
 
         send_password_reset_email(user, reset_url)
 
@@ -1180,8 +1622,9 @@ def reset_password():
 
         user, reset_token = result
 
-        user.password = generate_password_hash(new_password)
+        user.set_password(new_password)
         invalidate_token(reset_token)
+        # The new password and the token deletion commit together
         db.session.commit()
 
         return jsonify({"message": "Password has been reset successfully"}), 200
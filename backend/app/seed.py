@@ -0,0 +1,317 @@
+# Deterministic synthetic data for scale and load testing (flask seed)
+
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import (
+    Abstracts, BlogPosts, Contact, Feedback, Invoices, Notifications, Payments, Reviews, Users,
+)
+from app.user_stats import rebuild_user_stats
+from app.utilities import ABSTRACT_FIELDS
+
+# Country -> institutions; the weights skew towards the platform's home markets
+INSTITUTIONS = {
+    "Malawi": ["University of Malawi", "Malawi University of Science and Technology",
+               "Lilongwe University of Agriculture and Natural Resources", "Kamuzu University of Health Sciences",
+               "Mzuzu University"],
+    "Kenya": ["University of Nairobi", "Kenyatta University", "Moi University", "Strathmore University"],
+    "Nigeria": ["University of Lagos", "University of Ibadan", "Ahmadu Bello University",
+                "Obafemi Awolowo University"],
+    "Ghana": ["University of Ghana", "Kwame Nkrumah University of Science and Technology",
+              "University of Cape Coast"],
+    "South Africa": ["University of Cape Town", "University of the Witwatersrand", "Stellenbosch University",
+                     "University of Pretoria"],
+    "Uganda": ["Makerere University", "Mbarara University of Science and Technology"],
+    "Tanzania": ["University of Dar es Salaam", "Sokoine University of Agriculture"],
+    "Zambia": ["University of Zambia", "Copperbelt University"],
+    "Zimbabwe": ["University of Zimbabwe", "National University of Science and Technology"],
+    "Ethiopia": ["Addis Ababa University", "Jimma University"],
+    "Rwanda": ["University of Rwanda"],
+    "Botswana": ["University of Botswana"],
+    "Senegal": ["Cheikh Anta Diop University"],
+    "Egypt": ["Cairo University"],
+}
+COUNTRY_WEIGHTS = {
+    "Malawi": 30, "Kenya": 12, "Nigeria": 12, "Ghana": 7, "South Africa": 7, "Uganda": 6, "Tanzania": 6,
+    "Zambia": 6, "Zimbabwe": 4, "Ethiopia": 4, "Rwanda": 2, "Botswana": 2, "Senegal": 1, "Egypt": 1,
+}
+FIELD_WEIGHTS = {"Public Health": 30, "Agriculture": 25, "Technology": 20, "AI": 15, "Mining Engineering": 10}
+KEYWORDS = {
+    "Public Health": ["malaria", "HIV", "maternal health", "nutrition", "vaccination", "tuberculosis", "cholera"],
+    "AI": ["machine learning", "natural language processing", "computer vision", "local languages",
+           "crop disease detection", "deep learning"],
+    "Technology": ["mobile money", "IoT", "rural broadband", "solar mini-grids", "e-government", "drones"],
+    "Agriculture": ["maize yields", "irrigation", "soil fertility", "climate-smart farming", "smallholder farmers",
+                    "fall armyworm"],
+    "Mining Engineering": ["copper", "artisanal mining", "tailings management", "rock mechanics", "mine safety"],
+}
+TITLES = [
+    "Effects of {kw} on outcomes in {country}",
+    "A cross-sectional study of {kw} in {country}",
+    "Assessing {kw} among communities in {country}",
+    "The role of {kw} in rural {country}",
+    "Evidence on {kw} from {institution}",
+]
+FIRST_NAMES = ["Chikondi", "Thandiwe", "Kwame", "Amina", "Tendai", "Chipo", "Femi", "Wanjiru", "Abebe", "Zanele",
+               "Mphatso", "Kofi", "Nia", "Tariq", "Lindiwe", "Ifeoma", "Jabari", "Aisha", "Takudzwa", "Yaw"]
+LAST_NAMES = ["Banda", "Phiri", "Mensah", "Okafor", "Mwangi", "Nkosi", "Kamau", "Mutasa", "Tesfaye", "Diallo",
+              "Chirwa", "Otieno", "Adeyemi", "Moyo", "Asante", "Ndlovu", "Kariuki", "Mbeki", "Sesay", "Kagame"]
+FEEDBACK = {
+    "approved": ["Well structured abstract.", "Clear methods and results.", "Approved; please pay the publication fee."],
+    "rejected": ["The methods section is missing.", "Results are not supported by the data.",
+                 "Please state the sample size and study period.", "Out of scope for the selected field."],
+}
+REVIEW_COMMENTS = ["Easy to submit my abstract.", "Payment was quick with mobile money.", "Great platform.",
+                   "The review took longer than expected.", "Helpful feedback from the reviewers.", None]
+
+# Share of abstracts that end up in each state, and of approved abstracts per payment outcome
+STATUS_WEIGHTS = {"published": 55, "approved": 20, "rejected": 10, "pending": 15}
+UNPAID_OUTCOMES = {None: 40, "pending": 25, "failed": 15, "expired": 20}
+
+
+def _naive(dt):
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _start_id(model):
+    """First free id, so seeding into a non-empty database appends"""
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _sync_sequences(models):
+    # Explicit ids don't advance Postgres sequences; move them past the seeded rows
+    if db.engine.dialect.name != "postgresql":
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def _insert(model, rows):
+    # Core INSERT on the table skips the ORM bulk-save bookkeeping
+    if rows:
+        db.session.execute(insert(model.__table__), rows)
+    return len(rows)
+
+
+class Seeder:
+    """Generates the rows; the same seed and sizes always produce the same data"""
+
+    def __init__(self, seed, until, days):
+        self.rng = random.Random(seed)
+        self.until = until
+        self.since = until - timedelta(days=days)
+        self.span = (until - self.since).total_seconds()
+        self.countries = list(COUNTRY_WEIGHTS)
+        self.country_weights = list(COUNTRY_WEIGHTS.values())
+        self.fields = list(FIELD_WEIGHTS)
+        self.field_weights = list(FIELD_WEIGHTS.values())
+        self.fee = current_app.config["ABSTRACT_PUBLICATION_FEE"]
+
+    def moment(self):
+        # Submissions grow over time: later dates are more likely
+        return self.since + timedelta(seconds=self.span * self.rng.random() ** 0.7)
+
+    def after(self, moment, max_days):
+        return min(moment + timedelta(seconds=self.rng.uniform(600, max_days * 86400)), self.until)
+
+    def users(self, first_id, count, admins, password_hash):
+        """User rows, plus each user's country and a cumulative weight for picking authors"""
+        rows, countries, weights = [], [], []
+        for offset in range(count):
+            user_id = first_id + offset
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            country = self.rng.choices(self.countries, self.country_weights)[0]
+            is_admin = offset < admins
+            rows.append({
+                "id": user_id,
+                "email": f"{first}.{last}.{user_id}@seed.example.org".lower(),
+                "fullname": f"{first} {last}",
+                "country": country,
+                "password_hash": password_hash,
+                "role": "admin" if is_admin else "student",
+                "last_seen": self.moment(),
+            })
+            countries.append(country)
+            # Log-normal productivity: most authors submit once or twice, a few submit dozens
+            weights.append(0.0 if is_admin else self.rng.lognormvariate(0, 1.2))
+        return rows, countries, list(itertools.accumulate(weights))
+
+    def abstract(self, abstract_id, author_id, country, admin_ids):
+        """One abstract and the payments, invoices, feedback and notifications its lifecycle leaves behind"""
+        rng = self.rng
+        field = rng.choices(self.fields, self.field_weights)[0]
+        keywords = rng.sample(KEYWORDS[field], 3)
+        institutions = INSTITUTIONS[country]
+        institution = institutions[author_id % len(institutions)]
+        title = rng.choice(TITLES).format(kw=keywords[0], country=country, institution=institution)
+        submitted = self.moment()
+        status = rng.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()))[0]
+        reviewed = self.after(submitted, 14)
+        if status != "pending" and reviewed >= self.until:
+            status = "pending"
+
+        abstract = {
+            "id": abstract_id, "title": title[:256], "file_type": "text", "field": field,
+            "content": (f"This study examines {keywords[0]} in {country}, with attention to {keywords[1]} "
+                        f"and {keywords[2]}. Data were collected at {institution}."),
+            "institution": institution, "country": country, "year": submitted.year - rng.choice([0, 0, 1, 2]),
+            "keywords": ", ".join(keywords), "status": status, "author_id": author_id,
+            "date_submitted": submitted, "updated_at": submitted,
+        }
+        rows = {Abstracts: [abstract], Payments: [], Invoices: [], Feedback: [], Notifications: []}
+        if status == "pending":
+            return rows
+
+        abstract["updated_at"] = reviewed
+        verdict = "rejected" if status == "rejected" else "approved"
+        if verdict == "rejected" or rng.random() < 0.3:
+            rows[Feedback].append({
+                "abstract_id": abstract_id, "admin_id": rng.choice(admin_ids),
+                "comment": rng.choice(FEEDBACK[verdict]), "created_at": reviewed,
+            })
+        rows[Notifications].append(self.notification(author_id, reviewed, (
+            f"Your abstract '{abstract['title']}' has been approved!" if verdict == "approved" else
+            f"Your abstract '{abstract['title']}' has been rejected. Please check feedback."
+        )))
+        if status == "rejected":
+            return rows
+
+        outcome = "confirmed" if status == "published" else rng.choices(
+            list(UNPAID_OUTCOMES), list(UNPAID_OUTCOMES.values()))[0]
+        if outcome is None:
+            return rows
+        # Some authors abandon a first checkout before paying
+        attempts = ["expired", outcome] if outcome == "confirmed" and rng.random() < 0.15 else [outcome]
+        moment = reviewed
+        for attempt, state in enumerate(attempts):
+            moment = self.after(moment, 7)
+            paid = state == "confirmed"
+            # after() clamps to `until`, so both attempts can share a moment; the index keeps tx_ref unique
+            tx_ref = f"abstract_{abstract_id}_{int(moment.replace(tzinfo=timezone.utc).timestamp())}_{attempt}"
+            link = f"https://checkout.paychangu.com/{tx_ref}"
+            rows[Payments].append({
+                "abstract_id": abstract_id, "amount": self.fee, "currency": "USD", "status": state,
+                "payment_date": moment, "updated_at": moment, "method": "PayChangu",
+                "transaction_id": tx_ref, "payment_link": link,
+            })
+            rows[Invoices].append({
+                "abstract_id": abstract_id, "invoice_url": link, "amount": self.fee, "generated_date": moment,
+                "due_date": moment + timedelta(weeks=2), "paid": paid,
+            })
+        abstract["updated_at"] = moment
+        if status == "published":
+            rows[Notifications].append(self.notification(
+                author_id, moment, f"Payment received. Your abstract '{abstract['title']}' has been published!"
+            ))
+        return rows
+
+    def notification(self, user_id, created, message):
+        # Older notifications are more likely to have been read
+        read = self.rng.random() < (0.9 if (self.until - created).days > 30 else 0.35)
+        return {"user_id": user_id, "message": message[:255], "read": read, "created_at": created,
+                "updated_at": created}
+
+
+def seed_database(users=1000, abstracts=None, reviews=None, admins=5, seed=42, until=None, days=730,
+                  password="password123", batch_size=10000, progress=None):
+    """
+    Bulk-load referentially consistent synthetic data: users (a few admins), abstracts
+    in every status with the feedback, payments, invoices and notifications of their
+    lifecycle, site reviews, blog posts and contact messages. user_stats is rebuilt.
+    Every account gets the same `password` (hashed once).
+    Commits after each batch. progress(table, rows so far) is called per batch.
+    Returns: report dict.
+    """
+    if users < 2:
+        raise ValueError("Seed at least 2 users (one admin and one author)")
+    started = time.perf_counter()
+    abstracts = users * 4 if abstracts is None else abstracts
+    reviews = users // 10 if reviews is None else reviews
+    admins = max(1, min(admins, users - 1))
+    until = _naive(until) if until else datetime.now(timezone.utc).replace(
+        tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    seeder = Seeder(seed, until, days)
+    counts = dict.fromkeys(
+        ["users", "abstracts", "payments", "invoices", "feedback", "notifications", "reviews", "blog_posts",
+         "contact"], 0)
+
+    first_user = _start_id(Users)
+    user_rows, countries, cum_weights = seeder.users(
+        first_user, users, admins, generate_password_hash(password))
+    admin_ids = [row["id"] for row in user_rows[:admins]]
+    for start in range(0, len(user_rows), batch_size):
+        counts["users"] += _insert(Users, user_rows[start:start + batch_size])
+        db.session.commit()
+        if progress:
+            progress("users", counts["users"])
+    del user_rows
+
+    next_id = {model: _start_id(model) for model in (Abstracts, Payments, Invoices)}
+    remaining = abstracts
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        remaining -= size
+        authors = seeder.rng.choices(range(users), cum_weights=cum_weights, k=size)
+        batch = {Abstracts: [], Payments: [], Invoices: [], Feedback: [], Notifications: []}
+        for index in authors:
+            rows = seeder.abstract(next_id[Abstracts], first_user + index, countries[index], admin_ids)
+            next_id[Abstracts] += 1
+            # Invoices point at the payment created with them
+            for payment, invoice in zip(rows[Payments], rows[Invoices]):
+                payment["id"] = invoice["payment_id"] = next_id[Payments]
+                invoice["id"] = next_id[Invoices]
+                next_id[Payments] += 1
+                next_id[Invoices] += 1
+            for model, model_rows in rows.items():
+                batch[model].extend(model_rows)
+        for model, model_rows in batch.items():
+            counts[model.__tablename__] += _insert(model, model_rows)
+        db.session.commit()
+        if progress:
+            progress("abstracts", counts["abstracts"])
+
+    rng = seeder.rng
+    counts["reviews"] = _insert(Reviews, [
+        {"user_id": first_user + rng.randrange(admins, users) if rng.random() < 0.85 else None,
+         "rating": rng.choices([1, 2, 3, 4, 5], [4, 6, 15, 35, 40])[0],
+         "comment": rng.choice(REVIEW_COMMENTS), "created_at": seeder.moment()}
+        for _ in range(reviews)
+    ])
+    counts["blog_posts"] = _insert(BlogPosts, [
+        {"author": rng.choice(admin_ids), "created_at": seeder.moment(),
+         "body": f"Call for abstracts in {field}: submissions are open to researchers across Africa."}
+        for field in rng.choices(ABSTRACT_FIELDS, k=max(1, users // 1000))
+    ])
+    counts["contact"] = _insert(Contact, [
+        {"name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", "email": f"visitor{n}@seed.example.org",
+         "message": "I have a question about the publication fee.", "created_at": seeder.moment()}
+        for n in range(max(1, users // 200))
+    ])
+    _sync_sequences([Users, Abstracts, Payments, Invoices])
+    db.session.commit()
+
+    rebuild_user_stats()
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    current_app.logger.info(f"Seeded {total} rows in {elapsed:.1f}s (seed {seed})")
+    return {
+        "seed": seed,
+        "until": until.isoformat(),
+        "first_user_id": first_user,
+        "admin_ids": admin_ids,
+        "rows": counts,
+        "elapsed": elapsed,
+        "rows_per_sec": total / elapsed if elapsed else 0,
+    }
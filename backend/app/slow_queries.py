@@ -0,0 +1,162 @@
+# Slow-query log: per-fingerprint timing aggregates for every statement, warnings over a threshold
+
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timezone
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+from app.sql_metrics import statement_shape
+
+SORT_KEYS = ("total_ms", "p95_ms", "max_ms", "count", "slow")
+
+
+def fingerprint(shape):
+    """Short stable id of a normalised statement, used in log lines and the admin endpoint"""
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class StatementStats:
+    """Rolling aggregates of one statement fingerprint"""
+
+    def __init__(self, shape, samples):
+        self.shape = shape
+        self.count = 0
+        self.slow = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.max_rows = None
+        self.durations = deque(maxlen=samples)  # recent timings for p50/p95
+        self.routes = Counter()
+        self.last_seen = None
+
+    def to_dict(self):
+        durations = sorted(self.durations)
+        return {
+            "fingerprint": fingerprint(self.shape),
+            "statement": self.shape[:2000],
+            "count": self.count,
+            "slow": self.slow,
+            "total_ms": round(self.total * 1000, 2),
+            "mean_ms": round(self.total / self.count * 1000, 2),
+            "p50_ms": round(_percentile(durations, 50) * 1000, 2),
+            "p95_ms": round(_percentile(durations, 95) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            # The driver's rowcount: rows changed for writes; for SELECT only some drivers (e.g. psycopg2) report it
+            "rows": self.rows if self.max_rows is not None else None,
+            "max_rows": self.max_rows,
+            "routes": dict(self.routes.most_common(5)),
+            "last_seen": datetime.fromtimestamp(self.last_seen, timezone.utc).isoformat(),
+        }
+
+
+class SlowQueryLog:
+    """
+    Per-process aggregates keyed by statement fingerprint. At most `max_fingerprints`
+    are kept; the least recently seen one is dropped to make room for a new one.
+    """
+
+    def __init__(self, threshold_ms, max_fingerprints, samples):
+        self.threshold = threshold_ms / 1000
+        self.max_fingerprints = max_fingerprints
+        self.samples = samples
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._stats = OrderedDict()
+
+    def record(self, statement, elapsed, rows, route):
+        """Add one execution; returns its shape if it was slow, else None"""
+        shape = statement_shape(statement)
+        slow = elapsed >= self.threshold
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                stats = self._stats[shape] = StatementStats(shape, self.samples)
+                if len(self._stats) > self.max_fingerprints:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(shape)
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.durations.append(elapsed)
+            if rows is not None and rows >= 0:
+                stats.rows += rows
+                stats.max_rows = max(stats.max_rows or 0, rows)
+            stats.routes[route] += 1
+            stats.last_seen = time.time()
+            if slow:
+                stats.slow += 1
+        return shape if slow else None
+
+    def top(self, limit=20, sort="total_ms"):
+        """The `limit` worst fingerprints by `sort` (one of SORT_KEYS)"""
+        with self._lock:
+            snapshot = [stats.to_dict() for stats in self._stats.values()]
+        return sorted(snapshot, key=lambda s: s[sort], reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+    def __len__(self):
+        return len(self._stats)
+
+
+def _route():
+    if not has_request_context():
+        return "(no request)"
+    return f"{request.method} {request.endpoint or request.path}"
+
+
+def get_slow_query_log():
+    """This process's SlowQueryLog, or None when SLOW_QUERY_LOG_ENABLED is off"""
+    return current_app.extensions.get("slow_queries")
+
+
+def init_slow_query_log(app):
+    """Fingerprint and time every statement on the app's engines; log the slow ones"""
+    if not app.config["SLOW_QUERY_LOG_ENABLED"]:
+        return
+
+    log = SlowQueryLog(
+        app.config["SLOW_QUERY_THRESHOLD_MS"],
+        app.config["SLOW_QUERY_MAX_FINGERPRINTS"],
+        app.config["SLOW_QUERY_SAMPLES"],
+    )
+    app.extensions["slow_queries"] = log
+    logger = app.logger
+
+    with app.app_context():
+        for engine in db.engines.values():
+
+            @event.listens_for(engine, "before_cursor_execute")
+            def start_timer(conn, cursor, statement, parameters, context, executemany):
+                conn.info["slow_query_started"] = time.perf_counter()
+
+            @event.listens_for(engine, "after_cursor_execute")
+            def record_statement(conn, cursor, statement, parameters, context, executemany):
+                started = conn.info.pop("slow_query_started", None)
+                if started is None:
+                    return
+                elapsed = time.perf_counter() - started
+                route = _route()
+                rows = cursor.rowcount
+                shape = log.record(statement, elapsed, rows, route)
+                if shape is not None:
+                    logger.warning(
+                        f"Slow query ({elapsed * 1000:.0f}ms{f', {rows} rows' if rows >= 0 else ''}) in {route} "
+                        f"[{fingerprint(shape)}]: {shape[:300]}"
+                    )
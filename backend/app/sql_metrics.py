@@ -0,0 +1,108 @@
+# Per-request SQL instrumentation: query count, DB time and repeated statements (N+1)
+
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement):
+    """
+    Normalise SQL so executions that differ only in literal values or IN-list
+    length compare equal (e.g. the same lazy load issued once per row)
+    """
+    shape = _LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """SQL executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.shape_durations = Counter()
+
+    def record(self, statement, elapsed):
+        shape = statement_shape(statement)
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[shape] += 1
+        self.shape_durations[shape] += elapsed
+
+    def slowest(self, limit=10):
+        """(shape, count, total seconds) for the statements that took the most time"""
+        return [(shape, self.shapes[shape], elapsed) for shape, elapsed in self.shape_durations.most_common(limit)]
+
+    def repeated(self, threshold):
+        """(shape, count) for statements issued more than `threshold` times"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is None or not has_request_context():
+        return
+    stats = g.get("sql_stats")
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def install_listeners():
+    """Attach the timing hooks to every engine (idempotent)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def init_sql_metrics(app):
+    """Record SQL per request, report it in Server-Timing and the log, and flag N+1 patterns"""
+    if not app.config["SQL_METRICS_ENABLED"]:
+        return
+    install_listeners()
+
+    @app.before_request
+    def start_sql_metrics():
+        g.sql_stats = QueryStats()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_sql_metrics(response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        db_ms = stats.duration * 1000
+
+        if current_app.config["SQL_SERVER_TIMING"]:
+            response.headers.add("Server-Timing", f'db;dur={db_ms:.1f};desc="{stats.count} queries"')
+            response.headers.add("Server-Timing", f"app;dur={total_ms:.1f}")
+
+        current_app.logger.debug(
+            f"{request.method} {request.path} -> {response.status_code}: "
+            f"{stats.count} queries, {db_ms:.1f}ms in DB, {total_ms:.1f}ms total"
+        )
+
+        threshold = current_app.config["SQL_N_PLUS_ONE_THRESHOLD"]
+        if threshold:
+            for shape, count in stats.repeated(threshold):
+                current_app.logger.warning(
+                    f"Possible N+1 in {request.endpoint}: statement ran {count} times: {shape[:300]}"
+                )
+        return response
@@ -0,0 +1,248 @@
+# Storage backends for uploaded abstract files
+
+import hashlib
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+
+from flask import current_app
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Storage(ABC):
+    """
+    Interface shared by the storage backends.
+    Files are addressed by a relative key (what Abstracts.file_path stores).
+    """
+
+    def __init__(self, shard_depth=2):
+        self.shard_depth = shard_depth
+
+    def key_for(self, filename):
+        """Build a hash-sharded key such as 'a1/b2/<filename>' so no directory grows unbounded"""
+        digest = hashlib.sha256(filename.encode("utf-8")).hexdigest()
+        shards = [digest[i * 2:i * 2 + 2] for i in range(self.shard_depth)]
+        return "/".join(shards + [filename])
+
+    @abstractmethod
+    def save(self, key, stream, content_type=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def open(self, key):
+        """Return a readable binary file object; raise FileNotFoundError if missing"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def exists(self, key):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key):
+        """Delete key; return False if it didn't exist"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_partitions(self):
+        """Top-level partitions that can be scanned independently (in parallel)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def scan(self, partition, cutoff):
+        """
+        List files under one partition
+        Returns: (files scanned, list of (key, size, mtime) modified before cutoff)
+        """
+        raise NotImplementedError
+
+
+class LocalStorage(Storage):
+    """Files on the local disk under root"""
+
+    def __init__(self, root, shard_depth=2):
+        super().__init__(shard_depth)
+        self.root = root
+
+    def path(self, key):
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save(self, key, stream, content_type=None):
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial upload
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(stream, f, CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def open(self, key):
+        return open(self.path(key), "rb")
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def list_partitions(self):
+        if not os.path.isdir(self.root):
+            return []
+        with os.scandir(self.root) as entries:
+            return sorted(
+                entry.name for entry in entries
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+            )
+
+    def scan(self, partition, cutoff):
+        scanned = 0
+        candidates = []
+        stack = [partition]
+
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                entries = os.scandir(os.path.join(self.root, rel_dir))
+            except FileNotFoundError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    key = f"{rel_dir}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(key)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+
+                    scanned += 1
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_mtime < cutoff:
+                        candidates.append((key, stat.st_size, stat.st_mtime))
+
+        return scanned, candidates
+
+
+class S3Storage(Storage):
+    """Files in an S3-compatible bucket (AWS S3, MinIO, moto, ...)"""
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region_name=None,
+                 access_key=None, secret_key=None, shard_depth=2):
+        super().__init__(shard_depth)
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("S3 storage requires boto3: pip install boto3")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+        )
+        self.ClientError = ClientError
+
+    def _object_key(self, key):
+        return f"{self.prefix}{key}"
+
+    def _is_missing(self, error):
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def save(self, key, stream, content_type=None):
+        extra_args = {"ContentType": content_type} if content_type else None
+        # upload_fileobj streams in multipart chunks instead of buffering the file
+        self.client.upload_fileobj(stream, self.bucket, self._object_key(key), ExtraArgs=extra_args)
+        return key
+
+    def open(self, key):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self.ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+        return response["Body"]
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except self.ClientError as e:
+            if self._is_missing(e):
+                return False
+            raise
+
+    def delete(self, key):
+        if not self.exists(key):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        return True
+
+    def list_partitions(self):
+        partitions = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix, Delimiter="/"):
+            for common_prefix in page.get("CommonPrefixes", []):
+                partitions.append(common_prefix["Prefix"][len(self.prefix):].rstrip("/"))
+        return sorted(partitions)
+
+    def scan(self, partition, cutoff):
+        scanned = 0
+        candidates = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(f"{partition}/")):
+            for obj in page.get("Contents", []):
+                scanned += 1
+                mtime = obj["LastModified"].timestamp()
+                if mtime < cutoff:
+                    candidates.append((obj["Key"][len(self.prefix):], obj["Size"], mtime))
+        return scanned, candidates
+
+
+def create_storage(config):
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    backend = (config.get("STORAGE_BACKEND") or "local").lower()
+    shard_depth = config.get("STORAGE_SHARD_DEPTH", 2)
+
+    if backend == "local":
+        return LocalStorage(config["UPLOAD_FOLDER"], shard_depth=shard_depth)
+    if backend == "s3":
+        return S3Storage(
+            bucket=config["S3_BUCKET"],
+            prefix=config.get("S3_PREFIX") or "",
+            endpoint_url=config.get("S3_ENDPOINT_URL"),
+            region_name=config.get("S3_REGION"),
+            access_key=config.get("S3_ACCESS_KEY_ID"),
+            secret_key=config.get("S3_SECRET_ACCESS_KEY"),
+            shard_depth=shard_depth,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+def get_storage():
+    """Return the current app's storage backend, creating it on first use"""
+    storage = current_app.extensions.get("storage")
+    if storage is None:
+        storage = create_storage(current_app.config)
+        current_app.extensions["storage"] = storage
+    return storage
@@ -0,0 +1,217 @@
+# Resumable chunked upload sessions for PDF abstracts
+#
+# A session lives in UPLOAD_SESSION_FOLDER/<upload_id>/:
+#   session.json      metadata written on create and finalize
+#   chunks/<n>.part   one file per received chunk (written atomically)
+#   assembled.pdf     the finalized file, waiting for submit_abstract to claim it
+
+import json
+import os
+import re
+import secrets
+import shutil
+import time
+
+from flask import current_app
+
+from app import metrics
+
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadError(Exception):
+    """Raised for invalid upload requests; carries the HTTP status to return"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _session_dir(upload_id):
+    if not UPLOAD_ID_PATTERN.match(upload_id or ""):
+        raise UploadError("Upload not found", 404)
+    return os.path.join(current_app.config["UPLOAD_SESSION_FOLDER"], upload_id)
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _chunk_count(session):
+    return max(1, -(-session["size"] // session["chunk_size"]))
+
+
+def _expected_chunk_size(session, index):
+    if index == _chunk_count(session) - 1:
+        return session["size"] - index * session["chunk_size"]
+    return session["chunk_size"]
+
+
+def create_session(user_id, filename, size):
+    """Start a new upload session and persist its metadata"""
+    max_size = current_app.config["CHUNKED_UPLOAD_MAX_SIZE"]
+    if size <= 0:
+        raise UploadError("File is empty")
+    if size > max_size:
+        raise UploadError(f"File size exceeds {max_size // (1024 * 1024)}MB limit")
+
+    upload_id = secrets.token_hex(16)
+    session_dir = _session_dir(upload_id)
+    os.makedirs(os.path.join(session_dir, "chunks"))
+
+    session = {
+        "id": upload_id,
+        "user_id": user_id,
+        "filename": filename,
+        "size": size,
+        "chunk_size": current_app.config["UPLOAD_CHUNK_SIZE"],
+        "created_at": time.time(),
+        "finalized": False,
+    }
+    _write_json(os.path.join(session_dir, "session.json"), session)
+    return session
+
+
+def load_session(upload_id, user_id):
+    """Load a session owned by user_id or raise UploadError"""
+    path = os.path.join(_session_dir(upload_id), "session.json")
+    try:
+        with open(path) as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        raise UploadError("Upload not found", 404)
+
+    if session["user_id"] != user_id:
+        raise UploadError("Upload not found", 404)
+    if time.time() - session["created_at"] > current_app.config["UPLOAD_SESSION_TTL"]:
+        raise UploadError("Upload session has expired", 410)
+    return session
+
+
+def received_chunks(session):
+    """Sorted indexes of the chunks already stored for this session"""
+    chunks_dir = os.path.join(_session_dir(session["id"]), "chunks")
+    try:
+        names = os.listdir(chunks_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith(".part"))
+
+
+def session_status(session):
+    """
+    Describe progress so a client can resume: 'offset' is the number of
+    contiguous bytes received from the start of the file.
+    """
+    if session["finalized"]:
+        received = list(range(_chunk_count(session)))
+    else:
+        received = received_chunks(session)
+    contiguous = 0
+    for index in received:
+        if index != contiguous:
+            break
+        contiguous += 1
+
+    return {
+        "uploadId": session["id"],
+        "filename": session["filename"],
+        "size": session["size"],
+        "chunkSize": session["chunk_size"],
+        "totalChunks": _chunk_count(session),
+        "receivedChunks": received,
+        "offset": min(contiguous * session["chunk_size"], session["size"]),
+        "finalized": session["finalized"],
+    }
+
+
+def write_chunk(session, index, stream):
+    """Store chunk `index`; re-sending a chunk simply replaces it"""
+    if session["finalized"]:
+        raise UploadError("Upload already finalized", 409)
+    if index < 0 or index >= _chunk_count(session):
+        raise UploadError("Chunk index out of range")
+
+    expected = _expected_chunk_size(session, index)
+    # Read at most one byte past the expected size so oversized chunks are caught
+    data = stream.read(expected + 1)
+    if len(data) != expected:
+        raise UploadError(f"Chunk {index} must be exactly {expected} bytes")
+
+    chunk_path = os.path.join(_session_dir(session["id"]), "chunks", f"{index}.part")
+    tmp_path = f"{chunk_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, chunk_path)
+    metrics.inc("upload_bytes", len(data), kind="chunk")
+
+
+def finalize_session(session):
+    """Assemble the chunks, in order, into the session's final file"""
+    if session["finalized"]:
+        return session
+
+    missing = sorted(set(range(_chunk_count(session))) - set(received_chunks(session)))
+    if missing:
+        raise UploadError(f"Missing chunks: {missing[:20]}", 409)
+
+    session_dir = _session_dir(session["id"])
+    chunks_dir = os.path.join(session_dir, "chunks")
+    assembled_path = os.path.join(session_dir, "assembled.pdf")
+    tmp_path = f"{assembled_path}.tmp"
+
+    with open(tmp_path, "wb") as out:
+        for index in range(_chunk_count(session)):
+            with open(os.path.join(chunks_dir, f"{index}.part"), "rb") as chunk:
+                shutil.copyfileobj(chunk, out)
+
+    if os.path.getsize(tmp_path) != session["size"]:
+        os.remove(tmp_path)
+        raise UploadError("Assembled file size does not match the declared size", 409)
+
+    os.replace(tmp_path, assembled_path)
+    shutil.rmtree(chunks_dir, ignore_errors=True)
+
+    session["finalized"] = True
+    _write_json(os.path.join(session_dir, "session.json"), session)
+    return session
+
+
+def open_assembled(session):
+    """Open the finalized file for streaming into storage"""
+    if not session["finalized"]:
+        raise UploadError("Upload has not been finalized", 409)
+    return open(os.path.join(_session_dir(session["id"]), "assembled.pdf"), "rb")
+
+
+def discard_session(upload_id):
+    """Remove a session and everything it stored"""
+    shutil.rmtree(_session_dir(upload_id), ignore_errors=True)
+
+
+def purge_expired_sessions():
+    """Delete sessions older than UPLOAD_SESSION_TTL; returns how many were removed"""
+    root = current_app.config["UPLOAD_SESSION_FOLDER"]
+    ttl = current_app.config["UPLOAD_SESSION_TTL"]
+    if not os.path.isdir(root):
+        return 0
+
+    purged = 0
+    now = time.time()
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False) or not UPLOAD_ID_PATTERN.match(entry.name):
+                continue
+            try:
+                with open(os.path.join(entry.path, "session.json")) as f:
+                    created_at = json.load(f)["created_at"]
+            except (OSError, ValueError, KeyError):
+                created_at = entry.stat().st_mtime
+            if now - created_at > ttl:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                purged += 1
+    return purged
@@ -0,0 +1,145 @@
+# Denormalised per-user counters (user_stats) behind the student dashboard stats block
+#
+# Every write path that adds abstracts or notifications, changes an abstract's
+# status or reads/deletes notifications calls one of these helpers inside its own
+# transaction, so the counters commit or roll back with the change. New users get
+# a zeroed row in the transaction that creates them (users_created); a row that is
+# still missing (users from before user_stats existed) is built from the source
+# tables on first read (get_user_stats), and `flask rebuild-user-stats` recomputes
+# everything if counters ever drift.
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Abstracts, Notifications, UserStats, Users
+
+STATUS_COLUMNS = {
+    "pending": "pending_abstracts",
+    "approved": "approved_abstracts",
+    "rejected": "rejected_abstracts",
+    "published": "published_abstracts",
+}
+
+
+def adjust(user_ids, **deltas):
+    """
+    Add deltas to counters with one UPDATE (col = col + delta, so concurrent writers
+    don't lose increments). `user_ids` is an id, a list of ids or a SELECT of ids.
+    Users without a stats row yet are skipped; their row is built from scratch later.
+    """
+    values = {name: getattr(UserStats, name) + delta for name, delta in deltas.items() if delta}
+    if not values:
+        return
+    if isinstance(user_ids, int):
+        condition = UserStats.user_id == user_ids
+    else:
+        condition = UserStats.user_id.in_(user_ids)
+    db.session.execute(
+        update(UserStats).where(condition).values(**values).execution_options(synchronize_session=False)
+    )
+
+
+def users_created(user_ids):
+    """Zeroed counters for new users; call in the transaction that inserts them"""
+    if user_ids:
+        db.session.execute(insert(UserStats), [{"user_id": user_id} for user_id in user_ids])
+
+
+def abstract_added(user_id, status="pending", count=1):
+    deltas = {"total_abstracts": count}
+    if status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[status]] = count
+    adjust(user_id, **deltas)
+
+
+def abstract_status_changed(user_id, old_status, new_status, count=1):
+    if old_status == new_status:
+        return
+    deltas = {}
+    if old_status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[old_status]] = -count
+    if new_status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[new_status]] = deltas.get(STATUS_COLUMNS[new_status], 0) + count
+    adjust(user_id, **deltas)
+
+
+def abstracts_published(abstract_ids):
+    """Call before a bulk UPDATE publishes these abstracts: moves each author's counts to published"""
+    rows = db.session.execute(
+        select(Abstracts.author_id, Abstracts.status, func.count())
+        .where(Abstracts.id.in_(abstract_ids), Abstracts.status != "published")
+        .group_by(Abstracts.author_id, Abstracts.status)
+    ).all()
+    for author_id, status, count in rows:
+        abstract_status_changed(author_id, status, "published", count)
+
+
+def notifications_added(user_ids, count=1):
+    """New unread notifications for a user id, a list of ids or a SELECT of recipients"""
+    adjust(user_ids, unread_notifications=count)
+
+
+def notifications_read(user_id, count):
+    adjust(user_id, unread_notifications=-count)
+
+
+def notifications_deleted(notification_ids):
+    """Call before deleting notifications: drops the unread ones from their users' counters"""
+    rows = db.session.execute(
+        select(Notifications.user_id, func.count())
+        .where(Notifications.id.in_(notification_ids), Notifications.read.is_(False))
+        .group_by(Notifications.user_id)
+    ).all()
+    for user_id, count in rows:
+        if user_id is not None:
+            adjust(user_id, unread_notifications=-count)
+
+
+def stats_select(user_ids=None):
+    """SELECT computing every counter from the source tables, one row per user"""
+    def count_abstracts(*conditions):
+        return (
+            select(func.count(Abstracts.id))
+            .where(Abstracts.author_id == Users.id, *conditions)
+            .scalar_subquery()
+        )
+
+    query = select(
+        Users.id,
+        count_abstracts(),
+        *(count_abstracts(Abstracts.status == status) for status in STATUS_COLUMNS),
+        select(func.count(Notifications.id))
+        .where(Notifications.user_id == Users.id, Notifications.read.is_(False))
+        .scalar_subquery(),
+    )
+    if user_ids is not None:
+        query = query.where(Users.id.in_(user_ids))
+    return query
+
+
+def rebuild_user_stats(user_ids=None):
+    """Recompute counters from scratch (all users, or only user_ids) in the current transaction"""
+    condition = UserStats.user_id.in_(user_ids) if user_ids is not None else db.true()
+    db.session.execute(delete(UserStats).where(condition).execution_options(synchronize_session=False))
+    result = db.session.execute(
+        insert(UserStats).from_select(
+            ["user_id", "total_abstracts", *STATUS_COLUMNS.values(), "unread_notifications"],
+            stats_select(user_ids),
+        )
+    )
+    return result.rowcount
+
+
+def get_user_stats(user_id):
+    """The user's counters (one primary-key read), building the row on first use"""
+    stats = db.session.get(UserStats, user_id)
+    if stats is not None:
+        return stats
+    try:
+        rebuild_user_stats([user_id])
+        db.session.commit()
+    except IntegrityError:
+        # Another request built it first
+        db.session.rollback()
+    return db.session.get(UserStats, user_id)
@@ -1,7 +1,6 @@
 from functools import wraps
 from flask import jsonify
 from flask_login import current_user
-from email_validator import validate_email, EmailNotValidError
 
 def admin_required(f):
     @wraps(f)
@@ -26,8 +25,42 @@ def student_required(f):
 
 
 def is_valid_email(email):
+    # email_validator (and the DNS library it loads) is imported on first use, not at worker boot
+    from email_validator import validate_email, EmailNotValidError
     try:
         valid = validate_email(email)
         return valid.email
     except EmailNotValidError:
-        return None
\ No newline at end of file
+        return None
+
+
+# Abstract submission rules, shared by /api/submit and flask import-abstracts
+ALLOWED_EXTENSIONS = {"pdf"}
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+ABSTRACT_FIELDS = [
+    "Public Health",
+    "AI",
+    "Technology",
+    "Agriculture",
+    "Mining Engineering",
+]
+
+
+def allowed_file(filename):
+    """Check if file extension is allowed"""
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def validate_abstract_fields(title, field, country, year, institution):
+    """
+    Validate the required abstract metadata
+    Returns: (year as int, None) or (None, error message)
+    """
+    if not all([title, field, institution, country, year]):
+        return None, "Missing required fields"
+    if field not in ABSTRACT_FIELDS:
+        return None, "Invalid field"
+    try:
+        return int(year), None
+    except (TypeError, ValueError):
+        return None, "Invalid year format"
@@ -1,6 +1,7 @@
 
 from flask import current_app, render_template
 from flask_mail import Message
+from app import metrics
 from app.extensions import mail
 from threading import Thread
 
@@ -9,9 +10,14 @@ def send_async_email(app, msg):
     """Send email asynchronously"""
     with app.app_context():
         try:
-            mail.send(msg)
+            with metrics.timed("email_latency"):
+                mail.send(msg)
+            metrics.inc("emails", outcome="sent")
         except Exception as e:
+            metrics.inc("emails", outcome="failed")
             current_app.logger.error(f"Failed to send email: {str(e)}")
+        finally:
+            metrics.inc("email_queue", -1)
 
 
 def send_email(subject, recipient, text_body, html_body):
@@ -25,6 +31,7 @@ def send_email(subject, recipient, text_body, html_body):
     msg.html = html_body
     
     # Send asynchronously
+    metrics.inc("email_queue")
     Thread(
         target=send_async_email,
         args=(current_app._get_current_object(), msg)
@@ -1,13 +1,22 @@
+import hashlib
+import secrets
 import jwt
 from datetime import datetime, timezone
 from flask import current_app
+from sqlalchemy import select
 from app.extensions import db
-from app.models import PasswordResetToken
+from app.models import PasswordResetToken, Users
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
+
+def hash_token(token):
+    """Fixed-length digest stored in place of the token itself"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def generate_reset_token(user):
     """
-    Generate a JWT token for password reset and store it in database
+    Generate a JWT token for password reset and store its SHA-256 in the database
     Returns: token string
     """
     # Create JWT payload
@@ -17,7 +26,9 @@ def generate_reset_token(user):
         'email': user.email,
         'exp': expiry,
         'iat': datetime.now(timezone.utc),
-        'type': 'password_reset'
+        'type': 'password_reset',
+        # Unique per token: two requests within the same second would otherwise sign identical JWTs
+        'jti': secrets.token_urlsafe(16),
     }
     
     # Generate JWT token
@@ -27,10 +38,10 @@ def generate_reset_token(user):
         algorithm=current_app.config['JWT_ALGORITHM']
     )
     
-    # Store token in database
+    # Store only the digest: a leaked table can't be used to reset passwords
     reset_token = PasswordResetToken(
         user_id=user.id,
-        token=token,
+        token_hash=hash_token(token),
         expires_at=expiry
     )
     db.session.add(reset_token)
@@ -55,15 +66,22 @@ def verify_reset_token(token):
         if payload.get('type') != 'password_reset':
             return None
         
-        # Check if token exists in database and is valid
-        reset_token = PasswordResetToken.query.filter_by(token=token).first()
-        if not reset_token or not reset_token.is_valid():
+        # One query fetches the unused, unexpired token row together with its user
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        row = db.session.execute(
+            select(PasswordResetToken, Users)
+            .join(Users, Users.id == PasswordResetToken.user_id)
+            .where(
+                PasswordResetToken.token_hash == hash_token(token),
+                PasswordResetToken.used.is_not(True),
+                PasswordResetToken.expires_at > now,
+                Users.id == payload.get('user_id'),
+            )
+        ).first()
+        if row is None:
             return None
-        
-        # Get user
-        from app.models import Users
-        user = Users.query.get(payload['user_id'])
-        
+
+        reset_token, user = row
         return user, reset_token
         
     except ExpiredSignatureError:
@@ -78,31 +96,20 @@ def verify_reset_token(token):
 
 
 def invalidate_token(reset_token):
-    """Mark token as used and delete it"""
-    try:
-        reset_token.used = True
-        db.session.delete(reset_token)
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error invalidating token: {str(e)}")
+    """Mark token as used and delete it; the caller commits (together with the new password)"""
+    reset_token.used = True
+    db.session.delete(reset_token)
 
 
 def cleanup_expired_tokens():
-    """Delete all expired tokens from database"""
+    """Delete expired and used tokens in bounded chunks (see app/retention.py)"""
+    from app.retention import purge_expired_tokens
+
     try:
-        expired = PasswordResetToken.query.filter(
-            PasswordResetToken.expires_at < datetime.now(timezone.utc)
-        ).all()
-        
-        for token in expired:
-            db.session.delete(token)
-        
-        db.session.commit()
-        current_app.logger.info(f"Cleaned up {len(expired)} expired tokens")
-        
+        stats = purge_expired_tokens()
+        current_app.logger.info(f"Cleaned up {stats['deleted']} expired tokens")
+        return stats['deleted']
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error cleaning up expired tokens: {str(e)}")
-
-
+        return 0
@@ -0,0 +1,257 @@
+"""
+Latency and query counts of the read endpoints over a seeded dataset.
+
+For each --rows scale the script brings a fresh database up to head with the
+migrations and seeds it with app/seed.py (the data behind `flask seed`, with a fixed
+seed). It then calls every endpoint --requests times through the Flask test client
+as a logged-in student (the most prolific author) or admin. Query counts and DB time come from the
+Server-Timing header written by app/sql_metrics.py.
+
+The default database is a temporary SQLite file. With --database-url (e.g. an empty
+Postgres database) the tables are created there and dropped after each scale.
+Results can be saved with --output and compared against an earlier run with
+--compare, e.g. before and after a change:
+
+Usage:
+    python -m benchmarks.endpoints --rows 10000 100000 --output before.json
+    python -m benchmarks.endpoints --rows 10000 100000 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy
+from flask_migrate import upgrade
+from sqlalchemy import select, text
+
+from app import create_app
+from app.config import DevelopmentConfig
+from app.extensions import db
+from app.models import UserStats, Users
+from app.seed import seed_database
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+PASSWORD = "bench-password"
+SEED = 1
+UNTIL = datetime(2026, 1, 1)
+DAYS = 730
+
+# (name, role, path); role None means anonymous
+ENDPOINTS = [
+    ("get_abstracts", None, "/api/abstracts"),
+    ("get_abstracts deep page", None, "/api/abstracts?page=500"),
+    ("search_abstracts field", None, "/api/abstracts/search?field=AI"),
+    ("search_abstracts country+year", None, "/api/abstracts/search?country=Kenya&year=2024"),
+    ("search_abstracts keyword", None, "/api/abstracts/search?keyword=malaria"),
+    ("user_dashboard", "student", "/api/user/dashboard"),
+    ("user_dashboard since", "student", "/api/user/dashboard?since={since}"),
+    ("admin_dashboard", "admin", "/api/admin"),
+    ("get_reviews", None, "/api/reviews"),
+    ("get_reviews rating", None, "/api/reviews?rating=5"),
+]
+
+_SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def make_app(database_url):
+    cfg = type("BenchConfig", (DevelopmentConfig,), {
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        "SQLALCHEMY_ECHO": False,
+        "RATELIMIT_ENABLED": False,
+        "SQL_METRICS_ENABLED": True,
+        "SQL_SERVER_TIMING": True,
+        "SQL_N_PLUS_ONE_THRESHOLD": 0,
+    })
+    app = create_app(cfg)
+    app.logger.setLevel("WARNING")
+    return app
+
+
+def seed(rows):
+    """
+    Seed with app/seed.py (fixed seed and end date, so every run gets the same data).
+    Returns: (rows per table, student user id, admin user id); the student is the most
+    prolific author, i.e. the heaviest dashboard.
+    """
+    report = seed_database(users=max(rows // 4, 10), abstracts=rows, reviews=rows // 10, seed=SEED,
+                           until=UNTIL, days=DAYS, password=PASSWORD)
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    student_id = db.session.execute(
+        select(UserStats.user_id).order_by(UserStats.total_abstracts.desc(), UserStats.user_id).limit(1)
+    ).scalar()
+    return report["rows"], student_id, report["admin_ids"][0]
+
+
+def teardown():
+    db.session.remove()
+    db.drop_all()
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def logged_in_client(app, user_id):
+    with app.app_context():
+        email = db.session.get(Users, user_id).email
+    client = app.test_client()
+    response = client.post("/api/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.get_json()
+    return client
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def measure(client, path, requests, warmup):
+    latencies, queries, db_ms, statuses = [], [], [], set()
+    for attempt in range(warmup + requests):
+        started = time.perf_counter()
+        response = client.get(path)
+        elapsed = (time.perf_counter() - started) * 1000
+        response.close()
+        if attempt < warmup:
+            continue
+        latencies.append(elapsed)
+        statuses.add(response.status_code)
+        for value in response.headers.getlist("Server-Timing"):
+            match = _SERVER_TIMING_DB.search(value)
+            if match:
+                db_ms.append(float(match.group(1)))
+                queries.append(int(match.group(2)))
+    latencies.sort()
+    db_ms.sort()
+    return {
+        "status": sorted(statuses),
+        "queries": max(queries) if queries else None,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p90_ms": round(percentile(latencies, 90), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "db_p50_ms": round(percentile(db_ms, 50), 2) if db_ms else None,
+    }
+
+
+def run_scale(database_url, rows, requests, warmup, skip_seed=False):
+    app = make_app(database_url)
+    with app.app_context():
+        if skip_seed:
+            counts = None
+            student_id = db.session.execute(
+                select(UserStats.user_id).order_by(UserStats.total_abstracts.desc(), UserStats.user_id).limit(1)
+            ).scalar()
+            admin_id = db.session.execute(select(Users.id).where(Users.role == "admin").limit(1)).scalar()
+        else:
+            upgrade(directory=MIGRATIONS)
+            started = time.perf_counter()
+            counts, student_id, admin_id = seed(rows)
+            print(f"  seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+    # Requests run outside an app context, so each gets its own `g` as in production
+    clients = {
+        None: app.test_client(),
+        "student": logged_in_client(app, student_id),
+        "admin": logged_in_client(app, admin_id),
+    }
+    # Delta sync covering the last 10% of the dataset's time range
+    since = UNTIL - timedelta(days=DAYS / 10)
+    results = {}
+    for name, role, path in ENDPOINTS:
+        path = path.format(since=since.isoformat() + "Z")
+        results[name] = measure(clients[role], path, requests, warmup)
+        print(f"  {name:<32} p50={results[name]['p50_ms']:>8}ms p99={results[name]['p99_ms']:>8}ms "
+              f"queries={results[name]['queries']}")
+
+    with app.app_context():
+        if not skip_seed:
+            teardown()
+        db.engine.dispose()
+    return {"rows": counts, "endpoints": results}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print p50/p99 and query-count changes against an earlier --output file"""
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('dialect')}):")
+    for scale, data in results["scales"].items():
+        old = baseline["scales"].get(scale)
+        if old is None:
+            print(f"  {scale} rows: not in baseline")
+            continue
+        print(f"  {scale} rows:")
+        for name, new in data["endpoints"].items():
+            before = old["endpoints"].get(name)
+            if before is None:
+                continue
+            changes = [
+                f"{key}={before[key]}->{new[key]} ({new[key] / before[key] - 1:+.0%})"
+                for key in ("p50_ms", "p99_ms") if before[key]
+            ]
+            if before["queries"] != new["queries"]:
+                changes.append(f"queries={before['queries']}->{new['queries']}")
+            print(f"    {name:<32} {' '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000],
+                        help="Abstracts (and payments, invoices, notifications) per scale, e.g. 10000 100000 1000000")
+    parser.add_argument("--requests", type=int, default=50, help="Timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per endpoint before measuring")
+    parser.add_argument("--database-url", help="Empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--skip-seed", action="store_true",
+                        help="Benchmark --database-url as already seeded by an earlier run (single scale)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "dialect": sqlalchemy.engine.make_url(args.database_url).get_backend_name() if args.database_url else "sqlite",
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "requests": args.requests,
+            "warmup": args.warmup,
+        },
+        "scales": {},
+    }
+    for rows in args.rows:
+        print(f"{rows} rows:")
+        if args.database_url:
+            results["scales"][str(rows)] = run_scale(args.database_url, rows, args.requests, args.warmup, args.skip_seed)
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+                results["scales"][str(rows)] = run_scale(url, rows, args.requests, args.warmup)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
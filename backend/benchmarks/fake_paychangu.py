@@ -0,0 +1,185 @@
+"""
+Local stand-in for the PayChangu API, for tests and benchmarks.
+
+Implements the two endpoints the app uses:
+    POST /payment                  create a checkout (status "pending")
+    GET  /verify-payment/<tx_ref>  look a transaction up
+plus GET /checkout/<tx_ref>, which marks the transaction paid the way a
+student completing the hosted checkout would.
+
+Latency, jitter and failure rate are configurable so the client's timeouts,
+retries and circuit breaker can be exercised.
+
+Usage:
+    python -m benchmarks.fake_paychangu --port 8765 --latency 0.05 --failure-rate 0.1
+    PAYCHANGU_BASE_URL=http://127.0.0.1:8765 PAYCHANGU_SECRET=test python run.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakePayChangu:
+    """In-process fake server; use start()/stop() or run it as a script"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, failure_rate=0.0,
+                 auto_pay=False):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        # Mark every new transaction as paid immediately
+        self.auto_pay = auto_pay
+        self.transactions = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def pay(self, tx_ref):
+        """Mark a transaction as successfully paid"""
+        with self.lock:
+            transaction = self.transactions.get(tx_ref)
+            if transaction is None:
+                return None
+            transaction["status"] = "success"
+            return dict(transaction)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so pooling is measurable
+            # Headers and body go out in separate writes; without this, Nagle plus
+            # delayed ACKs add ~40ms to every response on a reused connection
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timed out) before we answered
+                    pass
+
+            def _simulate(self):
+                with fake.lock:
+                    fake.requests += 1
+                delay = fake.latency + random.uniform(0, fake.jitter)
+                if delay:
+                    time.sleep(delay)
+                if fake.failure_rate and random.random() < fake.failure_rate:
+                    self._send(503, {"status": "failed", "message": "Service unavailable"})
+                    return False
+                return True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self._simulate():
+                    return
+                if self.path != "/payment":
+                    return self._send(404, {"status": "failed", "message": "Not found"})
+
+                tx_ref = body.get("tx_ref")
+                if not tx_ref:
+                    return self._send(400, {"status": "failed", "message": "tx_ref is required"})
+
+                with fake.lock:
+                    fake.transactions[tx_ref] = {
+                        "tx_ref": tx_ref,
+                        "status": "pending",
+                        "amount": body.get("amount"),
+                        "currency": body.get("currency"),
+                        "customer": {
+                            "email": body.get("email"),
+                            "first_name": body.get("first_name"),
+                            "last_name": body.get("last_name"),
+                        },
+                    }
+                if fake.auto_pay:
+                    fake.pay(tx_ref)
+
+                self._send(201, {
+                    "status": "success",
+                    "message": "Hosted payment session generated successfully.",
+                    "data": {
+                        "event": "checkout.session:created",
+                        "checkout_url": f"{fake.url}/checkout/{tx_ref}",
+                        "data": {"tx_ref": tx_ref, "status": "pending"},
+                    },
+                })
+
+            def do_GET(self):
+                if not self._simulate():
+                    return
+                prefix, _, tx_ref = self.path.rpartition("/")
+
+                if prefix == "/verify-payment":
+                    with fake.lock:
+                        transaction = fake.transactions.get(tx_ref)
+                        transaction = dict(transaction) if transaction else None
+                    if transaction is None:
+                        return self._send(404, {"status": "failed", "message": "Transaction not found"})
+                    return self._send(200, {
+                        "status": "success" if transaction["status"] == "success" else "pending",
+                        "message": "Payment details retrieved successfully.",
+                        "data": transaction,
+                    })
+
+                if prefix == "/checkout":
+                    transaction = fake.pay(tx_ref)
+                    if transaction is None:
+                        return self._send(404, {"status": "failed", "message": "Transaction not found"})
+                    return self._send(200, {"status": "success", "data": transaction})
+
+                self._send(404, {"status": "failed", "message": "Not found"})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay up to this many seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--auto-pay", action="store_true", help="Mark transactions paid as soon as they are created")
+    args = parser.parse_args()
+
+    fake = FakePayChangu(args.host, args.port, args.latency, args.jitter, args.failure_rate, args.auto_pay)
+    print(f"Fake PayChangu listening on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
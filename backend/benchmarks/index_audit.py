@@ -0,0 +1,173 @@
+"""
+Before/after comparison for the index audit migration (c4a91e7d2f38).
+
+Builds two throwaway SQLite databases with `flask db upgrade`: one stopped at the
+previous revision and one at the index audit. Both are seeded with the same rows.
+The script prints the EXPLAIN QUERY PLAN of the hot queries and the insert
+throughput into the already populated tables.
+
+Usage:
+    python -m benchmarks.index_audit --abstracts 20000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask_migrate import upgrade
+from sqlalchemy import func, insert, select, text, tuple_
+
+from app import create_app
+from app.config import DevelopmentConfig
+from app.extensions import db
+from app.models import Abstracts, Invoices, Notifications, Payments, Users
+
+BEFORE = "b81f4d0c6a27"
+AFTER = "c4a91e7d2f38"
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+FIELDS = ["AI", "Agriculture", "Health", "Economics", "Education", "Energy"]
+COUNTRIES = ["Malawi", "Kenya", "Nigeria", "Ghana", "Zambia", "Uganda"]
+
+
+def hot_queries():
+    """(name, statement) for the query shapes used by the routes and jobs"""
+    since = datetime(2024, 6, 1)
+    return [
+        ("published listing", select(Abstracts.id).where(Abstracts.status == "published")
+            .order_by(Abstracts.date_submitted.desc()).limit(10)),
+        ("search by field", select(Abstracts.id).where(Abstracts.status == "published", Abstracts.field == "AI")
+            .order_by(Abstracts.date_submitted.desc()).limit(10)),
+        ("admin pending queue", select(Abstracts.id).where(Abstracts.status == "pending")
+            .order_by(Abstracts.date_submitted.desc()).limit(5)),
+        ("payment by tx_ref", select(Payments.id).where(Payments.transaction_id == "abstract_42_1700000042")),
+        ("abstract's pending payment", select(Payments.id).where(
+            Payments.abstract_id == 42, Payments.status == "pending", Payments.payment_date > since)
+            .order_by(Payments.payment_date.desc()).limit(1)),
+        ("reconciliation batch", select(Payments.id).where(
+            Payments.status == "pending", Payments.payment_date < since,
+            tuple_(Payments.payment_date, Payments.id) > (datetime(2024, 1, 1), 0))
+            .order_by(Payments.payment_date, Payments.id).limit(200)),
+        ("invoice by payment", select(Invoices.id).where(Invoices.payment_id == 42)),
+        ("invoice by abstract", select(Invoices.id).where(Invoices.abstract_id == 42)),
+        ("user notifications", select(Notifications.id).where(Notifications.user_id == 7)
+            .order_by(Notifications.id.desc())),
+        ("unread count", select(func.count()).select_from(Notifications)
+            .where(Notifications.user_id == 7, Notifications.read.is_(False))),
+    ]
+
+
+def make_app(path):
+    cfg = type("BenchConfig", (DevelopmentConfig,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "RATELIMIT_ENABLED": False,
+    })
+    return create_app(cfg)
+
+
+def seed_rows(n_abstracts, seed=1):
+    rng = random.Random(seed)
+    n_users = max(1, n_abstracts // 4)
+    start = datetime(2024, 1, 1)
+    users = [
+        {"id": i, "email": f"user{i}@example.com", "fullname": f"User {i}", "country": rng.choice(COUNTRIES),
+         "password_hash": "x", "role": "student", "last_seen": start}
+        for i in range(1, n_users + 1)
+    ]
+    abstracts, payments, invoices, notifications = [], [], [], []
+    for i in range(1, n_abstracts + 1):
+        submitted = start + timedelta(minutes=i)
+        status = rng.choices(["published", "pending", "rejected"], [70, 25, 5])[0]
+        abstracts.append({
+            "id": i, "title": f"Abstract {i}", "content": "...", "file_type": "text",
+            "field": rng.choice(FIELDS), "institution": f"University {i % 200}", "country": rng.choice(COUNTRIES),
+            "year": 2015 + i % 10, "keywords": "a, b", "status": status,
+            "author_id": rng.randint(1, n_users), "date_submitted": submitted,
+        })
+        paid = status == "published"
+        payments.append({
+            "id": i, "abstract_id": i, "amount": 1.99, "currency": "USD",
+            "status": "confirmed" if paid else "pending", "payment_date": submitted, "method": "PayChangu",
+            "transaction_id": f"abstract_{i}_{1700000000 + i}", "payment_link": f"https://checkout/{i}",
+        })
+        invoices.append({
+            "id": i, "abstract_id": i, "invoice_url": f"https://checkout/{i}", "amount": 1.99,
+            "generated_date": submitted, "due_date": submitted + timedelta(weeks=2), "paid": paid, "payment_id": i,
+        })
+        notifications.append({"id": i, "user_id": rng.randint(1, n_users), "message": "Update", "read": rng.random() < 0.6})
+    return {Users: users, Abstracts: abstracts, Payments: payments, Invoices: invoices, Notifications: notifications}
+
+
+def timed_insert(model, rows, repeat):
+    """Best-of-`repeat` rows/s for inserting `rows` into an already populated table"""
+    best = None
+    id_step = len(rows)
+    for attempt in range(1, repeat + 1):
+        batch = [dict(row, id=row["id"] + attempt * id_step) for row in rows]
+        if model is Users:
+            for row in batch:
+                row["email"] = f"{attempt}.{row['email']}"
+        if model is Payments:
+            for row in batch:
+                row["transaction_id"] = f"{attempt}.{row['transaction_id']}"
+        started = time.perf_counter()
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(rows) / best
+
+
+def explain(statement):
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def run(revision, rows, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "bench.db"))
+        with app.app_context():
+            upgrade(directory=MIGRATIONS, revision=revision)
+            for model, data in rows.items():
+                db.session.execute(insert(model), data)
+            db.session.commit()
+            throughput = {
+                model.__tablename__: round(timed_insert(model, data, repeat)) for model, data in rows.items()
+            }
+            db.session.execute(text("ANALYZE"))
+            plans = {name: explain(statement) for name, statement in hot_queries()}
+            index_count = db.session.execute(text(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+            )).scalar()
+            db.engine.dispose()
+    return {"indexes": index_count, "inserts_per_sec": throughput, "plans": plans}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--abstracts", type=int, default=20000, help="Abstracts (and payments/invoices) to insert")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed insert batches per table (best is reported)")
+    args = parser.parse_args()
+
+    rows = seed_rows(args.abstracts)
+    before = run(BEFORE, rows, args.repeat)
+    after = run(AFTER, rows, args.repeat)
+
+    print(f"ix_* indexes: before={before['indexes']} after={after['indexes']}\n")
+    print("Insert throughput (rows/s):")
+    for table, rate in before["inserts_per_sec"].items():
+        new_rate = after["inserts_per_sec"][table]
+        print(f"  {table:<14} before={rate:>9} after={new_rate:>9} ({new_rate / rate - 1:+.0%})")
+
+    print("\nQuery plans:")
+    for name, plan in before["plans"].items():
+        print(f"  {name}")
+        print(f"    before: {'; '.join(plan)}")
+        print(f"    after:  {'; '.join(after['plans'][name])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compare the stock PayChangu SDK client with the pooled PayChanguGateway
+against the local fake server.
+
+Scenarios:
+    healthy   verify_transaction round trips (connection reuse vs a new connection per call)
+    degraded  the fake answers slowly and fails often; shows timeouts, retries and
+              how quickly the circuit breaker starts failing fast
+
+Usage:
+    python -m benchmarks.paychangu_client --calls 500 --concurrency 8
+"""
+
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from paychangu import PayChanguClient
+from paychangu.models.payment import Payment
+
+from app.paychangu_client import PayChanguGateway
+from benchmarks.fake_paychangu import FakePayChangu
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def run_calls(call, calls, concurrency):
+    latencies = []
+    errors = 0
+
+    def timed(_):
+        started = time.perf_counter()
+        try:
+            call()
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, e
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for elapsed, error in executor.map(timed, range(calls)):
+            latencies.append(elapsed)
+            errors += error is not None
+    wall = time.perf_counter() - started
+
+    return {
+        "calls": calls,
+        "errors": errors,
+        "throughput": calls / wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+    }
+
+
+def seed_transaction(client, fake):
+    payment = Payment(
+        amount=1.99, currency="USD", email="bench@example.com", first_name="Bench", last_name=None,
+        callback_url="http://localhost/callback", return_url="http://localhost/return", tx_ref="bench_tx",
+    )
+    client.initiate_transaction(payment)
+    fake.pay("bench_tx")
+
+
+def healthy(args):
+    fake = FakePayChangu(latency=args.latency).start()
+    results = {}
+    try:
+        sdk = PayChanguClient(secret_key="bench")
+        sdk.BASE_URL = fake.url
+        gateway = PayChanguGateway("bench", base_url=fake.url, pool_size=args.concurrency)
+        seed_transaction(gateway, fake)
+
+        results["sdk"] = run_calls(lambda: sdk.verify_transaction("bench_tx"), args.calls, args.concurrency)
+        results["gateway"] = run_calls(lambda: gateway.verify_transaction("bench_tx"), args.calls, args.concurrency)
+        results["gateway"]["metrics"] = gateway.metrics()
+    finally:
+        fake.stop()
+    return results
+
+
+def degraded(args):
+    fake = FakePayChangu().start()
+    results = {}
+    try:
+        gateway = PayChanguGateway(
+            "bench", base_url=fake.url, read_timeout=0.4, max_retries=2, backoff_base=0.05,
+            failure_threshold=5, reset_timeout=5, pool_size=args.concurrency,
+        )
+        seed_transaction(gateway, fake)
+        fake.latency, fake.jitter, fake.failure_rate = 0.2, 0.3, 0.6
+
+        results["gateway"] = run_calls(lambda: gateway.verify_transaction("bench_tx"), args.calls, args.concurrency)
+        results["gateway"]["metrics"] = gateway.metrics()
+        results["fake_requests"] = fake.requests
+    finally:
+        fake.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake server latency for the healthy scenario")
+    args = parser.parse_args()
+
+    print(json.dumps({"healthy": healthy(args), "degraded": degraded(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
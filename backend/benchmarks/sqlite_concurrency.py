@@ -0,0 +1,138 @@
+"""
+Concurrent read/write throughput on a SQLite file, with the stock settings and with
+the tuned profile (app/sqlite_profile.py: WAL, synchronous=NORMAL, busy timeout,
+cache and mmap pragmas).
+
+Each worker process stands in for a gunicorn worker. It builds its own app and
+loops for --duration seconds. A write is a last_seen UPDATE plus commit, as
+before_request does. A read is the published listing query. Errors (mostly
+"database is locked") are counted.
+
+Usage:
+    python -m benchmarks.sqlite_concurrency --workers 4 --duration 5 --write-ratio 0.2
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.config import DevelopmentConfig
+from app.extensions import db
+from app.models import Abstracts, Users
+
+
+def make_app(path, tuned):
+    cfg = type("BenchConfig", (DevelopmentConfig,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLITE_TUNED": tuned,
+        "SQL_METRICS_ENABLED": False,
+        "RATELIMIT_ENABLED": False,
+    })
+    return create_app(cfg)
+
+
+def seed(path, tuned, users=200, abstracts=5000):
+    app = make_app(path, tuned)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Users), [
+            {"id": i, "email": f"u{i}@example.com", "fullname": "U", "country": "Malawi", "password_hash": "x"}
+            for i in range(1, users + 1)
+        ])
+        db.session.execute(insert(Abstracts), [
+            {"title": f"A{i}", "content": "...", "file_type": "text", "field": "AI", "institution": "U",
+             "country": "Malawi", "year": 2024, "status": "published" if i % 3 else "pending",
+             "author_id": 1 + i % users, "date_submitted": datetime(2024, 1, 1)}
+            for i in range(abstracts)
+        ])
+        db.session.commit()
+        mode = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+        db.engine.dispose()
+    return mode
+
+
+def worker(args):
+    path, tuned, duration, write_ratio, users, seed_value = args
+    rng = random.Random(seed_value)
+    app = make_app(path, tuned)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    latencies = []
+    with app.app_context():
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    db.session.execute(
+                        update(Users).where(Users.id == rng.randint(1, users))
+                        .values(last_seen=datetime.now(timezone.utc))
+                    )
+                    db.session.commit()
+                    counts["writes"] += 1
+                else:
+                    db.session.execute(
+                        select(Abstracts.id, Abstracts.title).where(Abstracts.status == "published")
+                        .order_by(Abstracts.date_submitted.desc()).limit(10)
+                    ).all()
+                    db.session.commit()
+                    counts["reads"] += 1
+            except OperationalError:
+                db.session.rollback()
+                counts["errors"] += 1
+            latencies.append(time.perf_counter() - started)
+        db.engine.dispose()
+    return counts, latencies
+
+
+def run(tuned, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        mode = seed(path, tuned)
+        jobs = [(path, tuned, args.duration, args.write_ratio, 200, n) for n in range(args.workers)]
+        with multiprocessing.get_context("spawn").Pool(args.workers) as pool:
+            results = pool.map(worker, jobs)
+
+    totals = {"reads": 0, "writes": 0, "errors": 0}
+    latencies = []
+    for counts, worker_latencies in results:
+        for key in totals:
+            totals[key] += counts[key]
+        latencies.extend(worker_latencies)
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        "journal_mode": mode,
+        "reads_per_sec": totals["reads"] / args.duration,
+        "writes_per_sec": totals["writes"] / args.duration,
+        "errors": totals["errors"],
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    for label, tuned in (("default", False), ("tuned", True)):
+        r = run(tuned, args)
+        print(
+            f"{label:<8} journal={r['journal_mode']:<7} reads/s={r['reads_per_sec']:>8.0f} "
+            f"writes/s={r['writes_per_sec']:>7.0f} errors={r['errors']:>5} "
+            f"p50={r['p50_ms']:.2f}ms p99={r['p99_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Import time and startup cost of the app, i.e. what every gunicorn worker (and every
+autoscaled cold start) pays before it can serve.
+
+Each run starts a fresh interpreter with `python -X importtime` and records:
+
+- process: interpreter start to first response
+- import: `from app import create_app`
+- create_app: building the app (extensions, blueprints, CLI commands)
+- first_request: the first GET /api/abstracts, which pays for anything initialised lazily
+
+It also lists the packages whose imports cost the most. PAYCHANGU_SECRET is set (to a
+dummy value) so the PayChangu client is part of the measurement, as in production;
+no call is made. Results can be saved with --output and compared with --compare, e.g.
+before and after a change:
+
+Usage:
+    python -m benchmarks.startup --runs 20 --output before.json
+    python -m benchmarks.startup --runs 20 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from benchmarks.endpoints import git_commit, percentile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+from app.config import DevelopmentConfig
+app = create_app(type("StartupConfig", (DevelopmentConfig,), {
+    "SQLALCHEMY_DATABASE_URI": sys.argv[1],
+    "SQLALCHEMY_ECHO": False,
+    "PAYCHANGU_SECRET": "startup-benchmark",
+}))
+created = time.perf_counter()
+from app.extensions import db
+with app.app_context():
+    db.create_all()
+ready = time.perf_counter()
+status = app.test_client().get("/api/abstracts").status_code
+served = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (served - ready) * 1000,
+    "setup_ms": (ready - created) * 1000,
+}))
+"""
+
+# "import time: self [us] | cumulative | <indent>module"
+_IMPORTTIME = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def package_imports(stderr):
+    """
+    Cumulative milliseconds per package, counted where a different package (or the
+    script) first imports it; e.g. flask_migrate includes the alembic it pulls in
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            entries.append((len(match.group(2)), match.group(3).split(".")[0], int(match.group(1))))
+
+    # -X importtime lists a module after everything it imported; reversed, parents come first
+    totals = defaultdict(float)
+    stack = []
+    for indent, package, cumulative in reversed(entries):
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        if not stack or stack[-1][1] != package:
+            totals[package] += cumulative / 1000
+        stack.append((indent, package))
+    return totals
+
+
+def run_once(database_url):
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, database_url],
+        cwd=BACKEND, capture_output=True, text=True,
+        # No .env overrides that would change what gets initialised
+        env={**os.environ, "FLASK_CONFIG": "development", "METRICS_ENABLED": "false", "PROFILING_ENABLED": "false"},
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        sys.exit(f"Startup run failed:\n{proc.stderr[-3000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    # Interpreter start to first response, without the untimed create_all()
+    result["process_ms"] = elapsed - result.pop("setup_ms")
+    return result, package_imports(proc.stderr)
+
+
+def summarise(values):
+    values = sorted(values)
+    return {
+        "p50_ms": round(percentile(values, 50), 2),
+        "p90_ms": round(percentile(values, 90), 2),
+        "min_ms": round(values[0], 2),
+    }
+
+
+def run(runs, warmup):
+    timings = defaultdict(list)
+    imports = defaultdict(list)
+    with tempfile.TemporaryDirectory() as tmp:
+        for attempt in range(warmup + runs):
+            # A new file each run, so every process starts from an empty database
+            result, packages = run_once(f"sqlite:///{os.path.join(tmp, f'startup{attempt}.db')}")
+            if attempt < warmup:
+                continue
+            assert result.pop("status") == 200
+            for key, value in result.items():
+                timings[key].append(value)
+            for package, ms in packages.items():
+                imports[package].append(ms)
+
+    # A package missing from some runs (imported conditionally) counts as 0 there
+    medians = {package: percentile(sorted(values + [0] * (runs - len(values))), 50)
+               for package, values in imports.items()}
+    return {
+        "phases": {key: summarise(values) for key, values in timings.items()},
+        "imports": {package: round(ms, 2)
+                    for package, ms in sorted(medians.items(), key=lambda item: item[1], reverse=True) if ms >= 1},
+    }
+
+
+def compare(results, baseline, min_change=5):
+    """Print p50 changes against an earlier --output file"""
+    print(f"\nCompared with {baseline['meta'].get('commit')}:")
+    for phase, new in results["phases"].items():
+        before = baseline["phases"].get(phase)
+        if before:
+            change = new["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0
+            print(f"  {phase:<18} p50={before['p50_ms']}->{new['p50_ms']}ms ({change:+.0%})")
+    # Packages that are no longer imported at startup, new ones, and big moves
+    for package in dict.fromkeys(list(baseline["imports"]) + list(results["imports"])):
+        before, new = baseline["imports"].get(package, 0), results["imports"].get(package, 0)
+        if abs(new - before) >= min_change:
+            print(f"  import {package:<30} {before or '-'} -> {new or '-'} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Timed interpreter starts")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed starts first (fills the OS file cache)")
+    parser.add_argument("--top", type=int, default=15, help="Heaviest imported packages to report")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "runs": args.runs,
+        },
+        **run(args.runs, args.warmup),
+    }
+    for phase, summary in results["phases"].items():
+        print(f"  {phase:<18} p50={summary['p50_ms']:>8}ms p90={summary['p90_ms']:>8}ms min={summary['min_ms']:>8}ms")
+    print("  heaviest imports (cumulative, p50):")
+    for package, ms in list(results["imports"].items())[:args.top]:
+        print(f"    {package:<32} {ms:>8}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+# Gunicorn hooks; gunicorn loads ./gunicorn.conf.py from the working directory automatically
+
+import glob
+import os
+
+
+def on_starting(server):
+    # Metric files left by a previous run would otherwise be summed into the new one
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges (requests in progress, email queue)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
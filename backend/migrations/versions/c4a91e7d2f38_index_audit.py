@@ -0,0 +1,77 @@
+"""Index audit: drop redundant indexes, add composites for hot queries
+
+Revision ID: c4a91e7d2f38
+Revises: b81f4d0c6a27
+Create Date: 2026-10-19 11:26:05.731904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a91e7d2f38'
+down_revision = 'b81f4d0c6a27'
+branch_labels = None
+depends_on = None
+
+
+# Primary keys are already indexed by the primary key constraint
+PRIMARY_KEY_INDEXES = [
+    'users', 'abstracts', 'payments', 'invoices', 'feedback',
+    'notifications', 'blog_posts', 'contact', 'reviews',
+]
+
+# (table, index name, columns) dropped because no query uses them, or because
+# a composite added below has them as its leading column
+DROPPED = [
+    ('users', 'ix_users_last_seen', ['last_seen']),  # written on every request, never read
+    ('users', 'ix_users_role', ['role']),
+    ('abstracts', 'ix_abstracts_status', ['status']),
+    ('abstracts', 'ix_abstracts_date_submitted', ['date_submitted']),
+    ('abstracts', 'ix_abstracts_institution', ['institution']),  # only searched with ILIKE '%...%'
+    ('abstracts', 'ix_abstracts_keywords', ['keywords']),  # only searched with ILIKE '%...%'
+    ('payments', 'ix_payments_status', ['status']),
+    ('payments', 'ix_payments_abstract_id', ['abstract_id']),
+    ('invoices', 'ix_invoices_invoice_url', ['invoice_url']),
+    ('invoices', 'ix_invoices_paid', ['paid']),
+    ('notifications', 'ix_notifications_user_id', ['user_id']),
+]
+
+# (table, index name, columns) matching the WHERE/ORDER BY shapes in routes.py,
+# payments.py and reconciliation.py
+ADDED = [
+    ('abstracts', 'ix_abstracts_status_date_submitted', ['status', 'date_submitted']),
+    ('payments', 'ix_payments_transaction_id', ['transaction_id']),
+    ('payments', 'ix_payments_abstract_id_status', ['abstract_id', 'status']),
+    ('invoices', 'ix_invoices_payment_id', ['payment_id']),
+    ('notifications', 'ix_notifications_user_id_read', ['user_id', 'read']),
+]
+
+
+def upgrade():
+    for table in PRIMARY_KEY_INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_id')
+
+    for table, name, _ in DROPPED:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
+
+    for table, name, columns in ADDED:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    for table, name, _ in reversed(ADDED):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
+
+    for table, name, columns in reversed(DROPPED):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+
+    for table in reversed(PRIMARY_KEY_INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(f'ix_{table}_id', ['id'], unique=False)
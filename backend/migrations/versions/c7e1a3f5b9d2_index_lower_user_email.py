@@ -0,0 +1,26 @@
+"""Index lower(users.email) for case-insensitive author matching
+
+Revision ID: c7e1a3f5b9d2
+Revises: b4d8f2a6c0e3
+Create Date: 2026-10-19 21:02:14.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1a3f5b9d2'
+down_revision = 'b4d8f2a6c0e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_email_lower', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_email_lower')
@@ -1,7 +1,6 @@
 import os
 from app import create_app
 from app.extensions import db
-from app.models import Users, Abstracts, Payments, Invoices, Feedback, Notifications, BlogPosts
 
 # Get config from environment variable, default to 'development'
 config_name = os.getenv('FLASK_CONFIG', 'development')
@@ -9,7 +8,8 @@ app = create_app(config_name)
 
 @app.shell_context_processor
 def make_shell_context():
-    from app.models import Users, Abstracts
+    # Only `flask shell` needs the full set of models
+    from app.models import Users, Abstracts, Payments, Invoices, Feedback, Notifications, BlogPosts
     return {
         'db': db,
         'users': Users,
@@ -25,4 +25,4 @@ def make_shell_context():
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
-    app.run(debug=config_name.DEBUG, port=5000)
\ No newline at end of file
+    app.run(debug=app.debug, port=5000)